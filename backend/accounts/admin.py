@@ -1,4 +1,32 @@
 from django.contrib import admin
+
+from core.admin_tools import LargeTableAdmin, SoftDeleteMixin
+from core.archival import soft_delete_account
 from .models import User
 # Register your models here.
-admin.site.register(User)
\ No newline at end of file
+
+# Autocomplete widgets for these foreign keys only offer users with the matching role
+AUTOCOMPLETE_ROLES = {
+    ('ojtlisting', 'company'): 'company',
+    ('application', 'student'): 'student',
+}
+
+
+@admin.register(User)
+class UserAdmin(SoftDeleteMixin, LargeTableAdmin):
+    list_display = ('username', 'email', 'role', 'company_name', 'is_verified', 'is_active', 'date_joined')
+    list_filter = ('role', 'is_verified', 'is_active', 'is_staff', 'course', ('deleted_at', admin.EmptyFieldListFilter))
+    # Prefix and exact matches can use an index; the default icontains can't
+    search_fields = ('^username', '^company_name', '=email', '=student_id')
+    ordering = ('username',)
+    search_help_text = 'Username or company name prefix, or the exact email or student ID'
+
+    def get_search_results(self, request, queryset, search_term):
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        role = AUTOCOMPLETE_ROLES.get((request.GET.get('model_name'), request.GET.get('field_name')))
+        if role and request.path.endswith('/autocomplete/'):
+            queryset = queryset.filter(role=role)
+        return queryset, may_have_duplicates
+
+    def soft_delete(self, obj):
+        soft_delete_account(obj)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AccountsConfig(AppConfig):
     name = 'accounts'
+
+    def ready(self):
+        from . import authentication, checks, thumbnails  # noqa: F401 (connects the user signal receivers, registers checks)
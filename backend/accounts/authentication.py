@@ -1,9 +1,39 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework import exceptions
 
-# accounts/authentication.py
+from backend.instrumentation import timed
+from .models import User
+from .revocation import is_revoked
+
+USER_CACHE_KEY = 'auth:user:{}'
+# Only what permission checks read is cached (never the password hash); any
+# other field is loaded from the database on first access
+CACHED_USER_FIELDS = ['id', 'username', 'role', 'is_active', 'is_staff', 'is_superuser']
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Covers update_profile, admin edits and deactivation
+    invalidate_cached_user(instance.pk)
+
+
 class CookieJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
+        with timed('auth'):
+            return self._authenticate(request)
+
+    def _authenticate(self, request):
         # Try to get token from cookie
         access_token = request.COOKIES.get('access_token')
         
@@ -14,8 +44,39 @@ class CookieJWTAuthentication(JWTAuthentication):
         # Validate token only if present
         try:
             validated_token = self.get_validated_token(access_token)
+            if is_revoked(validated_token.get('jti')):
+                return None
             user = self.get_user(validated_token)
             return (user, validated_token)
         except:
             # If token is invalid, still return None for registration
-            return None  # ✅ Don't raise exception for registration
\ No newline at end of file
+            return None  # ✅ Don't raise exception for registration
+
+    def get_user(self, validated_token):
+        """
+        Resolve the token's user from the cache, falling back to the database.
+
+        Invalidation on save reaches other workers only through a shared cache
+        (Redis, Memcached); with a per-process cache a deactivated or demoted
+        user keeps authenticating elsewhere for up to AUTH_USER_CACHE_TIMEOUT.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return super().get_user(validated_token)
+
+        key = USER_CACHE_KEY.format(user_id)
+        cached = cache.get(key)
+        if cached is None:
+            user = super().get_user(validated_token)
+            cache.set(key, {field: getattr(user, field) for field in CACHED_USER_FIELDS},
+                      getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60))
+            return user
+
+        # from_db() wants the values in model field order
+        names = [field.attname for field in User._meta.concrete_fields if field.attname in cached]
+        user = User.from_db(router.db_for_read(User), names, [cached[name] for name in names])
+        user._partially_loaded = True
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User is inactive')
+        return user
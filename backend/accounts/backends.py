@@ -0,0 +1,33 @@
+"""
+Authentication backend for the login views.
+
+``ModelBackend`` as Django ships it, except that the async path
+(``aauthenticate``, used by ``login_async``) hands the password hash to the
+bounded pool in ``accounts.hashing``, where Django's version would verify it
+on the event loop. Everything else, including ``user_can_authenticate``, is
+unchanged.
+"""
+from django.contrib.auth import backends, get_user_model
+from django.contrib.auth.hashers import make_password
+
+from .hashing import run_hashing
+
+UserModel = get_user_model()
+
+
+class ModelBackend(backends.ModelBackend):
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        """May raise ``HashingBusy`` when the pool is full"""
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await UserModel._default_manager.aget_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown usernames take as long as wrong passwords
+            await run_hashing(make_password, password)
+            return None
+        if await run_hashing(user.check_password, password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Caches that live inside one process; entries and invalidations don't reach other workers
+PER_PROCESS_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@register()
+def auth_cache_check(app_configs, **kwargs):
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if settings.DEBUG or backend not in PER_PROCESS_CACHES or not getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60):
+        return []
+    return [Warning(
+        'CookieJWTAuthentication caches users in a per-process cache.',
+        hint='With several workers, a deactivated or demoted user keeps authenticating on the others for up '
+             'to AUTH_USER_CACHE_TIMEOUT. Point CACHES at Redis/Memcached or set AUTH_USER_CACHE_TIMEOUT = 0.',
+        id='accounts.W001',
+    )]
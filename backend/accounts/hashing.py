@@ -0,0 +1,64 @@
+"""
+Bounded pool for password hashing in async views.
+
+PBKDF2 holds a worker for its full duration. The async login/register views
+hand it to a small thread pool instead (hashlib releases the GIL while
+hashing) so the event loop keeps serving other requests. When more than
+``PASSWORD_HASHING['MAX_QUEUE']`` hashes are waiting, new ones are refused
+with ``HashingBusy`` and the view answers 503 instead of queueing forever.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+
+class HashingBusy(Exception):
+    """Too many password hashes are already queued"""
+
+
+def get_hashing_settings():
+    config = {
+        'WORKERS': os.cpu_count() or 2,
+        'MAX_QUEUE': 64,
+    }
+    config.update(getattr(settings, 'PASSWORD_HASHING', {}))
+    return config
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_hashing_settings()['WORKERS'],
+                    thread_name_prefix='password-hashing',
+                )
+    return _executor
+
+
+def queue_depth():
+    return _pending
+
+
+async def run_hashing(func, *args):
+    """Run a CPU-bound hasher call on the pool, refusing work past MAX_QUEUE"""
+    global _pending
+    with _pending_lock:
+        if _pending >= get_hashing_settings()['MAX_QUEUE']:
+            raise HashingBusy()
+        _pending += 1
+    try:
+        return await sync_to_async(func, thread_sensitive=False, executor=get_executor())(*args)
+    finally:
+        with _pending_lock:
+            _pending -= 1
@@ -0,0 +1,59 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.authentication import CookieJWTAuthentication, invalidate_cached_user
+from accounts.revocation import is_revoked
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Microbenchmark CookieJWTAuthentication with and without the user cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def run(self, auth, request, iterations, user_id, cold):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                if cold:
+                    invalidate_cached_user(user_id)
+                auth.authenticate(request)
+            elapsed = time.perf_counter() - started
+        return elapsed / iterations * 1e6, len(queries) / iterations
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        # Throwaway user, rolled back at the end
+        with transaction.atomic():
+            user = User.objects.create_user('bench-auth-user', password='unused', role='student')
+            request = RequestFactory().get('/api/listings/')
+            request.COOKIES['access_token'] = str(RefreshToken.for_user(user).access_token)
+            auth = CookieJWTAuthentication()
+
+            cache.clear()
+            cold_us, cold_queries = self.run(auth, request, iterations, user.pk, cold=True)
+            auth.authenticate(request)
+            warm_us, warm_queries = self.run(auth, request, iterations, user.pk, cold=False)
+
+            jti = RefreshToken.for_user(user).access_token['jti']
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    is_revoked(jti)
+                revocation_us = (time.perf_counter() - started) / iterations * 1e6
+            revocation_queries = len(queries) / iterations
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'{"mode":<12}{"us/request":>12}{"queries/request":>18}')
+        self.stdout.write(f'{"uncached":<12}{cold_us:>12.1f}{cold_queries:>18.2f}')
+        self.stdout.write(f'{"cached":<12}{warm_us:>12.1f}{warm_queries:>18.2f}')
+        self.stdout.write(f'{"revocation":<12}{revocation_us:>12.1f}{revocation_queries:>18.2f}')
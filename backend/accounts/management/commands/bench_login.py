@@ -0,0 +1,83 @@
+import asyncio
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory, RequestFactory
+
+from accounts import views
+from accounts.models import User
+
+PASSWORD = 'bench-password'
+
+
+def summarize(label, latencies, elapsed):
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return (
+        f'{label:<28}{len(ordered) / elapsed:>10.1f}'
+        f'{statistics.median(ordered) * 1000:>12.0f}{p99 * 1000:>12.0f}'
+    )
+
+
+class Command(BaseCommand):
+    help = 'Compare login throughput of the sync view on N worker threads with the async view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=64, help='Logins per mode')
+        parser.add_argument('--workers', type=int, default=4, help='Threads for the sync (WSGI-like) run')
+        parser.add_argument('--concurrency', type=int, default=64, help='In-flight logins for the async run')
+
+    def login_body(self, index):
+        return json.dumps({'username': f'bench-login-{index}', 'password': PASSWORD})
+
+    def run_sync(self, count, workers):
+        factory = RequestFactory()
+
+        def one(index):
+            request = factory.post('/api/auth/login/', self.login_body(index), content_type='application/json')
+            started = time.perf_counter()
+            response = views.login(request)
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            latencies = list(pool.map(one, range(count)))
+        return latencies, time.perf_counter() - started
+
+    async def run_async(self, count, concurrency):
+        factory = AsyncRequestFactory()
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one(index):
+            async with gate:
+                request = factory.post('/api/auth/login/', self.login_body(index), content_type='application/json')
+                started = time.perf_counter()
+                response = await views.login_async(request)
+                assert response.status_code == 200, response.status_code
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(one(index) for index in range(count)))
+        return latencies, time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        encoded = make_password(PASSWORD)
+        User.objects.bulk_create([
+            User(username=f'bench-login-{index}', password=encoded, role='student')
+            for index in range(count)
+        ])
+        try:
+            sync_latencies, sync_elapsed = self.run_sync(count, options['workers'])
+            async_latencies, async_elapsed = asyncio.run(self.run_async(count, options['concurrency']))
+        finally:
+            User.objects.filter(username__startswith='bench-login-').delete()
+
+        self.stdout.write(f'{"mode":<28}{"logins/s":>10}{"p50 ms":>12}{"p99 ms":>12}')
+        self.stdout.write(summarize(f'sync, {options["workers"]} workers', sync_latencies, sync_elapsed))
+        self.stdout.write(summarize(f'async, 1 loop, {options["concurrency"]} in flight', async_latencies, async_elapsed))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.thumbnails import generate_pending
+
+
+class Command(BaseCommand):
+    help = 'Generate profile image thumbnails for newly uploaded images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100, help='Users processed per pass')
+        parser.add_argument('--loop', action='store_true', help='Keep running as a worker')
+        parser.add_argument('--interval', type=int, default=5, help='Seconds between passes with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            done = generate_pending(limit=options['limit'])
+            self.stdout.write(f'Generated thumbnails for {done} user(s)')
+
+            if not options['loop']:
+                break
+            # A full pass means more are waiting; the poll itself is an index-only lookup
+            if done < options['limit']:
+                time.sleep(options['interval'])
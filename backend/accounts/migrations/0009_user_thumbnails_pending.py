@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:50
+
+from django.db import migrations, models
+
+
+def queue_stale(apps, schema_editor):
+    # Users whose thumbnails are missing or belong to an earlier image
+    User = apps.get_model('accounts', 'User')
+    stale = [
+        pk for pk, image, thumbnails in
+        User.objects.exclude(profile_image='').exclude(profile_image__isnull=True)
+        .values_list('id', 'profile_image', 'profile_thumbnails').iterator()
+        if (thumbnails or {}).get('source') != image
+    ]
+    User.objects.filter(id__in=stale).update(profile_thumbnails={}, thumbnails_pending=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_user_candidate_search'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='thumbnails_pending',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('thumbnails_pending', True)), fields=['id'], name='user_thumbs_pending_idx'),
+        ),
+        migrations.RunPython(queue_stale, migrations.RunPython.noop),
+    ]
@@ -12,6 +12,11 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='student')
     phone = models.IntegerField(max_length=15, blank=True, null=True)
     profile_image = models.ImageField(upload_to='profile_images/', blank=True, null=True)
+    # {'source': <profile_image name>, 'small': {'webp': path, 'jpeg': path}, ...}
+    # filled in by accounts.thumbnails; empty while generation is pending
+    profile_thumbnails = models.JSONField(default=dict, blank=True)
+    # Set on save when the thumbnails don't match profile_image (the worker's queue)
+    thumbnails_pending = models.BooleanField(default=False)
     is_verified = models.BooleanField(default=False)
     bio = models.TextField(blank=True, null=True)
 
@@ -26,11 +31,45 @@ class User(AbstractUser):
     student_id = models.CharField(max_length=20, blank=True, null=True)
     course = models.CharField(max_length=10, choices=COURSE_CHOICES, blank=True, null=True)
     year_level = models.IntegerField(blank=True, null=True)
+    skills = models.TextField(blank=True, default='', help_text="e.g., Python, Excel, Customer service")
+    # Students who opt in are listed in the company candidate search (core.candidate_search)
+    open_to_search = models.BooleanField(default=False)
 
     #company field
     company_name = models.CharField(max_length=100, blank=True, null=True)
     company_address = models.TextField(blank=True, null=True)
     company_description = models.TextField(blank=True, null=True)
 
+    # Set (with is_active off) by core.archival.soft_delete_account; the purge job removes the row later
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Eligibility queries select students by course and year level
+            models.Index(fields=['role', 'course', 'year_level'], name='user_role_course_idx'),
+            # Purge queue: only soft-deleted accounts are indexed
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='user_deleted_idx'),
+            # Thumbnail queue, polled by generate_thumbnails --loop
+            models.Index(fields=['id'], condition=models.Q(thumbnails_pending=True), name='user_thumbs_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.username} ({self.role})"
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # A user from the auth cache has only a few fields; the first access to
+        # any other loads all of them at once instead of one query per field
+        if fields is not None and getattr(self, '_partially_loaded', False):
+            self._partially_loaded = False
+            fields = self.get_deferred_fields()
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+
+class RevokedToken(models.Model):
+    """JWT ids revoked by logout or refresh rotation, kept until the token would expire"""
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
     def __str__(self):
-        return f"{self.username} ({self.role})"
\ No newline at end of file
+        return self.jti
@@ -0,0 +1,147 @@
+"""
+JWT revocation for logout and refresh-token rotation.
+
+Revoked ``jti`` values are stored in ``RevokedToken`` (until the token would
+have expired anyway) and mirrored into a per-process Bloom filter, so the
+common "not revoked" answer costs a few hashes and no DB query. A Bloom hit is
+confirmed against the database.
+
+Workers stay in sync through the table itself, not a cache (the default cache
+is per process): at most once per ``TOKEN_REVOCATION['SYNC_SECONDS']`` each
+process loads the rows past the highest id it has seen, an index range scan
+on the primary key. Ids are handed out before commit, so a lower id can become
+visible after a higher one; the holes seen in the id sequence are re-read on
+every sync until they fill in or the next rebuild.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import RevokedToken
+
+# Holes wider than this (a bulk rollback) are only picked up by the rebuild
+MAX_GAP = 1000
+
+
+def get_revocation_settings():
+    config = {
+        'CAPACITY': 100000,
+        'ERROR_RATE': 0.001,
+        'SYNC_SECONDS': 1,
+        'REBUILD_SECONDS': 600,
+    }
+    config.update(getattr(settings, 'TOKEN_REVOCATION', {}))
+    return config
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        # Kirsch-Mitzenmacher: k positions from two hashes
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class RevocationList:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._last_id = 0            # highest RevokedToken id loaded
+        self._gaps = set()           # lower ids not seen yet, maybe uncommitted
+        self._checked_at = 0.0       # monotonic time of the last sync
+        self._rebuilt_at = 0.0
+
+    def _rebuild(self):
+        config = get_revocation_settings()
+        bloom = BloomFilter(config['CAPACITY'], config['ERROR_RATE'])
+        # Read the cursor first: a row committed in between is loaded twice, never skipped
+        last_id = RevokedToken.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        for jti in RevokedToken.objects.filter(expires_at__gt=timezone.now()).values_list('jti', flat=True).iterator():
+            bloom.add(jti)
+        self._filter = bloom
+        self._last_id = last_id
+        self._gaps = set()
+        self._rebuilt_at = time.monotonic()
+
+    def _load_new(self):
+        condition = Q(id__gt=self._last_id)
+        if self._gaps:
+            condition |= Q(id__in=self._gaps)
+        for pk, jti in RevokedToken.objects.filter(condition).order_by('id').values_list('id', 'jti').iterator():
+            self._filter.add(jti)
+            self._gaps.discard(pk)
+            if pk > self._last_id:
+                if pk - self._last_id - 1 <= MAX_GAP:
+                    self._gaps.update(range(self._last_id + 1, pk))
+                self._last_id = pk
+
+    def sync(self, force=False):
+        config = get_revocation_settings()
+        now = time.monotonic()
+        if not force and self._filter is not None and now - self._checked_at < config['SYNC_SECONDS']:
+            return
+        with self._lock:
+            self._checked_at = now
+            if self._filter is None or now - self._rebuilt_at > config['REBUILD_SECONDS']:
+                # Periodic rebuilds drop expired jtis from the filter
+                self._rebuild()
+            else:
+                self._load_new()
+
+    def add(self, jti):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def might_contain(self, jti):
+        self.sync()
+        return jti in self._filter
+
+
+revocation_list = RevocationList()
+
+
+def revoke_token(token):
+    """Revoke a validated simplejwt token (access or refresh)"""
+    jti = token.get('jti')
+    if not jti:
+        return
+    expires_at = datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+    try:
+        RevokedToken.objects.get_or_create(jti=jti, defaults={'expires_at': expires_at})
+    except IntegrityError:
+        pass  # revoked concurrently
+    revocation_list.add(jti)
+
+
+def is_revoked(jti):
+    """Microsecond check for the common case; only Bloom filter hits touch the database"""
+    if not jti or not revocation_list.might_contain(jti):
+        return False
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def prune_expired():
+    """Delete revocations whose tokens have expired. Returns the number removed."""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
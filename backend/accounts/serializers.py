@@ -1,8 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from backend.instrumentation import TimedSerializerMixin
 from .models import User
+from .thumbnails import thumbnail_urls
 
-class UserRegisterSerializer(serializers.ModelSerializer):
+class UserRegisterSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=6)
     confirm_password = serializers.CharField(write_only=True, min_length=6)
     
@@ -33,9 +35,14 @@ class UserRegisterSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data.pop('confirm_password')
         password = validated_data.pop('password')
+        # The async register view hashes off the request thread and passes the result in
+        password_hash = validated_data.pop('password_hash', None)
         
         user = User(**validated_data)
-        user.set_password(password)
+        if password_hash:
+            user.password = password_hash
+        else:
+            user.set_password(password)
         user.save()
         return user
 
@@ -55,17 +62,31 @@ class UserLoginSerializer(serializers.Serializer):
         data['user'] = user
         return data
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    profile_thumbnails = serializers.SerializerMethodField()
+
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'role', 'first_name', 'last_name', 
-                  'phone', 'profile_image', 'is_verified', 'student_id', 'course', 
-                  'year_level', 'company_name', 'company_address', 'company_description',
+                  'phone', 'profile_image', 'profile_thumbnails', 'is_verified', 'student_id', 'course', 
+                  'year_level', 'skills', 'open_to_search', 'company_name', 'company_address', 'company_description',
                   'bio', 'date_joined']
         read_only_fields = ['id', 'username', 'role', 'is_verified', 'date_joined']
+
+    def get_profile_thumbnails(self, obj):
+        return thumbnail_urls(obj)
     
     def validate_email(self, value):
         user = self.instance
         if User.objects.exclude(pk=user.pk).filter(email=value).exists():
             raise serializers.ValidationError("This email is already in use.")
-        return value
\ No newline at end of file
+        return value
+
+
+class CandidateSerializer(UserProfileSerializer):
+    """What companies see of a student in the candidate search (no phone or student ID)"""
+
+    class Meta(UserProfileSerializer.Meta):
+        fields = ['id', 'username', 'email', 'first_name', 'last_name', 'profile_image', 'profile_thumbnails',
+                  'course', 'year_level', 'skills', 'bio']
+        read_only_fields = fields
\ No newline at end of file
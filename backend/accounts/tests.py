@@ -1,3 +1,213 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
 
-# Create your tests here.
+from PIL import Image
+from asgiref.sync import async_to_sync
+from django.contrib.auth.signals import user_login_failed
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import USER_CACHE_KEY, CookieJWTAuthentication
+from .models import RevokedToken, User
+from .revocation import RevocationList, revoke_token
+from .thumbnails import generate_pending, pending_users
+from .views import login_async
+
+
+def authenticate(user=None, token=None):
+    request = RequestFactory().get('/')
+    request.COOKIES['access_token'] = token or str(RefreshToken.for_user(user).access_token)
+    return CookieJWTAuthentication().authenticate(request)
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='ana', password='pw', role='student', email='ana@example.com')
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def test_cache_holds_no_password_hash(self):
+        authenticate(token=self.token)
+
+        cached = cache.get(USER_CACHE_KEY.format(self.user.pk))
+        self.assertNotIn('password', cached)
+        self.assertNotIn(self.user.password, cached.values())
+        self.assertEqual(cached['role'], 'student')
+
+    def test_cached_user_loads_other_fields_in_one_query(self):
+        authenticate(token=self.token)
+
+        with self.assertNumQueries(0):
+            user, _ = authenticate(token=self.token)
+            self.assertEqual((user.pk, user.role, user.is_active), (self.user.pk, 'student', True))
+        with self.assertNumQueries(1):
+            self.assertEqual((user.email, user.first_name, user.course), ('ana@example.com', '', None))
+
+    def test_deactivation_is_seen_at_once(self):
+        authenticate(token=self.token)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(authenticate(token=self.token))
+
+
+class RevocationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='ben', password='pw', role='student')
+
+    def revoke_elsewhere(self, jti, **fields):
+        # A row written by another worker, which this process never saw added
+        return RevokedToken.objects.create(jti=jti, expires_at=timezone.now() + timedelta(hours=1), **fields)
+
+    def test_revoked_access_token_stops_authenticating(self):
+        access = RefreshToken.for_user(self.user).access_token
+        self.assertIsNotNone(authenticate(token=str(access)))
+
+        revoke_token(access)
+
+        self.assertIsNone(authenticate(token=str(access)))
+
+    def test_sync_picks_up_revocations_from_other_workers(self):
+        revocations = RevocationList()
+        revocations.sync(force=True)
+
+        self.revoke_elsewhere('other-worker')
+
+        revocations.sync(force=True)
+        self.assertTrue(revocations.might_contain('other-worker'))
+
+    def test_lower_id_committed_late_is_not_skipped(self):
+        first = self.revoke_elsewhere('first')
+        revocations = RevocationList()
+        revocations.sync(force=True)
+
+        # id first+1 is still in flight when first+2 commits
+        self.revoke_elsewhere('overtaking', id=first.id + 2)
+        revocations.sync(force=True)
+        self.revoke_elsewhere('late', id=first.id + 1)
+        revocations.sync(force=True)
+
+        self.assertTrue(revocations.might_contain('overtaking'))
+        self.assertTrue(revocations.might_contain('late'))
+
+
+class AsyncLoginTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='cy', password='pw', role='student')
+
+    def login(self, body):
+        request = RequestFactory().post('/api/auth/login/', json.dumps(body), content_type='application/json')
+        response = async_to_sync(login_async)(request)
+        return response, json.loads(response.content)
+
+    def test_valid_credentials_set_cookies(self):
+        response, body = self.login({'username': 'cy', 'password': 'pw'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body['user']['id'], self.user.id)
+        self.assertIn('access_token', response.cookies)
+
+    def test_wrong_password_fires_login_failed(self):
+        failed = []
+        user_login_failed.connect(lambda **kwargs: failed.append(kwargs['credentials']['username']), weak=False,
+                                  dispatch_uid='test-login-failed')
+        self.addCleanup(user_login_failed.disconnect, dispatch_uid='test-login-failed')
+
+        response, body = self.login({'username': 'cy', 'password': 'wrong'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(body['non_field_errors'], ['Invalid credentials'])
+        self.assertEqual(failed, ['cy'])
+
+    def test_disabled_account_is_refused_like_a_bad_password(self):
+        self.user.is_active = False
+        self.user.save()
+
+        response, body = self.login({'username': 'cy', 'password': 'pw'})
+        sync_body = self.client.post('/api/auth/login/', {'username': 'cy', 'password': 'pw'}).json()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(body['non_field_errors'], ['Invalid credentials'])
+        self.assertEqual(sync_body['non_field_errors'], ['Invalid credentials'])
+
+    def test_non_object_body_is_rejected(self):
+        response, body = self.login(['cy', 'pw'])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('non_field_errors', body)
+
+
+def image_upload(name, color):
+    buffer = BytesIO()
+    Image.new('RGB', (8, 8), color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ThumbnailQueueTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.user = User.objects.create_user(username='dee', password='pw', role='student')
+
+    def test_new_image_is_queued_and_built(self):
+        self.user.profile_image = image_upload('dee.png', 'red')
+        self.user.save()
+        self.assertEqual(list(pending_users()), [self.user])
+
+        self.assertEqual(generate_pending(), 1)
+
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.thumbnails_pending)
+        self.assertEqual(self.user.profile_thumbnails['source'], self.user.profile_image.name)
+
+    def test_replacing_image_outside_update_profile_requeues(self):
+        self.user.profile_image = image_upload('dee.png', 'red')
+        self.user.save()
+        generate_pending()
+
+        # e.g. the admin form, which never touched profile_thumbnails
+        user = User.objects.get(pk=self.user.pk)
+        user.profile_image = image_upload('dee-2.png', 'blue')
+        user.save()
+
+        user.refresh_from_db()
+        self.assertEqual(user.profile_thumbnails, {})
+        self.assertEqual(list(pending_users()), [user])
+
+    def test_upload_through_update_profile_with_a_cached_user(self):
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(self.user).access_token)
+        self.client.get('/api/auth/profile/')  # fills the auth cache
+        self.assertIsNotNone(cache.get(USER_CACHE_KEY.format(self.user.pk)))
+
+        response = self.client.patch(
+            '/api/auth/profile/update/',
+            encode_multipart(BOUNDARY, {'profile_image': image_upload('dee.png', 'red'), 'bio': 'Hi'}),
+            content_type=MULTIPART_CONTENT,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.profile_image.name)
+        self.assertEqual((user.thumbnails_pending, user.profile_thumbnails, user.bio), (True, {}, 'Hi'))
+        self.assertEqual(generate_pending(), 1)
+
+    def test_unrelated_save_keeps_thumbnails(self):
+        self.user.profile_image = image_upload('dee.png', 'red')
+        self.user.save()
+        generate_pending()
+
+        user = User.objects.get(pk=self.user.pk)
+        user.bio = 'Hello'
+        user.save()
+
+        self.assertFalse(pending_users().exists())
+        self.assertIn('small', User.objects.get(pk=user.pk).profile_thumbnails)
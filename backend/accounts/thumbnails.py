@@ -0,0 +1,125 @@
+"""
+Profile image thumbnails.
+
+Whenever a user is saved with thumbnails that don't belong to its current
+``profile_image`` (a new upload, an admin edit, a cleared image) the
+``pre_save`` hook below drops them and flags the user ``thumbnails_pending``;
+the ``generate_thumbnails`` worker then renders every size in
+``PROFILE_THUMBNAIL_SIZES`` as WebP and JPEG. File names are derived from the
+image content hash, so a URL never changes meaning and can be cached forever.
+"""
+import hashlib
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from PIL import Image, ImageOps
+
+from .authentication import invalidate_cached_user
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {'webp': ('WEBP', {'quality': 80, 'method': 4}), 'jpeg': ('JPEG', {'quality': 82, 'optimize': True})}
+
+
+def render_thumbnails(content):
+    """Write all thumbnail files for the image bytes and return {size name: {format: path}}"""
+    digest = hashlib.sha256(content).hexdigest()[:24]
+    sizes = getattr(settings, 'PROFILE_THUMBNAIL_SIZES', {'small': 64, 'medium': 256})
+    directory = getattr(settings, 'THUMBNAIL_DIR', 'thumbnails/')
+
+    image = ImageOps.exif_transpose(Image.open(BytesIO(content)))
+    image = image.convert('RGB')
+
+    paths = {}
+    for name, size in sizes.items():
+        thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        paths[name] = {}
+        for extension, (image_format, options) in FORMATS.items():
+            path = f'{directory}{digest}-{size}.{extension}'
+            # Same content, same name: identical uploads share files
+            if not default_storage.exists(path):
+                buffer = BytesIO()
+                thumbnail.save(buffer, image_format, **options)
+                default_storage.save(path, ContentFile(buffer.getvalue()))
+            paths[name][extension] = path
+    return paths
+
+
+QUEUE_FIELDS = {'profile_thumbnails', 'thumbnails_pending'}
+
+
+@receiver(pre_save, sender=User)
+def image_changed(sender, instance, update_fields=None, **kwargs):
+    # Saves that leave profile_image alone (e.g. last_login) can't make the thumbnails stale
+    if update_fields is not None and 'profile_image' not in update_fields:
+        return
+    source = instance.profile_image.name if instance.profile_image else ''
+    if (instance.profile_thumbnails or {}).get('source') != source:
+        instance.profile_thumbnails = {}
+        instance.thumbnails_pending = bool(source)
+        # Django saves a user with deferred fields (one from the auth cache) as
+        # update_fields=<loaded fields>, which would drop these two
+        instance._queue_after_save = update_fields is not None and not QUEUE_FIELDS <= set(update_fields)
+
+
+@receiver(post_save, sender=User)
+def queue_after_partial_save(sender, instance, **kwargs):
+    if instance.__dict__.pop('_queue_after_save', False):
+        User.objects.filter(pk=instance.pk).update(
+            profile_thumbnails=instance.profile_thumbnails, thumbnails_pending=instance.thumbnails_pending,
+        )
+
+
+def generate_for_user(user):
+    source = user.profile_image.name
+    try:
+        with user.profile_image.open('rb') as image_file:
+            thumbnails = render_thumbnails(image_file.read())
+    except Exception:
+        logger.warning('Could not build thumbnails for user %s (%s)', user.pk, source, exc_info=True)
+        thumbnails = {'failed': True}
+    thumbnails['source'] = source
+
+    # Only store them if the image wasn't replaced while we were working
+    updated = (
+        User.objects.filter(pk=user.pk, profile_image=source)
+        .update(profile_thumbnails=thumbnails, thumbnails_pending=False)
+    )
+    if updated:
+        invalidate_cached_user(user.pk)
+    return bool(updated)
+
+
+def pending_users():
+    return User.objects.filter(thumbnails_pending=True)
+
+
+def generate_pending(limit=100):
+    """Build thumbnails for up to ``limit`` users waiting for them. Returns how many were done."""
+    done = 0
+    for user in pending_users().order_by('pk')[:limit]:
+        done += generate_for_user(user)
+    return done
+
+
+def thumbnail_urls(user):
+    """{size name: {format: url}} for a user, or None while pending or failed"""
+    return thumbnail_urls_for(user.profile_image.name if user.profile_image else '', user.profile_thumbnails)
+
+
+def thumbnail_urls_for(image_name, thumbnails):
+    """Same as thumbnail_urls, from the raw column values"""
+    thumbnails = thumbnails or {}
+    if not image_name or thumbnails.get('source') != image_name or thumbnails.get('failed'):
+        return None
+    return {
+        name: {extension: default_storage.url(path) for extension, path in formats.items()}
+        for name, formats in thumbnails.items()
+        if isinstance(formats, dict)
+    }
@@ -1,9 +1,15 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if getattr(settings, 'ASYNC_AUTH_VIEWS', False):
+    register_view, login_view = views.register_async, views.login_async
+else:
+    register_view, login_view = views.register, views.login
+
 urlpatterns = [
-    path('register/', views.register, name='register'),
-    path('login/', views.login, name='login'),
+    path('register/', register_view, name='register'),
+    path('login/', login_view, name='login'),
     path('logout/', views.logout, name='logout'),
     path('refresh/', views.refresh_token, name='refresh_token'),
     path('check-auth/', views.check_auth, name='check_auth'),
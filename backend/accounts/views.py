@@ -1,11 +1,21 @@
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes, parser_classes
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.contrib.auth import authenticate
+from django.contrib.auth import aauthenticate, authenticate
+from django.contrib.auth.hashers import make_password
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from asgiref.sync import sync_to_async
+import json
 from .models import User
 from .serializers import UserRegisterSerializer, UserLoginSerializer, UserProfileSerializer
+from .revocation import is_revoked, revoke_token
+from .hashing import HashingBusy, run_hashing
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
@@ -85,6 +95,15 @@ def login(request):
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def logout(request):
+    # Revoke both tokens so copies of the cookies stop working too
+    for token_class, cookie in ((AccessToken, 'access_token'), (RefreshToken, 'refresh_token')):
+        raw_token = request.COOKIES.get(cookie)
+        if raw_token:
+            try:
+                revoke_token(token_class(raw_token))
+            except TokenError:
+                pass
+
     response = Response({'success': True})
     
     # Delete cookies
@@ -103,6 +122,8 @@ def refresh_token(request):
     
     try:
         refresh = RefreshToken(refresh_token)
+        if is_revoked(refresh.get('jti')):
+            return Response({'error': 'Invalid refresh token'}, status=400)
         new_access_token = str(refresh.access_token)
         
         response = Response({'success': True})
@@ -114,6 +135,21 @@ def refresh_token(request):
             samesite='Lax',
             max_age=3600
         )
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                revoke_token(RefreshToken(refresh_token))
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            response.set_cookie(
+                key='refresh_token',
+                value=str(refresh),
+                httponly=True,
+                secure=False,
+                samesite='Lax',
+                max_age=604800
+            )
         
         return response
     except Exception as e:
@@ -146,8 +182,103 @@ def update_profile(request):
         serializer = UserProfileSerializer(user, data = request.data, partial=True)
         if serializer.is_valid():
             if 'profile_image' in request.FILES:
+                # Queued for the generate_thumbnails worker on save (accounts.thumbnails)
                 user.profile_image = request.FILES['profile_image']
 
             serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+
+# Async login/register (served when settings.ASYNC_AUTH_VIEWS is on).
+# Same request/response shape as the views above, but password hashing runs on
+# the bounded pool in accounts.hashing so it never blocks the event loop.
+
+def _set_auth_cookies(response, refresh):
+    response.set_cookie(
+        key='access_token',
+        value=str(refresh.access_token),
+        httponly=True,
+        secure=False,
+        samesite='Lax',
+        max_age=3600
+    )
+    response.set_cookie(
+        key='refresh_token',
+        value=str(refresh),
+        httponly=True,
+        secure=False,
+        samesite='Lax',
+        max_age=604800
+    )
+    return response
+
+
+def _request_data(request):
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+    return request.POST
+
+
+def _busy_response():
+    response = JsonResponse({'error': 'Server is busy, please try again.'}, status=503)
+    response['Retry-After'] = '1'
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def login_async(request):
+    data = _request_data(request)
+    if not isinstance(data, dict):
+        return JsonResponse(
+            {'non_field_errors': [f'Invalid data. Expected a dictionary, but got {type(data).__name__}.']},
+            status=400,
+        )
+
+    errors = {field: ['This field is required.'] for field in ('username', 'password') if not data.get(field)}
+    if errors:
+        return JsonResponse(errors, status=400)
+
+    # Same backends and user_login_failed signal as UserLoginSerializer
+    try:
+        user = await aauthenticate(request, username=data['username'], password=data['password'])
+    except HashingBusy:
+        return _busy_response()
+
+    if not user:
+        return JsonResponse({'non_field_errors': ['Invalid credentials']}, status=400)
+    if not user.is_active:
+        return JsonResponse({'non_field_errors': ['Account is disabled']}, status=400)
+
+    response = JsonResponse({
+        'success': True,
+        'user': UserProfileSerializer(user).data
+    })
+    return _set_auth_cookies(response, RefreshToken.for_user(user))
+
+
+@csrf_exempt
+@require_POST
+async def register_async(request):
+    serializer = UserRegisterSerializer(data=_request_data(request))
+
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=400)
+
+    try:
+        password_hash = await run_hashing(make_password, serializer.validated_data['password'])
+    except HashingBusy:
+        return _busy_response()
+
+    user = await sync_to_async(serializer.save)(password_hash=password_hash)
+
+    response = JsonResponse({
+        'success': True,
+        'user': UserProfileSerializer(user).data
+    }, status=201)
+    return _set_auth_cookies(response, RefreshToken.for_user(user))
@@ -0,0 +1,105 @@
+"""
+Response compression with Accept-Encoding negotiation.
+
+Brotli (when the optional ``brotli`` package is installed) is preferred over
+gzip for clients that accept it. Bodies smaller than
+``COMPRESSION['MIN_SIZE']`` are sent as-is: below roughly a kilobyte the
+encoding overhead and CPU cost outweigh the saved bytes. Only textual content
+types are compressed; images and uploads are already compressed. Like
+Django's ``GZipMiddleware``, gzip output gets a few random bytes to mitigate
+BREACH, and strong ETags are weakened.
+"""
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'image/svg+xml')
+ENCODING_RE = re.compile(r'([a-z*]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+def get_compression_settings():
+    config = {
+        'MIN_SIZE': 1024,
+        'BROTLI_QUALITY': 4,
+        'BROTLI': True,
+    }
+    config.update(getattr(settings, 'COMPRESSION', {}))
+    return config
+
+
+def accepted_encodings(header):
+    """{encoding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for part in header.lower().split(','):
+        match = ENCODING_RE.match(part.strip())
+        if match:
+            accepted[match.group(1)] = float(match.group(2) or 1)
+    return accepted
+
+
+def choose_encoding(header, brotli_enabled):
+    accepted = accepted_encodings(header)
+    candidates = (['br'] if brotli_enabled and brotli is not None else []) + ['gzip']
+    best = max(candidates, key=lambda encoding: accepted.get(encoding, accepted.get('*', 0)))
+    return best if accepted.get(best, accepted.get('*', 0)) > 0 else None
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.config = get_compression_settings()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if response.has_header('Content-Encoding') or not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < self.config['MIN_SIZE']:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.config['BROTLI'])
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if encoding != 'gzip' or response.is_async:
+                return response  # only sync gzip streams are worth the complexity
+            response.streaming_content = compress_sequence(response.streaming_content, max_random_bytes=self.max_random_bytes)
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, quality=self.config['BROTLI_QUALITY'])
+            else:
+                compressed = compress_string(response.content, max_random_bytes=self.max_random_bytes)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,98 @@
+"""
+Read/write splitting between the primary database and read replicas.
+
+``ReplicaRoutingMiddleware`` marks safe requests to the read-heavy endpoints
+listed in ``REPLICA_READ_URL_NAMES``; while a request is marked,
+``ReplicaRouter`` sends its reads to a replica. Every write goes to
+``default``. After a client writes, a short-lived cookie keeps that client's
+reads on the primary so it always sees its own changes (read-your-writes).
+"""
+import itertools
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'db_pin_primary'
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+_replica_cycle = None
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+def _next_replica():
+    global _replica_cycle
+    if _replica_cycle is None:
+        _replica_cycle = itertools.cycle(replica_aliases())
+    return next(_replica_cycle)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get() and replica_aliases():
+            return _next_replica()
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _read_from_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+        return self._pin_after_write(request, response)
+
+    async def __acall__(self, request):
+        # process_view runs through sync_to_async, which copies its context
+        # changes back, so the flag it sets is seen by the view's queries
+        token = _read_from_replica.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+        return self._pin_after_write(request, response)
+
+    def _pin_after_write(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'READ_YOUR_WRITES_SECONDS', 5),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in ('GET', 'HEAD')
+            and PIN_COOKIE not in request.COOKIES
+            and request.resolver_match.url_name in getattr(settings, 'REPLICA_READ_URL_NAMES', ())
+        ):
+            _read_from_replica.set(True)
+        return None
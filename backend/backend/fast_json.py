@@ -0,0 +1,97 @@
+"""
+Fast JSON renderer and parser for DRF.
+
+Uses orjson when installed, else msgspec, else falls back to DRF's stdlib
+``json`` implementation, so the optional dependency can be missing in a
+development environment. With orjson, output matches ``JSONRenderer``'s
+compact UTF-8 form, except that U+2028/U+2029 aren't escaped: values it can't
+encode natively (Decimal, lazy strings, querysets...) and datetimes, dates and
+times go through DRF's ``JSONEncoder.default``, so a UTC datetime is written
+``...T10:00:00.123Z`` as DRF does, not with orjson's ``+00:00`` and
+microseconds. msgspec encodes those types itself (RFC 3339 with ``Z``, full
+microseconds). Serializer fields already hand over strings, so this only
+shows for raw values in a response. Indented output for the browsable API
+still uses the stdlib encoder.
+"""
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .instrumentation import TimedJSONRenderer, timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+_default = JSONEncoder().default
+DECODE_ERRORS = (ValueError,) + ((msgspec.DecodeError,) if msgspec is not None else ())
+
+
+def _orjson_dumps(data):
+    # Lists and dicts from DRF are ReturnList/ReturnDict subclasses, which orjson encodes as-is
+    return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+if msgspec is not None:
+    _msgspec_encoder = msgspec.json.Encoder(enc_hook=_default)
+    _msgspec_decoder = msgspec.json.Decoder()
+
+
+def get_backend():
+    preferred = getattr(settings, 'FAST_JSON_BACKEND', None)
+    if preferred == 'orjson' or (preferred is None and orjson is not None):
+        return 'orjson' if orjson is not None else 'json'
+    if preferred == 'msgspec' or (preferred is None and msgspec is not None):
+        return 'msgspec' if msgspec is not None else 'json'
+    return 'json'
+
+
+def dumps(data, backend=None):
+    backend = backend or get_backend()
+    if backend == 'orjson':
+        return _orjson_dumps(data)
+    if backend == 'msgspec':
+        return _msgspec_encoder.encode(data)
+    return JSONRenderer().render(data)
+
+
+def loads(content, backend=None):
+    backend = backend or get_backend()
+    if backend == 'orjson':
+        return orjson.loads(content)
+    if backend == 'msgspec':
+        return _msgspec_decoder.decode(content)
+    return json.loads(content)
+
+
+class FastJSONRenderer(TimedJSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        backend = get_backend()
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if backend == 'json' or indent or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        with timed('render'):
+            return dumps(data, backend)
+
+
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        backend = get_backend()
+        if backend == 'json' or stream is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return loads(stream.read(), backend)
+        except DECODE_ERRORS as exc:
+            raise ParseError(f'JSON parse error - {exc}')
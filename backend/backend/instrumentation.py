@@ -0,0 +1,282 @@
+"""
+Per-request performance instrumentation.
+
+``ServerTimingMiddleware`` samples a share of requests
+(``INSTRUMENTATION['SAMPLE_RATE']``) and, for those, records DB query count and
+time, serializer time (serializers using ``TimedSerializerMixin``), render time
+and auth time. The breakdown is sent back as a ``Server-Timing`` header (with
+DEBUG on or to staff users only) and aggregated into per-endpoint histograms, which
+``metrics_view`` exposes in the Prometheus text format. Every request, sampled
+or not, is counted in the request duration histogram.
+
+The hooks are cheap when a request isn't sampled: the query wrapper and
+``timed`` only look up a context variable. Histograms are per process, so
+scrape every worker (or run one worker per metrics target).
+"""
+import bisect
+import hmac
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+PHASES = ('db', 'serializer', 'render', 'auth')
+
+_timings = ContextVar('request_timings', default=None)
+
+
+def get_instrumentation_settings():
+    config = {
+        'ENABLED': True,
+        'SAMPLE_RATE': 1.0,
+        'SERVER_TIMING': True,
+        'METRICS_TOKEN': '',
+        'DURATION_BUCKETS': [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],
+        'QUERY_BUCKETS': [0, 1, 2, 5, 10, 20, 50, 100],
+    }
+    config.update(getattr(settings, 'INSTRUMENTATION', {}))
+    return config
+
+
+class RequestTimings:
+    __slots__ = ('durations', 'queries')
+
+    def __init__(self):
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+
+    def server_timing(self, total):
+        entries = [f'{phase};dur={self.durations[phase] * 1000:.1f}' for phase in PHASES]
+        entries[0] += f';desc="{self.queries} queries"'
+        entries.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(entries)
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to ``phase`` of the current sampled request"""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.durations[phase] += time.perf_counter() - started
+
+
+def record_query(execute, sql, params, many, context):
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.durations['db'] += time.perf_counter() - started
+        timings.queries += 1
+
+
+@receiver(connection_created)
+def install_query_wrapper(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = list(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Bucket counts (the last one is +Inf), sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        for labels, (counts, total) in sorted(series.items()):
+            label_text = ','.join(f'{key}="{value}"' for key, value in labels)
+            cumulative = 0
+            for bound, count in zip([*self.buckets, '+Inf'], counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return '\n'.join(lines)
+
+
+class Registry:
+    def __init__(self):
+        config = get_instrumentation_settings()
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Request duration by endpoint, method and status class',
+            config['DURATION_BUCKETS'],
+        )
+        self.phase_duration = Histogram(
+            'http_request_phase_seconds', 'Time spent in db, serializer, render and auth (sampled requests)',
+            config['DURATION_BUCKETS'],
+        )
+        self.db_queries = Histogram(
+            'http_request_db_queries', 'Database queries per request (sampled requests)', config['QUERY_BUCKETS'],
+        )
+
+    def render(self):
+        return '\n'.join(
+            histogram.render() for histogram in (self.request_duration, self.phase_duration, self.db_queries)
+        ) + '\n'
+
+
+registry = None
+
+
+def get_registry():
+    global registry
+    if registry is None:
+        registry = Registry()
+    return registry
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed('serializer'):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """
+    Time ``.data``, where DRF turns instances into primitives, as the
+    ``serializer`` phase. Nested serializers don't go through ``.data``, so only
+    the outermost one is counted; ``many=True`` gets ``TimedListSerializer``
+    unless the Meta names another list serializer.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        meta = cls.__dict__.get('Meta')
+        if meta is not None and not hasattr(meta, 'list_serializer_class'):
+            meta.list_serializer_class = TimedListSerializer
+
+    @property
+    def data(self):
+        with timed('serializer'):
+            return super().data
+
+
+class TimedJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('render'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class ServerTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.config = get_instrumentation_settings()
+        self.registry = get_registry()
+        # Connections opened before the middleware loaded missed connection_created
+        for connection in connections.all(initialized_only=True):
+            install_query_wrapper(None, connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.config['ENABLED']:
+            return self.get_response(request)
+
+        timings, token, started = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        total = time.perf_counter() - started
+        show = timings is not None and self._show_timing(request)
+        return self._finish(request, response, timings, total, show)
+
+    async def __acall__(self, request):
+        if not self.config['ENABLED']:
+            return await self.get_response(request)
+
+        # The views' sync_to_async threads copy the context, so they record into the same timings
+        timings, token, started = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        total = time.perf_counter() - started
+        # request.user may still be the lazy session user, which can't load on the event loop
+        show = timings is not None and await sync_to_async(self._show_timing)(request)
+        return self._finish(request, response, timings, total, show)
+
+    def _start(self):
+        sampled = random.random() < self.config['SAMPLE_RATE']
+        timings = RequestTimings() if sampled else None
+        return timings, _timings.set(timings), time.perf_counter()
+
+    def _show_timing(self, request):
+        """The header exposes internals (query counts, auth time), so only to developers"""
+        if not self.config['SERVER_TIMING']:
+            return False
+        user = getattr(request, 'user', None)
+        return settings.DEBUG or bool(user is not None and user.is_staff)
+
+    def _finish(self, request, response, timings, total, show_timing):
+        match = request.resolver_match
+        endpoint = (match.url_name or match.route) if match else 'unmatched'
+        self.registry.request_duration.observe(
+            (('endpoint', endpoint), ('method', request.method), ('status', f'{response.status_code // 100}xx')), total,
+        )
+        if timings is not None:
+            for phase in PHASES:
+                self.registry.phase_duration.observe((('endpoint', endpoint), ('phase', phase)), timings.durations[phase])
+            self.registry.db_queries.observe((('endpoint', endpoint),), timings.queries)
+            if show_timing:
+                response['Server-Timing'] = timings.server_timing(total)
+        return response
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition; needs ``Authorization: Bearer <METRICS_TOKEN>``
+    or a staff session. Without a METRICS_TOKEN the endpoint only exists with
+    DEBUG on.
+    """
+    token = get_instrumentation_settings()['METRICS_TOKEN']
+    if not token and not settings.DEBUG:
+        raise Http404
+    supplied = request.headers.get('Authorization', '')
+    authorized = (
+        (token and hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()))
+        or (request.user.is_authenticated and request.user.is_staff)
+    )
+    if not authorized:
+        return HttpResponseForbidden()
+    return HttpResponse(get_registry().render(), content_type='text/plain; version=0.0.4; charset=utf-8')
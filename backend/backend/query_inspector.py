@@ -0,0 +1,206 @@
+"""
+Opt-in N+1 and slow-query detector (``QUERY_INSPECTOR['ENABLED']``).
+
+While a request (or an ``inspect_queries()`` block) runs, every SQL statement
+is reduced to a fingerprint (literals, parameters and IN lists stripped) and
+counted. A fingerprint repeated ``N_PLUS_ONE_THRESHOLD`` times or more is
+reported with the Python stack that issued it, which is usually a serializer
+method or admin column doing one query per row. Queries slower than
+``SLOW_QUERY_MS`` are logged with their stack too.
+
+Reports go to the ``backend.queries`` logger. With ``STRICT`` on they raise
+``QueryProblem`` instead, so a test that introduces an N+1 fails right there.
+"""
+import logging
+import re
+import sys
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger('backend.queries')
+
+_inspection = ContextVar('query_inspection', default=None)
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+WHITESPACE = re.compile(r'\s+')
+
+
+class QueryProblem(Exception):
+    """Raised in strict mode when a request repeats a query or runs a slow one"""
+
+
+def get_query_inspector_settings():
+    config = {
+        'ENABLED': False,
+        'STRICT': False,
+        'N_PLUS_ONE_THRESHOLD': 5,
+        'SLOW_QUERY_MS': 200,
+        'STACK_DEPTH': 8,
+        # Fingerprints containing any of these are never reported
+        'IGNORE': ['django_session', 'django_migrations'],
+    }
+    config.update(getattr(settings, 'QUERY_INSPECTOR', {}))
+    return config
+
+
+def fingerprint(sql):
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = IN_LIST.sub('IN (...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def project_stack(depth):
+    """
+    The innermost ``depth`` frames from app code (not Django, DRF or this
+    project's middleware), plus the serializer fields being rendered, since
+    nested serializers query without any app frame on the stack.
+    """
+    apps_root = str(settings.BASE_DIR)
+    middleware_root = str(Path(__file__).resolve().parent)
+    frames = [
+        frame for frame in traceback.extract_stack()[:-3]
+        if frame.filename.startswith(apps_root) and not frame.filename.startswith(middleware_root)
+    ]
+    stack = ''.join(traceback.format_list(frames[-depth:]))
+    path = serializer_path()
+    return f'{stack}  Serializing: {path}\n' if path else stack
+
+
+def serializer_path():
+    """e.g. 'ApplicationSerializer.listing_details > OJTListingSerializer.company_details'"""
+    fields = []
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_name == 'to_representation' and 'rest_framework' in frame.f_code.co_filename:
+            serializer, field = frame.f_locals.get('self'), frame.f_locals.get('field')
+            if serializer is not None and field is not None:
+                fields.append(f'{type(serializer).__name__}.{field.field_name}')
+        frame = frame.f_back
+    return ' > '.join(reversed(fields))
+
+
+class Inspection:
+    def __init__(self, label, config):
+        self.label = label
+        self.config = config
+        self.counts = Counter()
+        self.stacks = {}
+        self.slow = []
+
+    def ignored(self, key):
+        return any(pattern in key for pattern in self.config['IGNORE'])
+
+    def record(self, sql, duration):
+        key = fingerprint(sql)
+        self.counts[key] += 1
+        # Only the call that crosses the threshold pays for a stack
+        if self.counts[key] == self.config['N_PLUS_ONE_THRESHOLD'] and not self.ignored(key):
+            self.stacks[key] = project_stack(self.config['STACK_DEPTH'])
+        if duration * 1000 >= self.config['SLOW_QUERY_MS'] and not self.ignored(key):
+            self.slow.append((key, duration, project_stack(self.config['STACK_DEPTH'])))
+
+    def problems(self):
+        found = [
+            f'{count} x {key}\n{self.stacks[key]}'
+            for key, count in self.counts.most_common() if key in self.stacks
+        ]
+        found += [f'slow ({duration * 1000:.0f} ms): {key}\n{stack}' for key, duration, stack in self.slow]
+        return found
+
+    def report(self):
+        for key, count in self.counts.most_common():
+            if key in self.stacks:
+                logger.warning(
+                    'Possible N+1 in %s: %d identical queries\n  %s\n%s', self.label, count, key, self.stacks[key],
+                )
+        for key, duration, stack in self.slow:
+            logger.warning('Slow query in %s (%.0f ms)\n  %s\n%s', self.label, duration * 1000, key, stack)
+        if self.config['STRICT'] and (self.stacks or self.slow):
+            raise QueryProblem(f'Query problems in {self.label}:\n' + '\n'.join(self.problems()))
+
+
+def record_query(execute, sql, params, many, context):
+    inspection = _inspection.get()
+    if inspection is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        inspection.record(sql, time.perf_counter() - started)
+
+
+@receiver(connection_created)
+def install_query_wrapper(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def inspect_queries(label='block', **overrides):
+    """
+    Inspect the queries run inside the block, e.g. in a test:
+
+        with inspect_queries('application list', STRICT=True):
+            client.get('/api/applications/')
+    """
+    config = {**get_query_inspector_settings(), **overrides}
+    for connection in connections.all(initialized_only=True):
+        install_query_wrapper(None, connection)
+    inspection = Inspection(label, config)
+    token = _inspection.set(inspection)
+    try:
+        yield inspection
+    finally:
+        _inspection.reset(token)
+    inspection.report()
+
+
+class QueryInspectorMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        config = get_query_inspector_settings()
+        if not config['ENABLED'] or _inspection.get() is not None:
+            return self.get_response(request)
+        with inspect_queries(f'{request.method} {request.path}') as inspection:
+            response = self.get_response(request)
+            _flag_problems(response, inspection)
+        return response
+
+    async def __acall__(self, request):
+        config = get_query_inspector_settings()
+        if not config['ENABLED'] or _inspection.get() is not None:
+            return await self.get_response(request)
+        with inspect_queries(f'{request.method} {request.path}') as inspection:
+            response = await self.get_response(request)
+            _flag_problems(response, inspection)
+        return response
+
+
+def _flag_problems(response, inspection):
+    if inspection.stacks or inspection.slow:
+        response['X-Query-Problems'] = str(len(inspection.stacks) + len(inspection.slow))
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 from pathlib import Path
 import os
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -31,9 +32,18 @@ ALLOWED_HOSTS = []
 
 AUTH_USER_MODEL = 'accounts.User'
 
+# Django's ModelBackend; its async path hashes on the PASSWORD_HASHING pool
+AUTHENTICATION_BACKENDS = ['accounts.backends.ModelBackend']
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Square profile thumbnails generated by `manage.py generate_thumbnails`.
+# They are stored under THUMBNAIL_DIR with content-hashed names, so the web
+# server/CDN can serve that prefix with `Cache-Control: immutable`.
+PROFILE_THUMBNAIL_SIZES = {'small': 64, 'medium': 256}
+THUMBNAIL_DIR = 'thumbnails/'
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
@@ -46,10 +56,14 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ),
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'backend.fast_json.FastJSONParser',
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend.fast_json.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 
@@ -66,6 +80,48 @@ SIMPLE_JWT = {
 }
 
 
+# Cache
+# Local memory by default; point at Redis/Memcached to share across workers
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ojt-tracker',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# Seconds an authenticated user (id, role and flags only) stays cached by
+# CookieJWTAuthentication. Saving a user clears its entry, but with the
+# per-process cache above only in that worker: use a shared cache with more
+# than one worker, or 0 to turn the user cache off (check accounts.W001).
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Revoked JWT ids are checked against an in-memory Bloom filter
+# (accounts.revocation); workers re-sync from the table every SYNC_SECONDS
+TOKEN_REVOCATION = {
+    'CAPACITY': 100000,
+    'ERROR_RATE': 0.001,
+    'SYNC_SECONDS': 1,
+    'REBUILD_SECONDS': 600,
+}
+
+# Serve login/register from the async views and hash passwords on a bounded
+# pool; past MAX_QUEUE waiting hashes requests get a 503. Off by default: only
+# worth it when serving through backend.asgi (ASYNC_AUTH_VIEWS=1)
+ASYNC_AUTH_VIEWS = os.environ.get('ASYNC_AUTH_VIEWS', '0') == '1'
+
+# Serve the listing feed/detail, notification list and dashboard stats from the
+# async views in core.async_views. Off by default: under backend.wsgi async
+# views only add overhead; turn on (ASYNC_READ_VIEWS=1) with backend.asgi
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', '0') == '1'
+
+PASSWORD_HASHING = {
+    'WORKERS': os.cpu_count() or 2,
+    'MAX_QUEUE': 64,
+}
+
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -83,6 +139,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.instrumentation.ServerTimingMiddleware',
+    'backend.compression.CompressionMiddleware',
+    'backend.query_inspector.QueryInspectorMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -91,6 +150,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'backend.db_router.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -101,6 +161,9 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
+
 CSRF_COOKIE_SAMESITE = 'Lax'
 SESSION_COOKIE_SAMESITE = 'Lax'
 CSRF_COOKIE_HTTPONLY = False  # Should be False for JavaScript access
@@ -127,13 +190,53 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+SQLITE_OPTIONS = {
+    # WAL lets readers run while a write is in progress
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA busy_timeout=5000;'
+        'PRAGMA cache_size=-20000;'
+        'PRAGMA temp_store=MEMORY;'
+    ),
+    'transaction_mode': 'IMMEDIATE',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS,
+        # Reuse connections across requests instead of reconnecting every time
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replicas, e.g. DB_REPLICAS=replica1.sqlite3,replica2.sqlite3 to try the
+# routing locally with extra SQLite files (kept in sync by whatever replicates
+# the primary). Reads from REPLICA_READ_URL_NAMES endpoints go to them.
+for index, replica_name in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / replica_name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['backend.db_router.ReplicaRouter']
+
+REPLICA_READ_URL_NAMES = [
+    'listings-list',
+    'listings-detail',
+    'company-stats',
+    'student-stats',
+    'notifications-list',
+    'notification-stats',
+]
+
+# After a write, the client's reads stay on the primary for this long
+READ_YOUR_WRITES_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -170,3 +273,107 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
+
+
+# Email
+# Notification emails are sent in batches by `manage.py send_notification_emails`
+
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'OJT Tracker <no-reply@ojt-tracker.local>')
+
+NOTIFICATION_EMAIL = {
+    'BATCH_SIZE': 200,
+    'MAX_RETRIES': 3,
+    'RETRY_BACKOFF_SECONDS': 2,
+    # A user with at least this many pending notifications gets one digest email
+    'DIGEST_MIN': 3,
+}
+
+
+# Store dashboard stats per user and refresh them on application/listing
+# changes instead of aggregating on every dashboard load
+DASHBOARD_STATS_MATERIALIZED = False
+
+
+# Students who haven't applied are reminded this many days before a deadline
+# (`manage.py send_deadline_reminders`, run daily)
+DEADLINE_REMINDER_DAYS = [7, 3, 1]
+
+
+# Notification retention
+# Read notifications older than their type's TTL are moved to
+# core_notificationarchive; bursts of the same type are folded into one digest.
+
+NOTIFICATION_RETENTION = {
+    'DEFAULT_TTL_DAYS': 180,
+    'TTL_DAYS': {
+        'system_announcement': 30,
+        'deadline_reminder': 14,
+        'listing_closed': 60,
+        'new_application': 90,
+    },
+    'CHUNK_SIZE': 1000,
+    'DIGEST_TYPES': ['new_application', 'application_submitted', 'listing_closed'],
+    'DIGEST_THRESHOLD': 5,
+    # Only fold bursts older than this so in-flight ones can finish
+    'DIGEST_SETTLE_MINUTES': 60,
+    # ...and no older than this, so a run doesn't rescan all history
+    'DIGEST_LOOKBACK_DAYS': 7,
+}
+
+# Application and listing creation accept an Idempotency-Key header; retries
+# are answered from the stored response (core.idempotency). Expired keys are
+# removed by `manage.py prune_idempotency_keys`.
+IDEMPOTENCY = {
+    'TTL_HOURS': 24,
+}
+
+# Deleted listings and accounts are soft-deleted by the request and purged in
+# chunks by `manage.py purge_and_archive` (run from cron); see core.archival
+ARCHIVAL = {
+    'CHUNK_SIZE': 500,
+    'PURGE_AFTER_MINUTES': 0,
+    # Listings whose OJT ended this long ago move to the archive tables
+    'TERM_ARCHIVE_AFTER_DAYS': 365,
+    'TERM_ARCHIVE_STATUSES': ['filled', 'closed', 'ongoing'],
+}
+
+
+# Unpaginated list GETs (listings, applications) build their JSON from
+# .values() rows instead of model instances; see core.fast_serializers
+FAST_LIST_SERIALIZATION = True
+
+# API JSON is encoded with orjson (or msgspec) when installed; set
+# FAST_JSON_BACKEND = 'json' to force the stdlib encoder.
+FAST_JSON_BACKEND = None
+
+# Responses are compressed with brotli (if installed) or gzip; small bodies
+# aren't worth it.
+COMPRESSION = {
+    'MIN_SIZE': 1024,
+    'BROTLI_QUALITY': 4,
+}
+
+
+# Per-request timing (Server-Timing header) and Prometheus metrics at /metrics/.
+# Only SAMPLE_RATE of requests get the db/serializer/render/auth breakdown,
+# sent as Server-Timing with DEBUG on or to staff users only; scrapers
+# authenticate with "Authorization: Bearer <METRICS_TOKEN>". Without a token,
+# /metrics/ is a 404 unless DEBUG is on.
+INSTRUMENTATION = {
+    'ENABLED': True,
+    'SAMPLE_RATE': float(os.environ.get('INSTRUMENTATION_SAMPLE_RATE', '1')),
+    'SERVER_TIMING': True,
+    'METRICS_TOKEN': os.environ.get('METRICS_TOKEN', ''),
+}
+
+
+# N+1 and slow-query detector (backend.query_inspector). Off by default; turn
+# it on in development with QUERY_INSPECTOR=1, and QUERY_INSPECTOR_STRICT=1
+# makes offending requests raise instead of only logging.
+QUERY_INSPECTOR = {
+    'ENABLED': os.environ.get('QUERY_INSPECTOR', '0') == '1',
+    'STRICT': os.environ.get('QUERY_INSPECTOR_STRICT', '0') == '1',
+    'N_PLUS_ONE_THRESHOLD': 5,
+    'SLOW_QUERY_MS': 200,
+}
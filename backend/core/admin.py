@@ -1,13 +1,23 @@
-from django.contrib import admin
-from .models import OJTListing, Application
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from .admin_tools import AutocompleteFilter, LargeTableAdmin, SoftDeleteMixin, update_in_chunks
+from .archival import soft_delete_listing
+from .models import OJTListing, Application, Notification
+from .retention import archive_notifications
 # Register your models here.
 
 @admin.register(OJTListing)
-class OJTListingAdmin(admin.ModelAdmin):
-    list_display = ('title', 'company_name', 'ojt_type', 'location', 'status', 'application_deadline')
-    list_filter = ('status', 'ojt_type', 'course_requirement', 'work_setup')
-    search_fields = ('title', 'company__company_name', 'description')
-    readonly_fields = ('created_at', 'updated_at', 'duration_months')
+class OJTListingAdmin(SoftDeleteMixin, LargeTableAdmin):
+    # company_name is the listing's own snapshot column, so rows need no join
+    list_display = ('title', 'company_name', 'ojt_type', 'location', 'status', 'application_deadline', 'deleted_at')
+    list_filter = (
+        'status', 'ojt_type', 'course_requirement', 'work_setup', ('company', AutocompleteFilter),
+        ('deleted_at', admin.EmptyFieldListFilter),
+    )
+    search_fields = ('title', 'company_name', 'description')
+    autocomplete_fields = ('company',)
+    readonly_fields = ('created_at', 'updated_at', 'deleted_at', 'duration_months')
     fieldsets = (
         ('Basic Information', {
             'fields': ('company', 'title', 'description', 'responsibilities', 'learning_outcomes')
@@ -22,15 +32,26 @@ class OJTListingAdmin(admin.ModelAdmin):
             'fields': ('slots_available', 'allowance', 'has_allowance', 'start_date', 'end_date', 'application_deadline')
         }),
         ('Status', {
-            'fields': ('status', 'created_at', 'updated_at')
+            'fields': ('status', 'created_at', 'updated_at', 'deleted_at')
         }),
     )
 
+    def get_queryset(self, request):
+        # Soft-deleted listings stay visible here until the purge job removes them
+        return OJTListing.all_objects.all()
+
+    def soft_delete(self, obj):
+        soft_delete_listing(obj)
+
 @admin.register(Application)
-class ApplicationAdmin(admin.ModelAdmin):
+class ApplicationAdmin(LargeTableAdmin):
     list_display = ('student', 'listing_title', 'status', 'applied_at')
-    list_filter = ('status', 'listing__company', 'applied_at')
+    list_select_related = ('student', 'listing')
+    list_filter = (
+        'status', ('listing__company', AutocompleteFilter), ('listing', AutocompleteFilter), 'applied_at',
+    )
     search_fields = ('student__username', 'student__first_name', 'listing__title')
+    autocomplete_fields = ('student', 'listing')
     readonly_fields = ('applied_at', 'updated_at')
     fieldsets = (
         ('Application Details', {
@@ -47,3 +68,41 @@ class ApplicationAdmin(admin.ModelAdmin):
     def listing_title(self, obj):
         return obj.listing.title
     listing_title.short_description = 'OJT Position'
+
+
+@admin.register(Notification)
+class NotificationAdmin(LargeTableAdmin):
+    list_display = ('title', 'user', 'notification_type', 'is_read', 'is_email_sent', 'created_at')
+    list_select_related = ('user',)
+    list_filter = ('notification_type', 'is_read', 'is_email_sent', ('user', AutocompleteFilter), 'created_at')
+    search_fields = ('title', '=user__username')
+    search_help_text = 'Title, or the exact username'
+    autocomplete_fields = ('user',)
+    readonly_fields = ('created_at', 'updated_at')
+    actions = ('mark_read', 'mark_unread', 'archive')
+
+    def get_actions(self, request):
+        # delete_selected renders every row it would delete; archive instead
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(description='Mark selected notifications as read')
+    def mark_read(self, request, queryset):
+        # update() bypasses auto_now, so bump updated_at for delta sync clients
+        updated = update_in_chunks(
+            queryset.filter(is_read=False), self.update_chunk_size, is_read=True, updated_at=timezone.now(),
+        )
+        self.message_user(request, f'{updated} notification(s) marked as read.', messages.SUCCESS)
+
+    @admin.action(description='Mark selected notifications as unread')
+    def mark_unread(self, request, queryset):
+        updated = update_in_chunks(
+            queryset.filter(is_read=True), self.update_chunk_size, is_read=False, updated_at=timezone.now(),
+        )
+        self.message_user(request, f'{updated} notification(s) marked as unread.', messages.SUCCESS)
+
+    @admin.action(description='Archive selected notifications', permissions=['delete'])
+    def archive(self, request, queryset):
+        archived = archive_notifications(queryset)
+        self.message_user(request, f'{archived} notification(s) archived.', messages.SUCCESS)
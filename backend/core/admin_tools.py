@@ -0,0 +1,172 @@
+"""
+Admin building blocks for tables with millions of rows.
+
+- ``EstimatedCountPaginator`` takes an unfiltered changelist's row count from
+  the planner statistics instead of ``COUNT(*)``
+- ``AutocompleteFilter`` is a sidebar filter on a foreign key that searches
+  the related model over AJAX instead of listing every row of it
+- ``LargeTableAdmin`` is a ModelAdmin with both wired in and the other
+  whole-table queries (full result count, facets) switched off
+- ``SoftDeleteMixin`` makes the delete view and action soft-delete, leaving
+  the dependents to the background purge (core.archival)
+- ``update_in_chunks`` runs a bulk admin action as a series of short UPDATEs
+"""
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.utils import get_last_value_from_parameters
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+# Below this many rows an exact COUNT(*) is cheap and the estimate isn't worth its error
+ESTIMATE_ABOVE = 100000
+
+# Rows per UPDATE in bulk admin actions
+UPDATE_CHUNK_SIZE = 1000
+
+
+def estimated_row_count(model, using):
+    """The planner's row count for ``model``'s table, or None when there are no statistics"""
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            elif connection.vendor == 'mysql':
+                cursor.execute(
+                    'SELECT table_rows FROM information_schema.tables '
+                    'WHERE table_schema = DATABASE() AND table_name = %s', [table],
+                )
+            elif connection.vendor == 'sqlite':
+                # Filled in by ANALYZE / PRAGMA optimize; each stat starts with the rows it covers
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table])
+                counts = [int(stat.split()[0]) for stat, in cursor.fetchall()]
+                return max(counts) if counts else None
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        # e.g. sqlite_stat1 doesn't exist until the first ANALYZE
+        return None
+    # PostgreSQL reports -1 for a table that has never been analyzed
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+def update_in_chunks(queryset, chunk_size, **values):
+    """One short UPDATE per chunk of primary keys, so a select-all action doesn't hold a long write lock"""
+    manager = queryset.model._base_manager
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    updated, last_pk = 0, None
+    while True:
+        chunk = list((pks if last_pk is None else pks.filter(pk__gt=last_pk))[:chunk_size])
+        if not chunk:
+            return updated
+        updated += manager.filter(pk__in=chunk).update(**values)
+        last_pk = chunk[-1]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the planner's estimate when the changelist isn't filtered and the
+    table is big; filtered changelists still count exactly, over the
+    indexes their filters use.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if hasattr(queryset, 'query') and not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= ESTIMATE_ABOVE:
+                return estimate
+        return super().count
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Filter on a foreign key through the admin's select2 autocomplete, e.g.
+    ``list_filter = [('listing__company', AutocompleteFilter)]``. The related
+    model's admin needs ``search_fields``.
+    """
+    template = 'admin/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        self.lookup_val = get_last_value_from_parameters(params, self.lookup_kwarg)
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.title = getattr(field, 'verbose_name', field_path)
+        self.admin_site = model_admin.admin_site
+
+    def has_output(self):
+        return True
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.lookup_val is None,
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg]),
+            'display': 'All',
+        }
+
+    @property
+    def rendered_widget(self):
+        related = self.field.remote_field
+        form_field = forms.ModelChoiceField(
+            queryset=related.model._default_manager.all(),
+            to_field_name=related.field_name,
+            widget=AutocompleteSelect(self.field, self.admin_site, attrs={'style': 'width: 100%'}),
+            required=False,
+        )
+        return form_field.widget.render(self.lookup_kwarg, self.lookup_val)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    update_chunk_size = UPDATE_CHUNK_SIZE
+    # "N results (M total)" would run a second, unfiltered COUNT(*)
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+    @property
+    def media(self):
+        media = super().media
+        if any(isinstance(spec, tuple) and spec[1] is AutocompleteFilter for spec in self.list_filter):
+            media += AutocompleteSelect(None, self.admin_site).media
+            media += forms.Media(js=['core/admin/autocomplete_filter.js'])
+        return media
+
+
+class SoftDeleteMixin:
+    """
+    Deletes by setting ``deleted_at``. The confirmation page lists only the
+    selected objects: collecting every dependent row is the expensive part the
+    purge job does later, in chunks.
+
+    Override ``soft_delete(obj)`` when deleting takes more than the timestamp
+    (deactivating an account, say); the delete action then calls it per
+    object instead of updating the selection in chunks.
+    """
+    update_chunk_size = UPDATE_CHUNK_SIZE
+
+    def soft_delete(self, obj):
+        obj.deleted_at = timezone.now()
+        obj.save(update_fields=['deleted_at'])
+
+    def delete_model(self, request, obj):
+        self.soft_delete(obj)
+
+    def delete_queryset(self, request, queryset):
+        if type(self).soft_delete is not SoftDeleteMixin.soft_delete:
+            for obj in queryset:
+                self.soft_delete(obj)
+            return
+        update_in_chunks(queryset.filter(deleted_at__isnull=True), self.update_chunk_size, deleted_at=timezone.now())
+
+    def get_deleted_objects(self, objs, request):
+        objs = list(objs)
+        return [str(obj) for obj in objs], {self.model._meta.verbose_name_plural: len(objs)}, set(), []
@@ -0,0 +1,336 @@
+"""
+Admin analytics served from pre-aggregated rollup tables.
+
+Applications count on the day they were submitted (``applied_at``) and
+decisions on the day the ApplicationStatusChange log recorded them
+(``changed_at``). Both are write times that never move, so a later edit to
+an application can't shift it to another day. ``update_rollups`` (run by
+``manage.py rollup_analytics``) therefore only rebuilds the days since the
+previous run; earlier days are history, and deleting or archiving their
+applications later doesn't rewrite them. A decision that is reversed and
+made again counts again.
+
+Today's course placement snapshot recounts only the courses whose students
+joined, applied, were decided on or were deleted since the previous run, and
+copies the rest from the latest snapshot. ``--full`` recounts everything
+(e.g. after students change course).
+
+The report functions read the rollup tables only and never scan
+``core_application``; ``status_funnel`` reads the ApplicationStatusChange
+log for its time window.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from accounts.models import User
+from .models import (
+    AnalyticsCheckpoint, Application, ApplicationDailyRollup, ApplicationStatusChange, CoursePlacementSnapshot,
+)
+
+CHECKPOINT = 'application_rollups'
+DECISION_CODES = [ApplicationStatusChange.STATUS_CODES[status] for status in ('accepted', 'rejected')]
+
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def rollup_day(day):
+    """Recompute every ApplicationDailyRollup row for ``day`` from the raw tables"""
+    start, end = _day_bounds(day)
+    rows = defaultdict(lambda: {'applications': 0, 'accepted': 0, 'rejected': 0, 'decision_seconds': 0})
+
+    submitted = (
+        Application.objects
+        .filter(applied_at__gte=start, applied_at__lt=end)
+        .values('student__course', 'listing__company')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for row in submitted:
+        rows[(row['student__course'] or '', row['listing__company'])]['applications'] = row['total']
+
+    decided = (
+        ApplicationStatusChange.objects
+        .filter(to_status__in=DECISION_CODES, changed_at__gte=start, changed_at__lt=end)
+        .values('application__student__course', 'application__listing__company')
+        .annotate(
+            accepted=Count('id', filter=Q(to_status=ApplicationStatusChange.STATUS_CODES['accepted'])),
+            rejected=Count('id', filter=Q(to_status=ApplicationStatusChange.STATUS_CODES['rejected'])),
+            waited=Sum(ExpressionWrapper(F('changed_at') - F('application__applied_at'), output_field=DurationField())),
+        )
+        .order_by()
+    )
+    for row in decided:
+        rollup = rows[(row['application__student__course'] or '', row['application__listing__company'])]
+        rollup['accepted'] = row['accepted']
+        rollup['rejected'] = row['rejected']
+        rollup['decision_seconds'] = int(row['waited'].total_seconds()) if row['waited'] else 0
+
+    with transaction.atomic():
+        ApplicationDailyRollup.objects.filter(day=day).delete()
+        ApplicationDailyRollup.objects.bulk_create([
+            ApplicationDailyRollup(day=day, course=course, company_id=company_id, **counts)
+            for (course, company_id), counts in rows.items()
+        ])
+    return len(rows)
+
+
+def _placement_counts(courses=None):
+    """{course: {'students', 'applicants', 'placed'}} for every course, or only ``courses``"""
+    students = User.objects.filter(role='student', deleted_at__isnull=True)
+    if courses is not None:
+        selected = Q(course__in=[course for course in courses if course])
+        if None in courses or '' in courses:
+            # No course is stored as NULL or ''
+            selected |= Q(course__isnull=True) | Q(course='')
+        students = students.filter(selected)
+    rows = (
+        students
+        .values('course')
+        .annotate(
+            students=Count('id', distinct=True),
+            applicants=Count('id', filter=Q(applications__isnull=False), distinct=True),
+            placed=Count('id', filter=Q(applications__status='accepted'), distinct=True),
+        )
+        .order_by()
+    )
+    counts = defaultdict(lambda: {'students': 0, 'applicants': 0, 'placed': 0})
+    for row in rows:
+        totals = counts[row['course'] or '']
+        for key in totals:
+            totals[key] += row[key]
+    return counts
+
+
+def changed_courses(since):
+    """Courses whose placement counts may have moved since ``since``"""
+    return (
+        set(User.objects.filter(role='student', date_joined__gte=since).values_list('course', flat=True))
+        | set(User.objects.filter(role='student', deleted_at__gte=since).values_list('course', flat=True))
+        | set(Application.objects.filter(applied_at__gte=since).values_list('student__course', flat=True))
+        | set(
+            ApplicationStatusChange.objects.filter(changed_at__gte=since)
+            .values_list('application__student__course', flat=True)
+        )
+    )
+
+
+def snapshot_course_placement(day=None, since=None):
+    """
+    Write ``day``'s placement snapshot. With ``since``, only the courses
+    returned by ``changed_courses(since)`` are recounted and the others are
+    copied from the latest earlier snapshot.
+    """
+    day = day or timezone.localdate()
+    previous_day = CoursePlacementSnapshot.objects.filter(day__lt=day).order_by('-day').values_list('day', flat=True).first()
+    if since is None or previous_day is None:
+        counts = _placement_counts()
+    else:
+        courses = changed_courses(since)
+        counts = {
+            snapshot.course: {'students': snapshot.students, 'applicants': snapshot.applicants, 'placed': snapshot.placed}
+            for snapshot in CoursePlacementSnapshot.objects.filter(day=previous_day)
+        }
+        if courses:
+            for course in courses:
+                counts.pop(course or '', None)
+            counts.update(_placement_counts(courses))
+
+    with transaction.atomic():
+        CoursePlacementSnapshot.objects.filter(day=day).delete()
+        CoursePlacementSnapshot.objects.bulk_create([
+            CoursePlacementSnapshot(
+                day=day,
+                course=course,
+                students=row['students'],
+                applicants=row['applicants'],
+                placed=row['placed'],
+            )
+            for course, row in counts.items()
+        ])
+
+
+def dirty_days(since, until=None):
+    """Every day from ``since`` to ``until`` (default today): the only ones new submissions or decisions can land on"""
+    day = timezone.localdate(since)
+    last = timezone.localdate(until) if until else timezone.localdate()
+    days = []
+    while day <= last:
+        days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def update_rollups(full=False):
+    """Bring the rollup tables up to date. Returns the number of days rebuilt."""
+    started_at = timezone.now()
+    checkpoint = AnalyticsCheckpoint.objects.filter(name=CHECKPOINT).first()
+
+    if full or checkpoint is None:
+        ApplicationDailyRollup.objects.all().delete()
+        days = sorted(set(Application.objects.dates('applied_at', 'day')) | set(
+            ApplicationStatusChange.objects.filter(to_status__in=DECISION_CODES).dates('changed_at', 'day')
+        ))
+        since = None
+    else:
+        days = dirty_days(checkpoint.last_run_at, started_at)
+        since = checkpoint.last_run_at
+
+    for day in days:
+        rollup_day(day)
+    snapshot_course_placement(since=since)
+
+    AnalyticsCheckpoint.objects.update_or_create(name=CHECKPOINT, defaults={'last_run_at': started_at})
+    return len(days)
+
+
+# Reports (rollup tables only)
+
+def _rate(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def _rollups(start=None, end=None):
+    rollups = ApplicationDailyRollup.objects.all()
+    if start:
+        rollups = rollups.filter(day__gte=start)
+    if end:
+        rollups = rollups.filter(day__lte=end)
+    return rollups
+
+
+def placement_by_course(day=None):
+    snapshots = CoursePlacementSnapshot.objects.all()
+    day = day or snapshots.order_by('-day').values_list('day', flat=True).first()
+    return [
+        {
+            'course': snapshot.course,
+            'students': snapshot.students,
+            'applicants': snapshot.applicants,
+            'placed': snapshot.placed,
+            'placement_rate': _rate(snapshot.placed, snapshot.students),
+        }
+        for snapshot in snapshots.filter(day=day).order_by('course')
+    ]
+
+
+def acceptance_by_company(start=None, end=None):
+    rows = (
+        _rollups(start, end)
+        .values('company', 'company__company_name')
+        .annotate(applications=Sum('applications'), accepted=Sum('accepted'), rejected=Sum('rejected'))
+        .order_by('company__company_name')
+    )
+    return [
+        {
+            'company': row['company'],
+            'company_name': row['company__company_name'],
+            'applications': row['applications'],
+            'accepted': row['accepted'],
+            'rejected': row['rejected'],
+            'acceptance_rate': _rate(row['accepted'], row['accepted'] + row['rejected']),
+        }
+        for row in rows
+    ]
+
+
+def applications_per_month(start=None, end=None):
+    rows = (
+        _rollups(start, end)
+        .annotate(month=TruncMonth('day'))
+        .values('month')
+        .annotate(applications=Sum('applications'))
+        .order_by('month')
+    )
+    return [{'month': row['month'].strftime('%Y-%m'), 'applications': row['applications']} for row in rows]
+
+
+def time_to_decision(start=None, end=None):
+    totals = _rollups(start, end).aggregate(
+        decisions=Sum(F('accepted') + F('rejected')),
+        seconds=Sum('decision_seconds'),
+    )
+    by_course = (
+        _rollups(start, end)
+        .values('course')
+        .annotate(decisions=Sum(F('accepted') + F('rejected')), seconds=Sum('decision_seconds'))
+        .order_by('course')
+    )
+
+    def average_days(decisions, seconds):
+        return round(seconds / decisions / 86400, 2) if decisions else None
+
+    return {
+        'decisions': totals['decisions'] or 0,
+        'average_days': average_days(totals['decisions'], totals['seconds']),
+        'by_course': [
+            {
+                'course': row['course'],
+                'decisions': row['decisions'],
+                'average_days': average_days(row['decisions'], row['seconds']),
+            }
+            for row in by_course
+        ],
+    }
+
+
+def status_funnel(start=None, end=None, company=None):
+    """
+    Funnel and per-status latency over status transitions in [start, end).
+    Reads only ApplicationStatusChange rows in the window (changed_at index).
+    """
+    end = end or timezone.now()
+    start = start or end - timedelta(days=30)
+    changes = ApplicationStatusChange.objects.filter(changed_at__gte=start, changed_at__lt=end)
+    if company is not None:
+        changes = changes.filter(application__listing__company=company)
+    name = ApplicationStatusChange.STATUS_NAMES.get
+    codes = ApplicationStatusChange.STATUS_CODES
+
+    reached = (
+        changes.values('to_status')
+        .annotate(applications=Count('application', distinct=True))
+        .order_by('to_status')
+    )
+    latency = (
+        changes.exclude(from_status=0).filter(dwell_seconds__isnull=False)
+        .values('from_status')
+        .annotate(transitions=Count('id'), average=Avg('dwell_seconds'), longest=Max('dwell_seconds'))
+        .order_by('from_status')
+    )
+    dropped = (
+        changes.filter(to_status__in=[codes['rejected'], codes['withdrawn']])
+        .values('from_status', 'to_status')
+        .annotate(applications=Count('application', distinct=True))
+        .order_by('from_status')
+    )
+
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'reached': {name(row['to_status']): row['applications'] for row in reached},
+        'time_in_status': [
+            {
+                'status': name(row['from_status']),
+                'transitions': row['transitions'],
+                'average_hours': round(row['average'] / 3600, 2),
+                'max_hours': round(row['longest'] / 3600, 2),
+            }
+            for row in latency
+        ],
+        'drop_offs': [
+            {
+                'from_status': name(row['from_status']) or 'new',
+                'to_status': name(row['to_status']),
+                'applications': row['applications'],
+            }
+            for row in dropped
+        ],
+    }
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import stats  # noqa: F401 (connects dashboard stats receivers)
+        from . import company_snapshot  # noqa: F401 (keeps listing company snapshots in sync)
+        from . import candidate_search  # noqa: F401 (keeps the candidate search index in sync)
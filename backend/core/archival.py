@@ -0,0 +1,217 @@
+"""
+Listing and account deletion, and term archival: keeps the hot listing and
+application tables small without long, lock-heavy requests.
+
+- ``soft_delete_listing`` / ``soft_delete_account`` only stamp ``deleted_at``
+  (and deactivate the account), so the request returns at once. Deleted
+  listings drop out of ``OJTListing.objects`` immediately.
+- ``purge_deleted_listings`` / ``purge_deleted_accounts`` then remove the
+  rows and everything that hangs off them in small chunks, one short
+  transaction per chunk, so no single statement cascades over a popular
+  listing's applications.
+- ``archive_completed_terms`` moves listings whose OJT ended more than
+  ``TERM_ARCHIVE_AFTER_DAYS`` ago, with their applications, into
+  ``ListingArchive`` / ``ApplicationArchive``.
+
+All three jobs are run by ``manage.py purge_and_archive``.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.admin.models import LogEntry
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from .models import (
+    Application, ApplicationArchive, ApplicationDailyRollup, ApplicationStatusChange, IdempotencyRecord,
+    ListingArchive, Notification, NotificationArchive, OJTListing,
+)
+from .stats import batched_refresh, company_listings_hidden
+
+# Columns stored in their own archive field rather than in ``data``
+LISTING_COLUMNS = ['id', 'company', 'company_name', 'title', 'status', 'start_date', 'end_date', 'created_at']
+APPLICATION_COLUMNS = ['id', 'listing', 'student', 'status', 'applied_at']
+
+
+def get_archival_settings():
+    config = {
+        'CHUNK_SIZE': 500,
+        # How long a deleted listing or account waits before it is purged
+        'PURGE_AFTER_MINUTES': 0,
+        # None keeps ended terms in the hot tables forever
+        'TERM_ARCHIVE_AFTER_DAYS': 365,
+        'TERM_ARCHIVE_STATUSES': ['filled', 'closed', 'ongoing'],
+    }
+    config.update(getattr(settings, 'ARCHIVAL', {}))
+    return config
+
+
+def soft_delete_listing(listing, now=None):
+    listing.deleted_at = now or timezone.now()
+    listing.save(update_fields=['deleted_at', 'updated_at'])
+
+
+def soft_delete_account(user, now=None):
+    """Deactivate the account at once and hide its listings; the rest waits for the purge job"""
+    now = now or timezone.now()
+    with transaction.atomic():
+        user.is_active = False
+        user.deleted_at = now
+        user.save(update_fields=['is_active', 'deleted_at'])
+        OJTListing.objects.filter(company=user).update(deleted_at=now, updated_at=now)
+        company_listings_hidden(user)
+
+
+def _json_values(instance, exclude):
+    values = {}
+    for field in instance._meta.concrete_fields:
+        if field.name in exclude:
+            continue
+        value = field.value_from_object(instance)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        elif hasattr(value, 'storage'):  # FieldFile
+            value = value.name or ''
+        elif value is not None and not isinstance(value, (str, int, float, bool, list, dict)):
+            value = str(value)  # Decimal
+        values[field.attname] = value
+    return values
+
+
+def _archive_applications(applications, reason):
+    history = {}
+    changes = ApplicationStatusChange.objects.filter(application__in=applications).order_by('changed_at')
+    for change in changes.values('application_id', 'from_status', 'to_status', 'changed_at', 'dwell_seconds'):
+        history.setdefault(change['application_id'], []).append([
+            change['from_status'], change['to_status'], change['changed_at'].isoformat(), change['dwell_seconds'],
+        ])
+    ApplicationArchive.objects.bulk_create([
+        ApplicationArchive(
+            original_id=application.id,
+            listing_id=application.listing_id,
+            student_id=application.student_id,
+            status=application.status,
+            applied_at=application.applied_at,
+            data={
+                **_json_values(application, exclude=APPLICATION_COLUMNS),
+                'history': history.get(application.id, []),
+            },
+            reason=reason,
+        )
+        for application in applications
+    ], ignore_conflicts=True)
+
+
+def _remove_applications(queryset, chunk_size, reason=None):
+    """Archive (when ``reason`` is given) and delete the applications in ``queryset``, a chunk per transaction"""
+    removed = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(queryset.order_by('id')[:chunk_size])
+            if not chunk:
+                return removed
+            if reason:
+                _archive_applications(chunk, reason)
+            ids = [application.id for application in chunk]
+            ApplicationStatusChange.objects.filter(application_id__in=ids).delete()
+            Application.objects.filter(id__in=ids).delete()
+        removed += len(chunk)
+
+
+def _delete_in_chunks(queryset, chunk_size):
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return deleted
+        deleted += queryset.model.objects.filter(pk__in=ids).delete()[1].get(queryset.model._meta.label, 0)
+
+
+def _remove_listing(listing, chunk_size, reason=None):
+    """Remove ``listing`` once its applications are gone, archiving both when ``reason`` is given"""
+    _remove_applications(Application.objects.filter(listing=listing), chunk_size, reason)
+    with transaction.atomic():
+        if reason:
+            ListingArchive.objects.get_or_create(original_id=listing.id, defaults={
+                'company_id': listing.company_id,
+                'company_name': listing.company_name,
+                'title': listing.title,
+                'status': listing.status,
+                'start_date': listing.start_date,
+                'end_date': listing.end_date,
+                'data': _json_values(listing, exclude=LISTING_COLUMNS),
+                'created_at': listing.created_at,
+                'reason': reason,
+            })
+        # Nothing is left to cascade to, so this is a single-row delete
+        listing.delete()
+
+
+def purge_deleted_listings(now=None, chunk_size=None):
+    """Archive and remove listings soft-deleted at least PURGE_AFTER_MINUTES ago. Returns the listing count."""
+    config = get_archival_settings()
+    now = now or timezone.now()
+    chunk_size = chunk_size or config['CHUNK_SIZE']
+
+    listings = OJTListing.all_objects.filter(
+        deleted_at__lte=now - timedelta(minutes=config['PURGE_AFTER_MINUTES']),
+        # Listings of deleted accounts go with the account
+        company__deleted_at__isnull=True,
+    )
+    # Ids first: the loop deletes from the table it would otherwise be reading
+    listing_ids = list(listings.order_by('id').values_list('id', flat=True))
+    with batched_refresh():
+        for listing_id in listing_ids:
+            _remove_listing(OJTListing.all_objects.get(pk=listing_id), chunk_size, reason='deleted')
+    return len(listing_ids)
+
+
+def purge_deleted_accounts(now=None, chunk_size=None):
+    """
+    Remove accounts soft-deleted at least PURGE_AFTER_MINUTES ago, with their
+    listings, applications, notifications, idempotency keys and admin log
+    entries. Nothing of theirs is archived, and archived rows that belong to
+    them are removed too. Returns the account count.
+    """
+    config = get_archival_settings()
+    now = now or timezone.now()
+    chunk_size = chunk_size or config['CHUNK_SIZE']
+
+    users = User.objects.filter(deleted_at__lte=now - timedelta(minutes=config['PURGE_AFTER_MINUTES']))
+    purged = 0
+    with batched_refresh():
+        for user in list(users.order_by('id')):
+            for listing in list(OJTListing.all_objects.filter(company=user).order_by('id')):
+                _remove_listing(listing, chunk_size)
+            _remove_applications(Application.objects.filter(student=user), chunk_size)
+            _delete_in_chunks(Notification.objects.filter(user=user), chunk_size)
+            _delete_in_chunks(NotificationArchive.objects.filter(user=user), chunk_size)
+            _delete_in_chunks(ApplicationDailyRollup.objects.filter(company=user), chunk_size)
+            _delete_in_chunks(ApplicationArchive.objects.filter(student_id=user.id), chunk_size)
+            _delete_in_chunks(ListingArchive.objects.filter(company_id=user.id), chunk_size)
+            _delete_in_chunks(IdempotencyRecord.objects.filter(user=user), chunk_size)
+            _delete_in_chunks(LogEntry.objects.filter(user=user), chunk_size)
+            # Only one-row dependents (dashboard stats, candidate index, group links) are left to cascade
+            user.delete()
+            purged += 1
+    return purged
+
+
+def archive_completed_terms(today=None, chunk_size=None):
+    """Move listings whose OJT ended TERM_ARCHIVE_AFTER_DAYS ago into the archive tables. Returns the listing count."""
+    config = get_archival_settings()
+    if config['TERM_ARCHIVE_AFTER_DAYS'] is None:
+        return 0
+    today = today or timezone.localdate()
+    chunk_size = chunk_size or config['CHUNK_SIZE']
+
+    listings = OJTListing.objects.filter(
+        end_date__lt=today - timedelta(days=config['TERM_ARCHIVE_AFTER_DAYS']),
+        status__in=config['TERM_ARCHIVE_STATUSES'],
+    )
+    listing_ids = list(listings.order_by('id').values_list('id', flat=True))
+    with batched_refresh():
+        for listing_id in listing_ids:
+            _remove_listing(OJTListing.all_objects.get(pk=listing_id), chunk_size, reason='term_ended')
+    return len(listing_ids)
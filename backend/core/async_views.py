@@ -0,0 +1,175 @@
+"""
+Async versions of the read-heavy endpoints (served when settings.ASYNC_READ_VIEWS is on).
+
+They reuse the DRF views' querysets, filter backends and serializers, load
+rows with the async ORM and return the same JSON, so a slow client or query
+no longer pins a worker thread under ``backend.asgi``. Writes, the less common
+modes (notification cursor pages and delta sync) and requests for the
+browsable API (``Accept: text/html``) are handed to the regular DRF views.
+
+What DRF's ``APIView.dispatch`` would do is kept where it matters: permission
+and throttle checks run on the view instance, ``APIException``\ s go through
+the configured exception handler, and rendering is timed as ``render`` for
+``ServerTimingMiddleware``. Content negotiation is not: the response is always
+JSON, as ``FastJSONRenderer`` would produce.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated
+from rest_framework.request import Request
+
+from accounts.authentication import CookieJWTAuthentication
+from backend.fast_json import dumps
+from backend.instrumentation import timed
+from . import views
+from .fast_serializers import ValuesSerializer, fast_lists_enabled
+from .models import OJTListing
+from .serializers import NotificationSerializer, OJTListingSerializer
+from .stats import get_dashboard_stats
+
+NOT_AUTHENTICATED = {'detail': 'Authentication credentials were not provided.'}
+PERMISSION_DENIED = {'detail': 'You do not have permission to perform this action.'}
+
+# Writes and uncommon modes are delegated to the DRF views (CSRF exempt, like these)
+_sync_listing_list = sync_to_async(views.OJTListingListCreate.as_view())
+_sync_listing_detail = sync_to_async(views.OJTListingDetail.as_view())
+_sync_notification_list = sync_to_async(views.NotificationList.as_view())
+
+
+async def _drf_request(request):
+    """Wrap the request for DRF helpers, with the user resolved off the event loop"""
+    drf_request = Request(request)
+    result = await sync_to_async(CookieJWTAuthentication().authenticate)(request)
+    user = result[0] if result else AnonymousUser()
+    drf_request.user = user
+    request.user = user
+    return drf_request
+
+
+def _view(view_class, drf_request, **kwargs):
+    view = view_class()
+    view.request = drf_request
+    view.args = ()
+    view.kwargs = kwargs
+    view.format_kwarg = None
+    view.headers = {}
+    return view
+
+
+def _wants_html(request):
+    return 'text/html' in request.headers.get('Accept', '')
+
+
+def _json(data, status=200):
+    # Same encoder and bytes as the DRF views' FastJSONRenderer
+    with timed('render'):
+        return HttpResponse(dumps(data), content_type='application/json', status=status)
+
+
+def _error(view, exc):
+    """The JSON response DRF would send for ``exc`` raised inside ``view``"""
+    if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+        # As APIView.handle_exception does
+        exc.auth_header = view.get_authenticate_header(view.request)
+    handled = view.get_exception_handler()(exc, view.get_exception_handler_context())
+    if handled is None:
+        raise exc
+    response = _json(handled.data, status=handled.status_code)
+    for header, value in handled.items():
+        if header.lower() != 'content-type':
+            response[header] = value  # WWW-Authenticate, Retry-After
+    return response
+
+
+def _denied(drf_request):
+    if drf_request.user.is_authenticated:
+        return JsonResponse(PERMISSION_DENIED, status=403)
+    response = JsonResponse(NOT_AUTHENTICATED, status=401)
+    # The challenge the DRF views send with their 401s
+    response['WWW-Authenticate'] = CookieJWTAuthentication().authenticate_header(drf_request)
+    return response
+
+
+@csrf_exempt
+async def listing_list(request):
+    if request.method != 'GET' or _wants_html(request):
+        return await _sync_listing_list(request)
+
+    drf_request = await _drf_request(request)
+    view = _view(views.OJTListingListCreate, drf_request)
+    try:
+        view.check_permissions(drf_request)
+        view.check_throttles(drf_request)
+        # Filter backends validate the query string here (e.g. ?status=bogus)
+        queryset = view.filter_queryset(view.get_queryset())
+        serializer_class = view.get_serializer_class()
+        if fast_lists_enabled():
+            data = await ValuesSerializer(serializer_class, {'request': drf_request}).aserialize(queryset)
+        else:
+            listings = [listing async for listing in queryset]
+            data = serializer_class(listings, many=True, context={'request': drf_request}).data
+    except APIException as exc:
+        return _error(view, exc)
+    return _json(data)
+
+
+@csrf_exempt
+async def listing_detail(request, pk):
+    if request.method != 'GET' or _wants_html(request):
+        return await _sync_listing_detail(request, pk=pk)
+
+    drf_request = await _drf_request(request)
+    view = _view(views.OJTListingDetail, drf_request, pk=pk)
+    try:
+        view.check_permissions(drf_request)
+        view.check_throttles(drf_request)
+    except APIException as exc:
+        return _error(view, exc)
+    listing = await OJTListing.objects.select_related('company').filter(pk=pk).afirst()
+    if listing is None:
+        return JsonResponse({'detail': 'No OJTListing matches the given query.'}, status=404)
+
+    data = OJTListingSerializer(listing, context={'request': drf_request}).data
+    return _json(data)
+
+
+@csrf_exempt
+async def notification_list(request):
+    params = request.GET
+    if (request.method != 'GET' or _wants_html(request)
+            or any(key in params for key in ('cursor', 'page_size', 'since', 'sync'))):
+        return await _sync_notification_list(request)
+
+    drf_request = await _drf_request(request)
+    if not drf_request.user.is_authenticated:
+        return _denied(drf_request)
+
+    view = _view(views.NotificationList, drf_request)
+    try:
+        view.check_throttles(drf_request)
+        notifications = [notification async for notification in view.get_queryset()]
+    except APIException as exc:
+        return _error(view, exc)
+    data = NotificationSerializer(notifications, many=True, context={'request': drf_request}).data
+    return _json(data)
+
+
+async def _dashboard_stats(request, role):
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+
+    drf_request = await _drf_request(request)
+    user = drf_request.user
+    if not user.is_authenticated or user.role != role:
+        return _denied(drf_request)
+    return _json(await sync_to_async(get_dashboard_stats)(user))
+
+
+async def company_dashboard_stats(request):
+    return await _dashboard_stats(request, 'company')
+
+
+async def student_dashboard_stats(request):
+    return await _dashboard_stats(request, 'student')
@@ -0,0 +1,164 @@
+"""
+Company-facing candidate search over students who opted in (``open_to_search``).
+
+Each listed student has one ``CandidateIndex`` row: course and year level for
+filtering, plus a ``document`` (name, skills, bio) with a full-text index next
+to it. The ``User`` post_save receiver below keeps the row current, so every
+profile change updates one row and nothing is ever rebuilt wholesale. On
+SQLite the text index is an FTS5 table that triggers keep in step with
+``document``. On PostgreSQL it is a GIN index over ``to_tsvector``.
+
+``search_candidates`` ranks text matches (bm25 / ts_rank) and pages with a
+keyset cursor on (rank, user id), so page N costs about as much as page 1.
+Searches with only filters list the newest students first. Other database
+backends fall back to unranked ``icontains`` matching.
+"""
+import base64
+import json
+import re
+
+from django.db import connections, router
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from .models import CandidateIndex
+
+# Saves touching none of these (e.g. last_login) leave the index alone
+INDEXED_FIELDS = {
+    'role', 'is_active', 'deleted_at', 'open_to_search',
+    'first_name', 'last_name', 'username', 'course', 'year_level', 'skills', 'bio',
+}
+WORD = re.compile(r'\w+')
+MAX_TERMS = 8
+
+
+def is_listed(user):
+    return user.role == 'student' and user.open_to_search and user.is_active and user.deleted_at is None
+
+
+def build_document(user):
+    return ' '.join(filter(None, [user.first_name, user.last_name, user.username, user.skills, user.bio]))
+
+
+def index_candidate(user):
+    if is_listed(user):
+        CandidateIndex.objects.update_or_create(user=user, defaults={
+            'course': user.course or '',
+            'year_level': user.year_level,
+            'document': build_document(user),
+        })
+    else:
+        CandidateIndex.objects.filter(user=user).delete()
+
+
+@receiver(post_save, sender=User)
+def candidate_profile_changed(sender, instance, created, update_fields=None, **kwargs):
+    if created and not instance.open_to_search:
+        return
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    index_candidate(instance)
+
+
+def rebuild_candidate_index(chunk_size=1000):
+    """Index every listed student from scratch, e.g. after bulk imports. Returns the number indexed."""
+    CandidateIndex.objects.all().delete()
+    listed = User.objects.filter(role='student', open_to_search=True, is_active=True, deleted_at__isnull=True)
+    indexed, last_id = 0, 0
+    while True:
+        users = list(listed.filter(pk__gt=last_id).order_by('pk')[:chunk_size])
+        if not users:
+            return indexed
+        CandidateIndex.objects.bulk_create([
+            CandidateIndex(user=user, course=user.course or '', year_level=user.year_level, document=build_document(user))
+            for user in users
+        ])
+        indexed += len(users)
+        last_id = users[-1].pk
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """The (user id, rank) row from a cursor, or None if it is malformed"""
+    try:
+        user_id, rank = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return int(user_id), float(rank)
+    except (ValueError, TypeError):
+        return None
+
+
+def _filters(course, year_level):
+    clauses, params = [], []
+    if course:
+        clauses.append('c.course = %s')
+        params.append(course)
+    if year_level:
+        clauses.append('c.year_level = %s')
+        params.append(year_level)
+    return clauses, params
+
+
+def _sqlite_ranked(cursor, terms, course, year_level, after, limit):
+    # Every term must match, as a prefix so "pyth" finds "python"
+    match = ' '.join(f'"{term}"*' for term in terms)
+    clauses, params = _filters(course, year_level)
+    if after:
+        clauses.append('(bm25(core_candidate_fts) > %s OR (bm25(core_candidate_fts) = %s AND c.user_id > %s))')
+        params += [after[1], after[1], after[0]]
+    where = ''.join(f' AND {clause}' for clause in clauses)
+    cursor.execute(
+        'SELECT c.user_id, bm25(core_candidate_fts) FROM core_candidate_fts '
+        'JOIN core_candidateindex c ON c.user_id = core_candidate_fts.rowid '
+        f'WHERE core_candidate_fts MATCH %s{where} '
+        'ORDER BY bm25(core_candidate_fts), c.user_id LIMIT %s',
+        [match, *params, limit],
+    )
+    return cursor.fetchall()
+
+
+def _postgres_ranked(cursor, terms, course, year_level, after, limit):
+    # ts_rank grows with relevance; negated so both backends page on ascending rank
+    query = ' & '.join(f"{term}:*" for term in terms)
+    rank = "-ts_rank(to_tsvector('english', c.document), to_tsquery('english', %s))"
+    clauses, params = _filters(course, year_level)
+    if after:
+        clauses.append(f'({rank} > %s OR ({rank} = %s AND c.user_id > %s))')
+        params += [query, after[1], query, after[1], after[0]]
+    where = ''.join(f' AND {clause}' for clause in clauses)
+    cursor.execute(
+        f'SELECT c.user_id, {rank} AS rank FROM core_candidateindex c '
+        f"WHERE to_tsvector('english', c.document) @@ to_tsquery('english', %s){where} "
+        'ORDER BY rank, c.user_id LIMIT %s',
+        [query, query, *params, limit],
+    )
+    return cursor.fetchall()
+
+
+def search_candidates(text='', course=None, year_level=None, after=None, limit=20):
+    """
+    One page of candidates as [(user id, rank)], best first. ``after`` is the
+    last row of the previous page.
+    """
+    terms = [term.lower() for term in WORD.findall(text or '')][:MAX_TERMS]
+    queryset = CandidateIndex.objects.all()
+    connection = connections[router.db_for_read(CandidateIndex)]
+
+    if terms and connection.vendor in ('sqlite', 'postgresql'):
+        ranked = _sqlite_ranked if connection.vendor == 'sqlite' else _postgres_ranked
+        with connection.cursor() as cursor:
+            return ranked(cursor, terms, course, year_level, after, limit)
+
+    if course:
+        queryset = queryset.filter(course=course)
+    if year_level:
+        queryset = queryset.filter(year_level=year_level)
+    for term in terms:
+        queryset = queryset.filter(document__icontains=term)
+    if after:
+        queryset = queryset.filter(user_id__lt=after[0])
+    # Unranked: newest students first, every row ranks 0
+    return [(user_id, 0) for user_id in queryset.order_by('-user_id').values_list('user_id', flat=True)[:limit]]
@@ -0,0 +1,41 @@
+"""
+Company snapshot on listings.
+
+``OJTListing`` keeps a copy of its company's name, logo URL and verified flag
+(filled in by ``OJTListing.save`` when the listing is created or moved to
+another company) so the public feed and search read
+the listings table alone. When a company's profile changes, through
+``update_profile``, the admin or anywhere else that saves the user, the new
+values are fanned out to all of its listings with one UPDATE that only
+touches rows still holding stale values.
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from .models import OJTListing
+
+# User fields the snapshot is built from
+SOURCE_FIELDS = {'company_name', 'profile_image', 'is_verified'}
+
+
+def sync_company_snapshot(company):
+    """Bring the company's listings up to date. Returns the number of listings changed."""
+    snapshot = OJTListing.company_snapshot(company)
+    return OJTListing.objects.filter(company=company).exclude(**snapshot).update(**snapshot)
+
+
+def backfill_company_snapshots():
+    """Sync every company with listings, e.g. after bulk_create (which skips OJTListing.save)"""
+    companies = User.objects.filter(listings__isnull=False).distinct()
+    return sum(sync_company_snapshot(company) for company in companies.iterator())
+
+
+@receiver(post_save, sender=User)
+def company_profile_changed(sender, instance, created, update_fields=None, **kwargs):
+    if created or instance.role != 'company':
+        return
+    # Logins save last_login only; skip saves that can't change the snapshot
+    if update_fields is not None and not SOURCE_FIELDS & set(update_fields):
+        return
+    sync_company_snapshot(instance)
@@ -0,0 +1,166 @@
+"""
+Batched notification email dispatcher.
+
+Unsent notifications are read in id order, a batch of users at a time. All of
+a user's pending notifications are rendered together (users with several get
+one digest email) and the batch goes out in one ``send_messages()`` call over
+one connection. Backends render and send messages in order and stop at the
+first failure, so the messages rendered before the failing one were
+delivered: a retry resumes at the failing message and never resends the
+emails before it. Only the notifications whose email went out are marked
+sent, with one UPDATE per batch. Notifications of users without an email
+address are marked sent without sending anything.
+"""
+import logging
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+
+def get_email_settings():
+    config = {
+        'BATCH_SIZE': 200,
+        'MAX_RETRIES': 3,
+        'RETRY_BACKOFF_SECONDS': 2,
+        'DIGEST_MIN': 3,
+    }
+    config.update(getattr(settings, 'NOTIFICATION_EMAIL', {}))
+    return config
+
+
+class NotificationEmail(EmailMessage):
+    """An EmailMessage that notes when a backend renders it, into ``rendered`` (set by _send_batch)"""
+    rendered = None
+
+    def message(self, *args, **kwargs):
+        if self.rendered is not None:
+            self.rendered.append(self)
+        return super().message(*args, **kwargs)
+
+
+def render_notification_email(user, notifications):
+    """Build one EmailMessage for a user's notifications (a digest if more than one)"""
+    name = user.company_name if user.role == 'company' and user.company_name else user.first_name or user.username
+
+    if len(notifications) == 1:
+        notification = notifications[0]
+        subject = notification.title
+        body = f'Hi {name},\n\n{notification.message}\n'
+    else:
+        subject = f'You have {len(notifications)} new notifications'
+        lines = [f'- {n.title}: {n.message}' for n in notifications]
+        body = f'Hi {name},\n\nHere is what happened since our last email:\n\n' + '\n'.join(lines) + '\n'
+
+    body += '\nYou can view all notifications in the OJT Tracker.\n'
+    return NotificationEmail(subject, body, settings.DEFAULT_FROM_EMAIL, [user.email])
+
+
+def build_messages(notifications, digest_min):
+    """Return (EmailMessage, [notification ids]) pairs for a batch"""
+    by_user = defaultdict(list)
+    for notification in notifications:
+        by_user[notification.user_id].append(notification)
+
+    messages = []
+    for user_notifications in by_user.values():
+        user = user_notifications[0].user
+        if len(user_notifications) >= digest_min:
+            groups = [user_notifications]
+        else:
+            groups = [[n] for n in user_notifications]
+        for group in groups:
+            messages.append((render_notification_email(user, group), [n.id for n in group]))
+    return messages
+
+
+def _send_batch(connection, messages, max_retries, backoff):
+    """
+    Send ``messages`` with one ``send_messages()`` call, reopening the
+    connection with exponential backoff on failure. Returns how many of them,
+    from the start, went out.
+    """
+    sent = 0
+    for attempt in range(max_retries + 1):
+        rendered = []
+        for message in messages[sent:]:
+            message.rendered = rendered
+        try:
+            connection.open()
+            connection.send_messages(messages[sent:])
+            return len(messages)
+        except Exception:
+            # The last message rendered is the one that failed; those before it went out
+            failed_at = sent + max(len(rendered) - 1, 0)
+            logger.warning('Sending notification email to %s failed (attempt %d)',
+                           messages[failed_at].to, attempt + 1, exc_info=True)
+            sent = failed_at
+            connection.close()
+            if attempt < max_retries:
+                time.sleep(backoff * (2 ** attempt))
+        finally:
+            for message in messages:
+                message.rendered = None
+    return sent
+
+
+def skip_unreachable():
+    """Mark pending notifications of users without an email address as sent. Returns the row count."""
+    return (
+        Notification.objects
+        .filter(is_email_sent=False)
+        .filter(Q(user__email='') | Q(user__email__isnull=True))
+        .update(is_email_sent=True)
+    )
+
+
+def dispatch_pending_emails(batch_size=None, connection=None, max_batches=None):
+    """
+    Send every pending notification email. Returns (emails sent, notifications
+    marked sent, notifications skipped for lack of an address). When a
+    message still fails after all retries the run stops; it and everything
+    after it are left unsent for the next run.
+    """
+    config = get_email_settings()
+    batch_size = batch_size or config['BATCH_SIZE']
+    connection = connection or get_connection()
+
+    skipped = skip_unreachable()
+    pending = Notification.objects.filter(is_email_sent=False).select_related('user').order_by('id')
+
+    emails_sent = marked = batches = 0
+    last_id = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            window = list(pending.filter(id__gt=last_id).values_list('id', 'user_id')[:batch_size])
+            if not window:
+                break
+            last_id = window[-1][0]
+            batches += 1
+            # Every pending notification of these users, so each gets one digest rather than
+            # one per batch; their later rows are marked sent here and skipped further on
+            batch = list(pending.filter(user_id__in={user_id for _, user_id in window}))
+
+            pairs = build_messages(batch, config['DIGEST_MIN'])
+            sent = _send_batch(
+                connection, [message for message, _ in pairs], config['MAX_RETRIES'], config['RETRY_BACKOFF_SECONDS'],
+            )
+            connection.close()  # one connection per batch
+            emails_sent += sent
+
+            # update() leaves updated_at alone so delta sync clients don't refetch
+            sent_ids = [notification_id for _, ids in pairs[:sent] for notification_id in ids]
+            marked += Notification.objects.filter(id__in=sent_ids).update(is_email_sent=True)
+            if sent < len(pairs):
+                logger.error('Giving up on notification emails from %d until the next run', pairs[sent][1][0])
+                break
+    finally:
+        connection.close()
+
+    return emails_sent, marked, skipped
@@ -0,0 +1,207 @@
+"""
+values()-based fast path for read-only list GETs.
+
+``ValuesSerializer(OJTListingSerializer, context)`` walks the serializer's
+fields once per request, nested serializers included, and compiles them into
+one ``values_list()`` column list plus a getter per output field. Rows are
+then assembled straight from the tuples: no model instances, no per-field
+``get_attribute``/``to_representation`` dispatch for plain columns.
+
+SerializerMethodFields and model properties have no column to read, so they
+are registered in ``COMPUTED``: either as a SQL annotation (``Annotated``) or
+as a function of other columns (``Derived``). A method field that isn't
+registered is an error rather than a silent difference in output.
+
+The output is the same as the regular serializer's; ``manage.py
+bench_list_serialization`` checks that and compares the per-row cost.
+"""
+import operator
+from datetime import date
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from accounts.serializers import UserProfileSerializer
+from accounts.thumbnails import thumbnail_urls_for
+from .serializers import ApplicationSerializer, OJTListingSerializer
+
+WITHDRAWABLE_STATUSES = ['applied', 'under_review', 'for_interview']
+
+# to_representation is the identity for values these fields already get from the database
+PASS_THROUGH_FIELDS = (
+    serializers.CharField, serializers.IntegerField, serializers.BooleanField,
+    serializers.ChoiceField, serializers.JSONField, PrimaryKeyRelatedField,
+)
+
+
+class Annotated:
+    """A method field computed in SQL; ``expression(prefix)`` builds it for a (nested) relation path"""
+
+    def __init__(self, expression):
+        self.expression = expression
+
+
+class Derived:
+    """A method field or property computed in Python from other columns"""
+
+    def __init__(self, columns, function):
+        self.columns = columns
+        self.function = function
+
+
+COMPUTED = {
+    (OJTListingSerializer, 'is_expired'): Annotated(lambda prefix: ExpressionWrapper(
+        Q(**{f'{prefix}application_deadline__lt': date.today()}), output_field=BooleanField(),
+    )),
+    (OJTListingSerializer, 'duration_months'): Derived(['duration_weeks'], lambda weeks: round(weeks / 4.33, 1)),
+    (ApplicationSerializer, 'can_withdraw'): Annotated(lambda prefix: ExpressionWrapper(
+        Q(**{f'{prefix}status__in': WITHDRAWABLE_STATUSES}), output_field=BooleanField(),
+    )),
+    (UserProfileSerializer, 'profile_thumbnails'): Derived(['profile_image', 'profile_thumbnails'], thumbnail_urls_for),
+}
+
+
+def _computed(serializer, name):
+    for cls in type(serializer).__mro__:
+        if (cls, name) in COMPUTED:
+            return COMPUTED[cls, name]
+    return None
+
+
+def _file_url(storage, request):
+    urls = {}  # the same logo or avatar repeats on many rows
+
+    def convert(name):
+        if not name:
+            return None
+        if name not in urls:
+            url = storage.url(name)
+            urls[name] = request.build_absolute_uri(url) if request is not None else url
+        return urls[name]
+    return convert
+
+
+def _datetime(field):
+    """DateTimeField.to_representation with the timezone and format looked up once"""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = getattr(field, 'timezone', None) or field.default_timezone()
+    if field_timezone is None or output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+
+    def convert(value):
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _converter(field, model):
+    """None when the raw column value is already the output value"""
+    if isinstance(field, serializers.FileField):
+        storage = model._meta.get_field(field.source).storage
+        return _file_url(storage, field.context.get('request'))
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime(field)
+    if isinstance(field, PASS_THROUGH_FIELDS):
+        return None
+    return field.to_representation
+
+
+def _column(index, convert):
+    if convert is None:
+        return operator.itemgetter(index)
+
+    def get(row):
+        value = row[index]
+        return None if value is None else convert(value)
+    return get
+
+
+def _derived(indexes, function, convert):
+    def get(row):
+        value = function(*[row[index] for index in indexes])
+        return value if convert is None or value is None else convert(value)
+    return get
+
+
+def _nested(index, getters):
+    def get(row):
+        if row[index] is None:
+            return None
+        return {name: getter(row) for name, getter in getters}
+    return get
+
+
+class ValuesSerializer:
+    def __init__(self, serializer_class, context=None):
+        self.columns = []
+        self.annotations = {}
+        serializer = serializer_class(context=context or {})
+        self.getters = self._compile(serializer, '')
+
+    def _index(self, key):
+        if key not in self.columns:
+            self.columns.append(key)
+        return self.columns.index(key)
+
+    def _compile(self, serializer, prefix):
+        model = serializer.Meta.model
+        getters = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            computed = _computed(serializer, name)
+
+            if isinstance(computed, Annotated):
+                # Aliases can't contain "__"; prefixing with "_" keeps them clear of field names
+                alias = '_' + (prefix + name).replace('__', '_')
+                self.annotations[alias] = computed.expression(prefix)
+                getters.append((name, _column(self._index(alias), None)))
+            elif isinstance(computed, Derived):
+                indexes = [self._index(prefix + column) for column in computed.columns]
+                convert = None if isinstance(field, serializers.SerializerMethodField) else _converter(field, model)
+                getters.append((name, _derived(indexes, computed.function, convert)))
+            elif isinstance(field, serializers.BaseSerializer):
+                if isinstance(field, serializers.ListSerializer):
+                    raise ImproperlyConfigured(f'{type(serializer).__name__}.{name}: to-many nesting is not supported')
+                relation = prefix + field.source.replace('.', '__')
+                getters.append((name, _nested(self._index(relation), self._compile(field, relation + '__'))))
+            elif isinstance(field, serializers.SerializerMethodField):
+                raise ImproperlyConfigured(f'Register {type(serializer).__name__}.{name} in core.fast_serializers.COMPUTED')
+            else:
+                key = prefix + field.source.replace('.', '__')
+                getters.append((name, _column(self._index(key), _converter(field, model))))
+        return getters
+
+    def _rows(self, queryset):
+        return queryset.annotate(**self.annotations).values_list(*self.columns)
+
+    def to_representation(self, row):
+        return {name: getter(row) for name, getter in self.getters}
+
+    def serialize(self, queryset):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in self._rows(queryset)]
+
+    async def aserialize(self, queryset):
+        to_representation = self.to_representation
+        return [to_representation(row) async for row in self._rows(queryset)]
+
+
+def fast_lists_enabled():
+    return getattr(settings, 'FAST_LIST_SERIALIZATION', True)
+
+
+class ValuesListMixin:
+    """Serve unpaginated list GETs through ValuesSerializer (settings.FAST_LIST_SERIALIZATION)"""
+
+    def list(self, request, *args, **kwargs):
+        if not fast_lists_enabled() or self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = ValuesSerializer(self.get_serializer_class(), self.get_serializer_context())
+        return Response(serializer.serialize(queryset))
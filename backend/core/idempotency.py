@@ -0,0 +1,103 @@
+"""
+``Idempotency-Key`` support for create endpoints.
+
+The first POST with a given key claims an ``IdempotencyRecord`` before the
+view runs, and a successful response is stored on it. A retry with the same
+key is answered from that record after one lookup on the (user, key) unique
+index: the request body is never parsed and the serializer, create and
+notification path doesn't run again. While the first request is still in
+flight a retry gets 409. Failed requests release their key, so the client
+can fix the input and resend with it.
+
+Records expire after ``TTL_HOURS``: an expired key is simply claimed again,
+and ``manage.py prune_idempotency_keys`` deletes the old rows.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from backend.fast_json import dumps, loads
+from .models import IdempotencyRecord
+
+
+def get_idempotency_settings():
+    config = {
+        'HEADER': 'Idempotency-Key',
+        'TTL_HOURS': 24,
+        # A claim older than this belongs to a request that died; the next retry takes it over
+        'STALE_CLAIM_SECONDS': 120,
+    }
+    config.update(getattr(settings, 'IDEMPOTENCY', {}))
+    return config
+
+
+def _error(message, status_code):
+    return Response({'detail': message}, status=status_code)
+
+
+def _claim(user, key, path, config):
+    """Return (record, None) when this request should run, or (None, response) to answer it directly"""
+    now = timezone.now()
+    record = IdempotencyRecord.objects.filter(user=user, key=key).first()
+    if record is not None and record.expires_at > now:
+        if record.request_path != path:
+            return None, _error('This Idempotency-Key was used for a different request.', status.HTTP_422_UNPROCESSABLE_ENTITY)
+        if record.status_code is not None:
+            return None, Response(record.response, status=record.status_code, headers={'Idempotent-Replayed': 'true'})
+        if (now - record.created_at).total_seconds() < config['STALE_CLAIM_SECONDS']:
+            return None, _error('A request with this Idempotency-Key is still being processed.', status.HTTP_409_CONFLICT)
+
+    expires_at = now + timedelta(hours=config['TTL_HOURS'])
+    if record is not None:
+        # Expired or abandoned: take it over, unless another retry just did
+        taken = IdempotencyRecord.objects.filter(pk=record.pk, created_at=record.created_at).update(
+            request_path=path, status_code=None, response=None, created_at=now, expires_at=expires_at,
+        )
+        if not taken:
+            return None, _error('A request with this Idempotency-Key is still being processed.', status.HTTP_409_CONFLICT)
+        record.created_at = now
+        return record, None
+    try:
+        with transaction.atomic():
+            return IdempotencyRecord.objects.create(user=user, key=key, request_path=path, expires_at=expires_at), None
+    except IntegrityError:
+        return None, _error('A request with this Idempotency-Key is still being processed.', status.HTTP_409_CONFLICT)
+
+
+class IdempotentCreateMixin:
+    """Honour the Idempotency-Key header on ``create`` (authenticated users only)"""
+
+    def create(self, request, *args, **kwargs):
+        config = get_idempotency_settings()
+        key = request.headers.get(config['HEADER'])
+        if not key or not request.user.is_authenticated:
+            return super().create(request, *args, **kwargs)
+        if len(key) > IdempotencyRecord._meta.get_field('key').max_length:
+            return _error('Idempotency-Key is too long.', status.HTTP_400_BAD_REQUEST)
+
+        record, response = _claim(request.user, key, request.path, config)
+        if response is not None:
+            return response
+        try:
+            response = super().create(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if status.is_success(response.status_code):
+            # Through the API encoder, so Decimals, dates and lazy strings are stored as sent
+            record.status_code = response.status_code
+            record.response = loads(dumps(response.data))
+            record.save(update_fields=['status_code', 'response'])
+        else:
+            record.delete()
+        return response
+
+
+def prune_expired():
+    """Delete expired idempotency records. Returns the number removed."""
+    deleted, _ = IdempotencyRecord.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,205 @@
+"""
+Batch interview scheduling.
+
+``schedule_interviews`` books a company's applicants into its interviewers'
+availability windows in one call:
+
+- ``free_intervals`` merges the windows and cuts out interviews the company
+  already has booked, in one sweep over both sorted lists
+- ``allocate_slots`` carves the free time into back-to-back slots and hands
+  them out in application order, earliest first. An applicant whose other
+  interviews (at any company) overlap a slot skips it, and the slot stays
+  free for the next applicant
+- the dates are written with one batched UPDATE, applicants not yet invited are
+  moved to ``for_interview`` through ``set_status`` (so the status log stays
+  complete), and the ``interview_scheduled`` notifications go in with
+  ``bulk_create``. None of this goes through ``Application.save``, so the
+  stored dashboards of everyone involved are refreshed once, after the batch
+
+The company row is locked for the duration, so two batches for the same
+company can't book the same time. Interviews booked elsewhere are assumed to
+last one slot, since only their start is stored.
+"""
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import User
+from .models import Application, Notification
+from .stats import applications_updated, batched_refresh
+
+SCHEDULABLE_STATUSES = ['applied', 'under_review', 'for_interview']
+INSERT_BATCH_SIZE = 1000
+
+
+def merge_intervals(intervals):
+    """Sorted, non-overlapping (start, end) pairs covering the same time"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(interval) for interval in merged]
+
+
+def free_intervals(windows, busy):
+    """``windows`` minus ``busy``; both are lists of (start, end)"""
+    busy = merge_intervals(busy)
+    free, index = [], 0
+    for start, end in merge_intervals(windows):
+        # Busy intervals that end before this window can't touch it or any later one
+        while index < len(busy) and busy[index][1] <= start:
+            index += 1
+        cursor, scan = start, index
+        while scan < len(busy) and busy[scan][0] < end:
+            if busy[scan][0] > cursor:
+                free.append((cursor, busy[scan][0]))
+            cursor = max(cursor, busy[scan][1])
+            scan += 1
+        if cursor < end:
+            free.append((cursor, end))
+    return free
+
+
+def _overlaps(start, end, intervals):
+    """Whether [start, end) overlaps any of the sorted, non-overlapping ``intervals``"""
+    index = bisect_left(intervals, (end,))
+    return index > 0 and intervals[index - 1][1] > start
+
+
+def allocate_slots(free, applicants, slot, gap=timedelta(0), busy=None):
+    """
+    Carve ``free`` into slots of length ``slot`` (``gap`` apart) and give each
+    (applicant, person) pair, in order, the earliest slot that doesn't overlap
+    ``busy[person]``, a list of (start, end). A person booked twice never gets
+    overlapping slots. Returns {applicant: start}; applicants left over when
+    the time runs out are missing from it.
+    """
+    busy = {person: merge_intervals(intervals) for person, intervals in (busy or {}).items()}
+    starts = []
+    for start, end in free:
+        while start + slot <= end:
+            starts.append(start)
+            start += slot + gap
+
+    taken = [False] * len(starts)
+    first_open = 0
+    booked = {}
+    for applicant, person in applicants:
+        while first_open < len(starts) and taken[first_open]:
+            first_open += 1
+        if first_open == len(starts):
+            break
+        intervals = busy.setdefault(person, [])
+        index = first_open
+        while index < len(starts) and (taken[index] or _overlaps(starts[index], starts[index] + slot, intervals)):
+            index += 1
+        if index == len(starts):
+            continue
+        taken[index] = True
+        booked[applicant] = starts[index]
+        insort(intervals, (starts[index], starts[index] + slot))
+    return booked
+
+
+def _write_dates(booked, now):
+    """
+    One parameterised UPDATE run with ``executemany``. ``bulk_update`` would
+    build a CASE expression per row, which costs far more than the write.
+    """
+    connection = connections[router.db_for_write(Application)]
+    quote = connection.ops.quote_name
+    adapt = connection.ops.adapt_datetimefield_value
+    sql = (
+        f'UPDATE {quote(Application._meta.db_table)} '
+        f'SET {quote("interview_date")} = %s, {quote("updated_at")} = %s WHERE {quote("id")} = %s'
+    )
+    updated_at = adapt(now)
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [(adapt(start), updated_at, pk) for pk, start in booked.items()])
+
+
+def _interview_notification(application, listing_title, when):
+    local = timezone.localtime(when)
+    return Notification(
+        user_id=application.student_id,
+        notification_type='interview_scheduled',
+        title='Interview Scheduled',
+        message=f'Your interview for "{listing_title}" is on {local:%b %d, %Y at %I:%M %p}.',
+        data={
+            'listing_id': application.listing_id,
+            'application_id': application.id,
+            'interview_date': when.isoformat(),
+        },
+    )
+
+
+def schedule_interviews(company, applications, windows, slot_minutes, gap_minutes=0):
+    """
+    Book ``applications`` (a queryset) into the company's ``windows`` and
+    notify the students. Only the company's own applications in
+    ``SCHEDULABLE_STATUSES`` are considered. Returns (booked, unscheduled):
+    {application id: interview start} and the ids that didn't fit.
+    """
+    slot = timedelta(minutes=slot_minutes)
+    gap = timedelta(minutes=gap_minutes)
+    windows = merge_intervals(windows)
+    if not windows:
+        return {}, []
+
+    with transaction.atomic():
+        User.objects.select_for_update().filter(pk=company.pk).exists()
+
+        batch = list(
+            applications
+            .filter(listing__company=company, status__in=SCHEDULABLE_STATUSES)
+            .select_related('listing')
+            .only('id', 'student', 'listing__title', 'status')
+            .order_by('applied_at', 'id')
+        )
+        if not batch:
+            return {}, []
+        student_ids = {application.student_id for application in batch}
+
+        # Interviews already booked outside this batch, overlapping the windows
+        existing = (
+            Application.objects
+            .filter(Q(listing__company=company) | Q(student_id__in=student_ids))
+            .filter(status='for_interview', interview_date__gt=windows[0][0] - slot - gap,
+                    interview_date__lt=windows[-1][1])
+            .exclude(id__in=[application.id for application in batch])
+            .values_list('student_id', 'listing__company_id', 'interview_date')
+        )
+        company_busy, student_busy = [], {}
+        for student_id, company_id, start in existing:
+            if company_id == company.pk:
+                company_busy.append((start, start + slot + gap))
+            if student_id in student_ids:
+                student_busy.setdefault(student_id, []).append((start, start + slot))
+
+        booked = allocate_slots(
+            free_intervals(windows, company_busy),
+            [(application.id, application.student_id) for application in batch],
+            slot, gap, student_busy,
+        )
+
+        now = timezone.now()
+        scheduled = [application for application in batch if application.id in booked]
+        invite = [application.id for application in scheduled if application.status != 'for_interview']
+        with batched_refresh():
+            if invite:
+                Application.objects.filter(id__in=invite).set_status('for_interview')
+            _write_dates(booked, now)
+            applications_updated(list(booked))
+        Notification.objects.bulk_create([
+            _interview_notification(application, application.listing.title, booked[application.id])
+            for application in scheduled
+        ], batch_size=INSERT_BATCH_SIZE)
+
+    unscheduled = [application.id for application in batch if application.id not in booked]
+    return booked, unscheduled
+
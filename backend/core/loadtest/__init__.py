@@ -0,0 +1,8 @@
+"""
+Local load-testing suite (``manage.py loadtest``).
+
+Scenarios replay our real traffic shapes with in-process Django test clients
+against a throwaway test database, and report throughput, latency
+percentiles and queries per request. Results are written as JSON so runs can
+be compared with ``--compare``.
+"""
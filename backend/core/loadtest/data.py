@@ -0,0 +1,87 @@
+"""Deterministic seed data for load-test scenarios"""
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+
+from accounts.models import User
+from core.company_snapshot import backfill_company_snapshots
+from core.models import Application, Notification, OJTListing
+
+COURSES = ['cit', 'coa', 'coed', 'chm', 'cba']
+TITLES = ['IT Intern', 'Accounting Assistant', 'Teaching Aide', 'Front Desk Trainee', 'Marketing Intern', 'QA Tester']
+SKILLS = ['Python', 'Excel', 'Communication', 'Bookkeeping', 'Customer service', 'Lesson planning', 'SQL']
+CITIES = ['Manila', 'Quezon City', 'Cebu', 'Davao', 'Makati', 'Pasig']
+
+
+def seed(students=200, companies=20, listings_per_company=5, seed_value=42):
+    """Create a small realistic dataset and return the ids scenarios need"""
+    rng = random.Random(seed_value)
+    password = make_password('loadtest-password')
+    today = date.today()
+
+    User.objects.bulk_create([
+        User(username=f'lt-company-{i}', password=password, role='company', company_name=f'Company {i}', is_verified=True)
+        for i in range(companies)
+    ])
+    User.objects.bulk_create([
+        User(
+            username=f'lt-student-{i}', password=password, role='student', first_name='Student', last_name=str(i),
+            course=rng.choice(COURSES), year_level=rng.choice([3, 4, 4]),
+        )
+        for i in range(students)
+    ])
+    company_ids = list(User.objects.filter(role='company', username__startswith='lt-').values_list('id', flat=True))
+    student_ids = list(User.objects.filter(role='student', username__startswith='lt-').values_list('id', flat=True))
+
+    listings = []
+    for company_id in company_ids:
+        for n in range(listings_per_company):
+            deadline = today if n == 0 else today + timedelta(days=rng.randint(1, 60))
+            listings.append(OJTListing(
+                company_id=company_id,
+                title=rng.choice(TITLES),
+                location=rng.choice(CITIES),
+                description=' '.join(rng.choices(SKILLS, k=30)),
+                responsibilities='Assist the team with daily tasks.',
+                learning_outcomes='Hands-on industry experience.',
+                skills_required=', '.join(rng.sample(SKILLS, 3)),
+                course_requirement='all',
+                year_level_requirement=0,
+                allowance=rng.choice([None, 3000, 5000]),
+                start_date=deadline + timedelta(days=14),
+                end_date=deadline + timedelta(days=100),
+                application_deadline=deadline,
+            ))
+    OJTListing.objects.bulk_create(listings)
+    backfill_company_snapshots()
+    listing_ids = list(OJTListing.objects.values_list('id', flat=True))
+    # The first listing of each company closes today: the apply-rush targets
+    deadline_ids = list(OJTListing.objects.filter(application_deadline=today).values_list('id', flat=True))
+
+    # Existing pipeline for companies to review; the later half of the students
+    # is left free for the apply rush
+    reviewed = student_ids[len(student_ids) // 2:]
+    Application.objects.bulk_create([
+        Application(student_id=student_id, listing_id=listing_id, cover_letter='Hello')
+        for student_id in reviewed
+        for listing_id in rng.sample([pk for pk in listing_ids if pk not in deadline_ids], 2)
+    ], ignore_conflicts=True)
+
+    Notification.objects.bulk_create([
+        Notification(user_id=student_id, notification_type='system_announcement', title='Welcome', message='Hello')
+        for student_id in student_ids
+        for _ in range(5)
+    ])
+
+    applications_by_company = {}
+    for application_id, company_id in Application.objects.values_list('id', 'listing__company_id'):
+        applications_by_company.setdefault(company_id, []).append(application_id)
+
+    return {
+        'students': student_ids,
+        'companies': company_ids,
+        'listings': listing_ids,
+        'deadline_listings': deadline_ids,
+        'applications_by_company': applications_by_company,
+    }
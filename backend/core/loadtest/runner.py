@@ -0,0 +1,113 @@
+"""Run scenarios concurrently and summarise latency, throughput and queries"""
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from .scenarios import SCENARIOS, rng_for
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class TokenCache:
+    """One access token per load-test user, minted on first use"""
+
+    def __init__(self):
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            if user_id not in self._tokens:
+                user = User.objects.get(pk=user_id)
+                self._tokens[user_id] = str(RefreshToken.for_user(user).access_token)
+            return self._tokens[user_id]
+
+
+def run_visit(scenario, data, index, seed, tokens):
+    client = Client()
+    user_id = scenario.identity(data, index)
+    if user_id is not None:
+        client.cookies['access_token'] = tokens.get(user_id)
+
+    samples = []
+    for label, method, path, options in scenario.steps(data, index, rng_for(seed, scenario.name, index)):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(path, **options)
+            elapsed = time.perf_counter() - started
+        samples.append((label, elapsed, response.status_code, len(queries)))
+    return samples
+
+
+def summarise(samples):
+    latencies = sorted(sample[1] for sample in samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample[2] >= 400),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+        'queries_per_request': round(statistics.fmean(sample[3] for sample in samples), 2),
+    }
+
+
+def run_scenario(name, data, visits, concurrency, seed):
+    scenario = SCENARIOS[name]
+    tokens = TokenCache()
+    # Warm up imports, URL resolving and the user cache outside the measurement
+    run_visit(scenario, data, visits, seed, tokens)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='loadtest') as pool:
+        results = list(pool.map(lambda index: run_visit(scenario, data, index, seed, tokens), range(visits)))
+    elapsed = time.perf_counter() - started
+
+    samples = [sample for visit in results for sample in visit]
+    endpoints = {}
+    for sample in samples:
+        endpoints.setdefault(sample[0], []).append(sample)
+
+    return {
+        **summarise(samples),
+        'visits': visits,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(samples) / elapsed, 1),
+        'status_codes': {str(code): sum(1 for s in samples if s[2] == code) for code in sorted({s[2] for s in samples})},
+        'endpoints': {label: summarise(endpoint_samples) for label, endpoint_samples in endpoints.items()},
+    }
+
+
+def compare(current, previous):
+    """Rows of (scenario, endpoint, metric, before, after, change %) for the headline metrics"""
+    rows = []
+    for name, result in current['scenarios'].items():
+        before = previous.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        for metric in ('requests_per_second', 'p95_ms', 'queries_per_request'):
+            rows.append((name, '*', metric, before.get(metric), result[metric]))
+        for label, endpoint in result['endpoints'].items():
+            endpoint_before = before.get('endpoints', {}).get(label)
+            if endpoint_before:
+                for metric in ('p95_ms', 'queries_per_request'):
+                    rows.append((name, label, metric, endpoint_before.get(metric), endpoint[metric]))
+    return [
+        (*row, round((row[4] - row[3]) / row[3] * 100, 1) if row[3] else None)
+        for row in rows
+    ]
+
+
+def load_results(path):
+    with open(path) as results_file:
+        return json.load(results_file)
@@ -0,0 +1,105 @@
+"""
+Traffic shapes replayed by the load tests.
+
+A scenario turns a request index into one "user visit": which identity to
+use and the (label, method, path, options) steps that visit makes.
+"""
+import random
+from datetime import timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+
+SEARCH_TERMS = ['python', 'excel', 'intern', 'manila', 'sql', 'customer']
+COURSES = ['cit', 'coa', 'coed', 'chm', 'cba', 'all']
+RESUME = b'%PDF-1.4\n' + b'0' * 64 * 1024  # ~64 KB upload
+
+
+class Scenario:
+    name = ''
+    description = ''
+
+    def identity(self, data, index):
+        """User id to authenticate as, or None for anonymous"""
+        return None
+
+    def steps(self, data, index, rng):
+        raise NotImplementedError
+
+
+class AnonymousBrowse(Scenario):
+    name = 'browse'
+    description = 'Anonymous feed browsing, search, filters and listing details'
+
+    def steps(self, data, index, rng):
+        yield 'feed', 'get', '/api/listings/', {}
+        yield 'search', 'get', '/api/listings/', {'data': {'search': rng.choice(SEARCH_TERMS)}}
+        yield 'filter', 'get', '/api/listings/', {
+            'data': {'course_requirement': rng.choice(COURSES), 'ordering': '-application_deadline'},
+        }
+        yield 'detail', 'get', f'/api/listings/{rng.choice(data["listings"])}/', {}
+
+
+class ApplyRush(Scenario):
+    name = 'apply_rush'
+    description = 'Deadline-day applications with resume uploads'
+
+    def _pair(self, data, index):
+        free = data['students'][:len(data['students']) // 2]
+        return free[index % len(free)], data['deadline_listings'][(index // len(free)) % len(data['deadline_listings'])]
+
+    def identity(self, data, index):
+        return self._pair(data, index)[0]
+
+    def steps(self, data, index, rng):
+        _, listing_id = self._pair(data, index)
+        yield 'detail', 'get', f'/api/listings/{listing_id}/', {}
+        yield 'apply', 'post', '/api/applications/', {
+            'data': {
+                'listing': listing_id,
+                'cover_letter': 'I would love to join your team.',
+                'resume': SimpleUploadedFile('resume.pdf', RESUME, content_type='application/pdf'),
+            },
+        }
+        yield 'my_applications', 'get', '/api/applications/', {}
+
+
+class PipelineReview(Scenario):
+    name = 'pipeline_review'
+    description = 'Companies reviewing applicants and moving them through the pipeline'
+
+    def identity(self, data, index):
+        return data['companies'][index % len(data['companies'])]
+
+    def steps(self, data, index, rng):
+        yield 'stats', 'get', '/api/dashboard/company-stats/', {}
+        yield 'applications', 'get', '/api/applications/', {}
+        application_ids = data['applications_by_company'].get(self.identity(data, index))
+        if application_ids:
+            yield 'update_status', 'patch', f'/api/applications/{rng.choice(application_ids)}/', {
+                'data': {'status': rng.choice(['under_review', 'for_interview', 'accepted', 'rejected'])},
+                'content_type': 'application/json',
+            }
+
+
+class NotificationPolling(Scenario):
+    name = 'notification_polling'
+    description = 'Logged-in students polling notifications and unread counts'
+
+    def identity(self, data, index):
+        return data['students'][index % len(data['students'])]
+
+    def steps(self, data, index, rng):
+        since = (timezone.now() - timedelta(minutes=5)).isoformat()
+        yield 'stats', 'get', '/api/notifications/stats/', {}
+        yield 'delta', 'get', '/api/notifications/', {'data': {'since': since}}
+        yield 'full_list', 'get', '/api/notifications/', {}
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (
+    AnonymousBrowse(), ApplyRush(), PipelineReview(), NotificationPolling(),
+)}
+
+
+def rng_for(seed, scenario, index):
+    return random.Random(f'{seed}:{scenario}:{index}')
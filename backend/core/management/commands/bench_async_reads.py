@@ -0,0 +1,160 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+from core.loadtest.runner import percentile
+
+
+def wsgi_get(application, url, cookie=''):
+    parts = urlsplit(url)
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': parts.path,
+        'QUERY_STRING': parts.query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': 'localhost',
+        'HTTP_COOKIE': cookie,
+        'wsgi.input': BytesIO(),
+        'wsgi.url_scheme': 'http',
+        'wsgi.errors': BytesIO(),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        'wsgi.version': (1, 0),
+    }
+    status = {}
+
+    def start_response(status_line, headers, exc_info=None):
+        status['code'] = int(status_line.split()[0])
+
+    body = b''.join(application(environ, start_response))
+    return status['code'], body
+
+
+async def asgi_get(application, url, cookie=''):
+    parts = urlsplit(url)
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': parts.path,
+        'raw_path': parts.path.encode(),
+        'query_string': parts.query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost'), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    sent_request = False
+    disconnected = asyncio.Event()
+    status = {}
+    chunks = []
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status['code'] = message['status']
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    await application(scope, receive, send)
+    disconnected.set()
+    return status['code'], b''.join(chunks)
+
+
+class Command(BaseCommand):
+    help = (
+        'Hit a read endpoint with many concurrent clients through backend.wsgi '
+        '(thread pool) and backend.asgi (one event loop) and compare req/s and p99'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/api/listings/', help='Endpoint to request')
+        parser.add_argument('--clients', type=int, default=1000, help='Concurrent clients')
+        parser.add_argument('--wsgi-threads', type=int, default=8, help='Worker threads for the WSGI baseline')
+        parser.add_argument('--cookie', default='', help='Cookie header, e.g. access_token=...')
+        parser.add_argument(
+            '--stack', choices=['both', 'wsgi', 'asgi'], default='both',
+            help='The WSGI baseline runs in a subprocess with ASYNC_READ_VIEWS=0 so it uses the sync views',
+        )
+
+    def report(self, label, latencies, statuses, elapsed):
+        ordered = sorted(latencies)
+        errors = sum(1 for code in statuses if code >= 400)
+        self.stdout.write(
+            f'{label:<24}{len(ordered) / elapsed:>10.1f}{percentile(ordered, 0.5) * 1000:>10.1f}'
+            f'{percentile(ordered, 0.99) * 1000:>10.1f}{errors:>8}'
+        )
+
+    def run_wsgi(self, url, clients, threads, cookie):
+        from backend.wsgi import application
+
+        submitted = time.perf_counter()
+
+        def one(_):
+            code, _body = wsgi_get(application, url, cookie)
+            # Latency includes time queued behind busy workers, as a client sees it
+            return code, time.perf_counter() - submitted
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(one, range(clients)))
+        return results, time.perf_counter() - submitted
+
+    async def run_asgi(self, url, clients, cookie):
+        from backend.asgi import application
+
+        started = time.perf_counter()
+
+        async def one():
+            code, _body = await asgi_get(application, url, cookie)
+            return code, time.perf_counter() - started
+
+        results = await asyncio.gather(*(one() for _ in range(clients)))
+        return results, time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        url, clients, cookie = options['url'], options['clients'], options['cookie']
+
+        if options['stack'] == 'both':
+            self.stdout.write(f'{url} with {clients} concurrent clients')
+            self.stdout.write(f'{"stack":<24}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"errors":>8}')
+            for stack, async_views in (('wsgi', '0'), ('asgi', '1')):
+                command = [
+                    sys.executable, sys.argv[0], 'bench_async_reads', '--stack', stack, '--url', url,
+                    '--clients', str(clients), '--wsgi-threads', str(options['wsgi_threads']), '--cookie', cookie,
+                ]
+                output = subprocess.run(
+                    command, env={**os.environ, 'ASYNC_READ_VIEWS': async_views},
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                self.stdout.write(output.rstrip())
+            return
+
+        if options['stack'] == 'wsgi':
+            from backend.wsgi import application
+            wsgi_get(application, url, cookie)  # warm up
+            results, elapsed = self.run_wsgi(url, clients, options['wsgi_threads'], cookie)
+            label = f'wsgi ({options["wsgi_threads"]} threads)'
+        else:
+            from backend.asgi import application
+            asyncio.run(asgi_get(application, url, cookie))  # warm up
+            results, elapsed = asyncio.run(self.run_asgi(url, clients, cookie))
+            label = 'asgi (1 event loop)'
+        self.report(label, [r[1] for r in results], [r[0] for r in results], elapsed)
@@ -0,0 +1,89 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import User
+from core.candidate_search import rebuild_candidate_index, search_candidates
+
+SKILLS = [
+    'Python', 'Java', 'SQL', 'Excel', 'Bookkeeping', 'Auditing', 'Lesson planning', 'Classroom management',
+    'Customer service', 'Food safety', 'Front office', 'Marketing', 'Sales', 'Photoshop', 'Networking',
+    'Linux', 'React', 'Django', 'Payroll', 'Public speaking', 'Tagalog', 'English', 'Research', 'Data entry',
+]
+BIO_WORDS = [
+    'motivated', 'student', 'looking', 'for', 'internship', 'experience', 'team', 'player', 'fast', 'learner',
+    'organized', 'detail', 'oriented', 'projects', 'school', 'volunteer', 'leadership', 'hospitality', 'finance',
+    'teaching', 'software', 'hardware', 'design', 'community', 'events', 'startup', 'analytics', 'operations',
+]
+COURSES = [value for value, _ in User.COURSE_CHOICES]
+PAGE_SIZE = 20
+QUERIES = [
+    ('common term', {'text': 'python'}),
+    ('two terms', {'text': 'python django'}),
+    ('prefix', {'text': 'pay'}),
+    ('term + course + year', {'text': 'excel', 'course': 'coa', 'year_level': 4}),
+    ('rare term', {'text': 'payroll tagalog leadership'}),
+    ('filters only', {'course': 'cit', 'year_level': 3}),
+]
+
+
+class Command(BaseCommand):
+    help = 'Time candidate searches over N opted-in students (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200000)
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def best_ms(self, func, iterations):
+        best = None
+        for _ in range(iterations):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000, result
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        # Throwaway data, rolled back at the end
+        with transaction.atomic():
+            started = time.perf_counter()
+            User.objects.bulk_create([
+                User(
+                    username=f'bench-candidate-{index}', password='!', role='student', open_to_search=True,
+                    first_name=f'Student{index}', last_name='Bench',
+                    course=rng.choice(COURSES), year_level=rng.choice([3, 4]),
+                    skills=', '.join(rng.sample(SKILLS, 4)),
+                    bio=' '.join(rng.choices(BIO_WORDS, k=20)),
+                )
+                for index in range(options['students'])
+            ], batch_size=5000)
+            indexed = rebuild_candidate_index(chunk_size=5000)
+            self.stdout.write(f'Indexed {indexed} students in {time.perf_counter() - started:.1f}s')
+
+            self.stdout.write(f'{"query":<24}{"page 1 ms":>11}{"page 5 ms":>11}{"hits":>6}')
+            for label, query in QUERIES:
+                first_ms, page = self.best_ms(
+                    lambda: search_candidates(**query, limit=PAGE_SIZE + 1), options['iterations'],
+                )
+                after = None
+                for _ in range(4):
+                    rows = search_candidates(**query, after=after, limit=PAGE_SIZE + 1)
+                    # Small data sets (e.g. --students 2000) run out of pages before page 5
+                    if len(rows) <= PAGE_SIZE:
+                        after = None
+                        break
+                    after = rows[PAGE_SIZE - 1]
+                if after is None:
+                    deep = '-'
+                else:
+                    deep_ms, _ = self.best_ms(
+                        lambda: search_candidates(**query, after=after, limit=PAGE_SIZE + 1), options['iterations'],
+                    )
+                    deep = f'{deep_ms:.1f}'
+                self.stdout.write(f'{label:<24}{first_ms:>11.1f}{deep:>11}{len(page):>6}')
+            transaction.set_rollback(True)
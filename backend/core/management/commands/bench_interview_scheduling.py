@@ -0,0 +1,71 @@
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from core.interviews import allocate_slots, free_intervals, schedule_interviews
+from core.models import Application, Notification, OJTListing
+
+
+class Command(BaseCommand):
+    help = 'Time batch interview scheduling for N applicants (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applicants', type=int, default=1000)
+        parser.add_argument('--slot-minutes', type=int, default=15)
+        parser.add_argument('--days', type=int, default=40)
+
+    def handle(self, *args, **options):
+        count = options['applicants']
+        slot = timedelta(minutes=options['slot_minutes'])
+        first_day = timezone.make_aware(datetime.combine(timezone.localdate() + timedelta(days=1), datetime.min.time()))
+        # 8:00-12:00 and 13:00-17:00 every day, plus an overlapping window the allocator has to merge
+        windows = []
+        for day in range(options['days']):
+            start = first_day + timedelta(days=day)
+            windows += [
+                (start + timedelta(hours=8), start + timedelta(hours=12)),
+                (start + timedelta(hours=13), start + timedelta(hours=17)),
+                (start + timedelta(hours=11), start + timedelta(hours=14)),
+            ]
+
+        started = time.perf_counter()
+        applicants = [(index, index) for index in range(count)]
+        booked = allocate_slots(free_intervals(windows, []), applicants, slot)
+        self.stdout.write(
+            f'allocate_slots: {len(booked)}/{count} booked in {(time.perf_counter() - started) * 1000:.2f} ms'
+        )
+
+        # Throwaway data, rolled back at the end
+        with transaction.atomic():
+            company = User.objects.create(username='bench-interview-company', password='!', role='company')
+            today = timezone.localdate()
+            listing = OJTListing.objects.create(
+                company=company, title='Bench interviews', required_hours=300, duration_weeks=8,
+                location='Bench', description='-', responsibilities='-', learning_outcomes='-',
+                slots_available=count, start_date=today + timedelta(days=60),
+                end_date=today + timedelta(days=120), application_deadline=today + timedelta(days=30),
+            )
+            User.objects.bulk_create([
+                User(username=f'bench-interview-{index}', password='!', role='student')
+                for index in range(count)
+            ], batch_size=5000)
+            students = User.objects.filter(username__startswith='bench-interview-', role='student')
+            Application.objects.bulk_create([
+                Application(student=student, listing=listing, cover_letter='-', status='for_interview')
+                for student in students
+            ], batch_size=5000)
+            applications = Application.objects.filter(listing=listing)
+
+            started = time.perf_counter()
+            booked, unscheduled = schedule_interviews(company, applications, windows, options['slot_minutes'])
+            elapsed = (time.perf_counter() - started) * 1000
+            notified = Notification.objects.filter(notification_type='interview_scheduled', data__listing_id=listing.id).count()
+            self.stdout.write(
+                f'schedule_interviews: {len(booked)} booked, {len(unscheduled)} unscheduled, '
+                f'{notified} notified in {elapsed:.1f} ms'
+            )
+            transaction.set_rollback(True)
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils.text import compress_string
+from rest_framework.request import Request
+
+from accounts.models import User
+from backend import fast_json
+from backend.compression import brotli, get_compression_settings
+from core.loadtest.data import seed
+from core.models import OJTListing
+from core.serializers import OJTListingSerializer
+
+
+class Command(BaseCommand):
+    help = 'Encode a listing feed with each available JSON backend and report CPU time and bytes on the wire'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--listings', type=int, default=1000, help='Listings in the feed')
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def cpu_ms(self, func, iterations):
+        started = time.process_time()
+        for _ in range(iterations):
+            result = func()
+        return (time.process_time() - started) / iterations * 1000, result
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        companies = max(1, options['listings'] // 50)
+
+        # Throwaway data, rolled back at the end
+        with transaction.atomic():
+            seed(students=0, companies=companies, listings_per_company=options['listings'] // companies)
+            request = Request(RequestFactory().get('/api/listings/'))
+            request.user = User()
+            listings = OJTListing.objects.select_related('company').order_by('-created_at')
+            data = OJTListingSerializer(listings, many=True, context={'request': request}).data
+            transaction.set_rollback(True)
+
+        backends = ['json'] + [name for name, module in (('orjson', fast_json.orjson), ('msgspec', fast_json.msgspec)) if module]
+        self.stdout.write(f'{len(data)} listings, {iterations} iterations')
+        self.stdout.write(f'{"encoding":<20}{"cpu ms":>10}{"bytes":>12}')
+        for backend in backends:
+            encode_ms, body = self.cpu_ms(lambda: fast_json.dumps(data, backend), iterations)
+            self.stdout.write(f'{backend:<20}{encode_ms:>10.2f}{len(body):>12,}')
+
+        body = fast_json.dumps(data)
+        gzip_ms, gzipped = self.cpu_ms(lambda: compress_string(body), iterations)
+        self.stdout.write(f'{"+ gzip":<20}{gzip_ms:>10.2f}{len(gzipped):>12,}')
+        if brotli is not None:
+            quality = get_compression_settings()['BROTLI_QUALITY']
+            brotli_ms, compressed = self.cpu_ms(lambda: brotli.compress(body, quality=quality), iterations)
+            self.stdout.write(f'{f"+ brotli (q{quality})":<20}{brotli_ms:>10.2f}{len(compressed):>12,}')
+        else:
+            self.stdout.write('brotli is not installed; skipped')
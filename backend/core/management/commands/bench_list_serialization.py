@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from accounts.models import User
+from backend.fast_json import dumps
+from core.fast_serializers import ValuesSerializer
+from core.loadtest.data import seed
+from core.models import Application, OJTListing
+from core.serializers import ApplicationSerializer, OJTListingSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare ModelSerializer and the values()-based fast path on the listing and application '
+        'lists: check the output is identical and report the cost per row'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--companies', type=int, default=50)
+        parser.add_argument('--iterations', type=int, default=5)
+
+    def best_ms(self, func, iterations):
+        best = None
+        for _ in range(iterations):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000, result
+
+    def handle(self, *args, **options):
+        request = Request(RequestFactory().get('/api/listings/', HTTP_HOST='localhost'))
+        context = {'request': request}
+        cases = [
+            ('listings', OJTListingSerializer, lambda: OJTListing.objects.order_by('-created_at'), ['company']),
+            ('applications', ApplicationSerializer, lambda: Application.objects.order_by('-applied_at'),
+             ['student', 'listing__company']),
+        ]
+
+        # Throwaway data, rolled back at the end
+        with transaction.atomic():
+            seed(students=options['students'], companies=options['companies'])
+            # Some profile images so file URLs and thumbnails are exercised too
+            User.objects.filter(role='company').update(
+                profile_image='profile_images/logo.png',
+                profile_thumbnails={'source': 'profile_images/logo.png', 'small': {'webp': 'thumbnails/a-64.webp'}},
+            )
+            request.user = User.objects.filter(role='company').first()
+
+            self.stdout.write(f'{"list":<14}{"rows":>7}{"serializer ms":>15}{"values ms":>11}{"us/row":>9}{"us/row":>9}{"speedup":>9}')
+            for label, serializer_class, queryset, related in cases:
+                slow_ms, slow = self.best_ms(
+                    lambda: serializer_class(queryset().select_related(*related), many=True, context=context).data,
+                    options['iterations'],
+                )
+                fast_ms, fast = self.best_ms(
+                    lambda: ValuesSerializer(serializer_class, context).serialize(queryset()), options['iterations'],
+                )
+                if dumps(slow) != dumps(fast):
+                    raise CommandError(f'{label}: fast path output differs from {serializer_class.__name__}')
+                rows = len(slow)
+                self.stdout.write(
+                    f'{label:<14}{rows:>7}{slow_ms:>15.1f}{fast_ms:>11.1f}{slow_ms * 1000 / rows:>9.1f}'
+                    f'{fast_ms * 1000 / rows:>9.1f}{slow_ms / fast_ms:>8.1f}x'
+                )
+
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Outputs are identical'))
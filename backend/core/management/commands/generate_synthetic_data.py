@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.synthetic import Generator
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a large, deterministic dataset of students, companies, listings, applications '
+        'and notifications for performance work. Never run this against production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=50000)
+        parser.add_argument('--companies', type=int, default=2000)
+        parser.add_argument('--listings', type=int, default=20000)
+        parser.add_argument('--applications', type=int, default=1000000)
+        parser.add_argument('--notifications', type=int, default=2000000)
+        parser.add_argument('--seed', type=int, default=1, help='Same seed and options give the same data')
+        parser.add_argument('--prefix', default='syn', help='Username prefix for generated accounts')
+        parser.add_argument('--password', default='synthetic-password', help='Password shared by every generated account')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        last_report = {}
+
+        def progress(label, done):
+            # One line per 100k rows (and at the end of each table) is plenty
+            if done - last_report.get(label, 0) >= 100000 or done == generator.counts[label]:
+                last_report[label] = done
+                self.stdout.write(f'{label}: {done:,} ({time.monotonic() - started:.0f}s)')
+
+        generator = Generator(
+            students=options['students'], companies=options['companies'], listings=options['listings'],
+            applications=options['applications'], notifications=options['notifications'],
+            seed=options['seed'], prefix=options['prefix'], password=options['password'], progress=progress,
+        )
+        try:
+            counts = generator.generate()
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        summary = ', '.join(f'{count:,} {label}' for label, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Generated {summary} in {time.monotonic() - started:.0f}s'))
@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from core.loadtest.data import seed
+from core.loadtest.runner import compare, load_results, run_scenario
+from core.loadtest.scenarios import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay realistic traffic (browse, apply rush, pipeline review, notification polling) '
+        'against a seeded throwaway database and report req/s, p50/p95/p99 and queries per request'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='Scenario to run (repeatable, default: all)')
+        parser.add_argument('--visits', type=int, default=200, help='User visits per scenario')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for data and request parameters')
+        parser.add_argument('--students', type=int, default=200)
+        parser.add_argument('--companies', type=int, default=20)
+        parser.add_argument('--output', help='Results file (default: loadtest-results/<timestamp>.json)')
+        parser.add_argument('--compare', help='Previous results file to compare against')
+
+    def handle(self, *args, **options):
+        previous = load_results(options['compare']) if options['compare'] else None
+        names = options['scenario'] or list(SCENARIOS)
+
+        with tempfile.TemporaryDirectory(prefix='loadtest-') as workdir:
+            # A file database so concurrent clients see SQLite's real locking and WAL behaviour
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(workdir, 'loadtest.sqlite3')
+            setup_test_environment()
+            runner = DiscoverRunner(verbosity=0, interactive=False)
+            old_config = runner.setup_databases()
+            try:
+                with override_settings(MEDIA_ROOT=os.path.join(workdir, 'media')):
+                    data = seed(students=options['students'], companies=options['companies'], seed_value=options['seed'])
+                    results = {
+                        'started_at': datetime.now().isoformat(timespec='seconds'),
+                        'options': {key: options[key] for key in ('visits', 'concurrency', 'seed', 'students', 'companies')},
+                        'scenarios': {},
+                    }
+                    for name in names:
+                        self.stdout.write(f'Running {name}: {SCENARIOS[name].description}')
+                        results['scenarios'][name] = run_scenario(
+                            name, data, options['visits'], options['concurrency'], options['seed'],
+                        )
+            finally:
+                runner.teardown_databases(old_config)
+                teardown_test_environment()
+
+        self.report(results)
+        output = Path(options['output'] or f'loadtest-results/{datetime.now():%Y%m%d-%H%M%S}.json')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+        if previous:
+            self.report_comparison(compare(results, previous))
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"scenario / endpoint":<36}{"reqs":>7}{"err":>6}{"req/s":>9}'
+            f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"queries":>9}'
+        )
+        for name, result in results['scenarios'].items():
+            self.stdout.write(
+                f'{name:<36}{result["requests"]:>7}{result["errors"]:>6}{result["requests_per_second"]:>9}'
+                f'{result["p50_ms"]:>9}{result["p95_ms"]:>9}{result["p99_ms"]:>9}{result["queries_per_request"]:>9}'
+            )
+            for label, endpoint in result['endpoints'].items():
+                self.stdout.write(
+                    f'{"  " + label:<36}{endpoint["requests"]:>7}{endpoint["errors"]:>6}{"":>9}'
+                    f'{endpoint["p50_ms"]:>9}{endpoint["p95_ms"]:>9}{endpoint["p99_ms"]:>9}'
+                    f'{endpoint["queries_per_request"]:>9}'
+                )
+
+    def report_comparison(self, rows):
+        if not rows:
+            raise CommandError('Nothing to compare: no scenarios in common with the previous run')
+        self.stdout.write(f'\n{"scenario / endpoint":<36}{"metric":<22}{"before":>10}{"after":>10}{"change":>9}')
+        for name, label, metric, before, after, change in rows:
+            where = name if label == '*' else f'  {label}'
+            change = f'{change:+.1f}%' if change is not None else '-'
+            self.stdout.write(f'{where:<36}{metric:<22}{before!s:>10}{after!s:>10}{change:>9}')
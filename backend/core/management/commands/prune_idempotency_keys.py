@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.idempotency import prune_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete expired Idempotency-Key records (run daily)'
+
+    def handle(self, *args, **options):
+        deleted = prune_expired()
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} expired idempotency record(s)'))
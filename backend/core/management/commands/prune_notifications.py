@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.retention import archive_expired_notifications, compact_notification_bursts
+
+
+class Command(BaseCommand):
+    help = 'Archive expired notifications and fold bursts into digests (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows archived per transaction')
+        parser.add_argument('--skip-archive', action='store_true', help='Only build digests')
+        parser.add_argument('--skip-digest', action='store_true', help='Only archive expired rows')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+
+        if not options['skip_digest']:
+            digests = compact_notification_bursts(chunk_size=chunk_size)
+            self.stdout.write(f'Created {digests} digest notification(s)')
+
+        if not options['skip_archive']:
+            archived = archive_expired_notifications(chunk_size=chunk_size)
+            self.stdout.write(f'Archived {archived} expired notification(s)')
+
+        self.stdout.write(self.style.SUCCESS('Notification retention complete'))
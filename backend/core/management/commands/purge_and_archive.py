@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.archival import archive_completed_terms, purge_deleted_accounts, purge_deleted_listings
+
+
+class Command(BaseCommand):
+    help = 'Purge soft-deleted listings and accounts, and archive completed terms (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows removed per transaction')
+        parser.add_argument('--skip-purge', action='store_true', help='Only archive completed terms')
+        parser.add_argument('--skip-terms', action='store_true', help='Only purge deleted listings and accounts')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+
+        if not options['skip_purge']:
+            accounts = purge_deleted_accounts(chunk_size=chunk_size)
+            self.stdout.write(f'Purged {accounts} deleted account(s)')
+            listings = purge_deleted_listings(chunk_size=chunk_size)
+            self.stdout.write(f'Purged {listings} deleted listing(s)')
+
+        if not options['skip_terms']:
+            archived = archive_completed_terms(chunk_size=chunk_size)
+            self.stdout.write(f'Archived {archived} listing(s) from completed terms')
+
+        self.stdout.write(self.style.SUCCESS('Purge and archival complete'))
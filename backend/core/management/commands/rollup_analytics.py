@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.analytics import update_rollups
+
+
+class Command(BaseCommand):
+    help = 'Update the admin analytics rollup tables (run daily or more often)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild every day instead of only changed ones')
+
+    def handle(self, *args, **options):
+        days = update_rollups(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt analytics rollups for {days} day(s)'))
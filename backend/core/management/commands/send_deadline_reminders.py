@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.reminders import send_deadline_reminders
+
+
+class Command(BaseCommand):
+    help = "Remind eligible students who haven't applied that a listing deadline is near (run daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, nargs='+', default=None,
+            help='Days-before-deadline windows (default: settings.DEADLINE_REMINDER_DAYS)',
+        )
+
+    def handle(self, *args, **options):
+        created = send_deadline_reminders(windows=options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Created {created} deadline reminder(s)'))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.emails import dispatch_pending_emails
+
+
+class Command(BaseCommand):
+    help = 'Send pending notification emails in batches over one SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Notifications per batch')
+        parser.add_argument('--loop', action='store_true', help='Keep running as a worker')
+        parser.add_argument('--interval', type=int, default=30, help='Seconds between passes with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            emails, marked, skipped = dispatch_pending_emails(batch_size=options['batch_size'])
+            self.stdout.write(f'Sent {emails} email(s) covering {marked} notification(s)')
+            if skipped:
+                self.stdout.write(f'Skipped {skipped} notification(s) of users without an email address')
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
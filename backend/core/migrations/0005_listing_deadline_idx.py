@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_notification_email_pending_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ojtlisting',
+            index=models.Index(fields=['status', 'application_deadline'], name='listing_status_deadline_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_status_history(apps, schema_editor):
+    """Seed one creation row, plus one row for the current status if it moved on"""
+    Application = apps.get_model('core', 'Application')
+    ApplicationStatusChange = apps.get_model('core', 'ApplicationStatusChange')
+    statuses = ['applied', 'under_review', 'for_interview', 'interviewed', 'accepted', 'rejected', 'withdrawn']
+    codes = {value: code for code, value in enumerate(statuses, start=1)}
+
+    rows = []
+    for application in Application.objects.only('id', 'status', 'applied_at', 'updated_at').iterator(chunk_size=2000):
+        rows.append(ApplicationStatusChange(
+            application_id=application.id, from_status=0, to_status=codes['applied'],
+            changed_at=application.applied_at,
+        ))
+        if application.status != 'applied':
+            rows.append(ApplicationStatusChange(
+                application_id=application.id, from_status=codes['applied'],
+                to_status=codes[application.status], changed_at=application.updated_at,
+                dwell_seconds=int((application.updated_at - application.applied_at).total_seconds()),
+            ))
+        if len(rows) >= 2000:
+            ApplicationStatusChange.objects.bulk_create(rows)
+            rows = []
+    ApplicationStatusChange.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStatusChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.PositiveSmallIntegerField(default=0)),
+                ('to_status', models.PositiveSmallIntegerField()),
+                ('changed_at', models.DateTimeField()),
+                ('dwell_seconds', models.PositiveIntegerField(blank=True, null=True)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_changes', to='core.application')),
+            ],
+            options={
+                'ordering': ['changed_at'],
+                'indexes': [models.Index(fields=['changed_at', 'to_status'], name='status_change_time_idx'), models.Index(fields=['application', 'changed_at'], name='status_change_app_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_status_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:25
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def backfill_company_snapshots(apps, schema_editor):
+    OJTListing = apps.get_model('core', 'OJTListing')
+    User = apps.get_model('accounts', 'User')
+    for company in User.objects.filter(listings__isnull=False).distinct().iterator():
+        OJTListing.objects.filter(company=company).update(
+            company_name=company.company_name or '',
+            company_logo=default_storage.url(company.profile_image.name) if company.profile_image else '',
+            company_verified=company.is_verified,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_application_status_history'),
+        ('accounts', '0006_user_profile_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ojtlisting',
+            name='company_logo',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='ojtlisting',
+            name='company_name',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='ojtlisting',
+            name='company_verified',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_company_snapshots, migrations.RunPython.noop),
+    ]
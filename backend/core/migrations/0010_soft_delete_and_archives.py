@@ -0,0 +1,65 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_listing_company_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('listing_id', models.BigIntegerField(db_index=True)),
+                ('student_id', models.BigIntegerField(db_index=True)),
+                ('status', models.CharField(choices=[('applied', 'Applied'), ('under_review', 'Under Review'), ('for_interview', 'For Interview'), ('interviewed', 'Interviewed'), ('accepted', 'Accepted'), ('rejected', 'Rejected'), ('withdrawn', 'Withdrawn')], max_length=20)),
+                ('applied_at', models.DateTimeField()),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('reason', models.CharField(choices=[('deleted', 'Deleted'), ('term_ended', 'Term Ended')], max_length=20)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-applied_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ListingArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('company_id', models.BigIntegerField(db_index=True)),
+                ('company_name', models.CharField(blank=True, default='', max_length=100)),
+                ('title', models.CharField(max_length=200)),
+                ('status', models.CharField(choices=[('open', 'Open for Applications'), ('filled', 'Positions Filled'), ('closed', 'Closed'), ('ongoing', 'OJT Ongoing')], max_length=20)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField()),
+                ('reason', models.CharField(choices=[('deleted', 'Deleted'), ('term_ended', 'Term Ended')], max_length=20)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-archived_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='ojtlisting',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='ojtlisting',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='listing_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ojtlisting',
+            index=models.Index(fields=['end_date'], name='listing_end_date_idx'),
+        ),
+    ]
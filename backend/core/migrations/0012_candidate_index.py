@@ -0,0 +1,65 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+SQLITE_INDEX = [
+    # External-content FTS5 table over core_candidateindex.document, kept in step by triggers.
+    # No porter stemmer: it stems prefix queries too ("pay"* becomes "pai"*)
+    "CREATE VIRTUAL TABLE core_candidate_fts USING fts5("
+    "document, content='core_candidateindex', content_rowid='user_id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER core_candidate_fts_insert AFTER INSERT ON core_candidateindex BEGIN "
+    "INSERT INTO core_candidate_fts(rowid, document) VALUES (new.user_id, new.document); END",
+    "CREATE TRIGGER core_candidate_fts_delete AFTER DELETE ON core_candidateindex BEGIN "
+    "INSERT INTO core_candidate_fts(core_candidate_fts, rowid, document) VALUES ('delete', old.user_id, old.document); END",
+    "CREATE TRIGGER core_candidate_fts_update AFTER UPDATE ON core_candidateindex BEGIN "
+    "INSERT INTO core_candidate_fts(core_candidate_fts, rowid, document) VALUES ('delete', old.user_id, old.document); "
+    "INSERT INTO core_candidate_fts(rowid, document) VALUES (new.user_id, new.document); END",
+]
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS core_candidate_fts_update',
+    'DROP TRIGGER IF EXISTS core_candidate_fts_delete',
+    'DROP TRIGGER IF EXISTS core_candidate_fts_insert',
+    'DROP TABLE IF EXISTS core_candidate_fts',
+]
+POSTGRES_INDEX = [
+    "CREATE INDEX candidate_document_fts_idx ON core_candidateindex USING GIN (to_tsvector('english', document))",
+]
+POSTGRES_DROP = ['DROP INDEX IF EXISTS candidate_document_fts_idx']
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for statement in statements.get(vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_user_candidate_search'),
+        ('core', '0011_idempotency_record'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateIndex',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='candidate_index', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('course', models.CharField(blank=True, default='', max_length=10)),
+                ('year_level', models.IntegerField(blank=True, null=True)),
+                ('document', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course', 'year_level', '-user'], name='candidate_filter_idx')],
+            },
+        ),
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_INDEX, 'postgresql': POSTGRES_INDEX}),
+            _run({'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def key_existing_reminders(apps, schema_editor):
+    # Earlier reminders were only told apart by data; the first of any duplicates keeps the key
+    Notification = apps.get_model('core', 'Notification')
+    reminders = (
+        Notification.objects.filter(notification_type='deadline_reminder')
+        .order_by('id').values_list('id', 'user_id', 'data')
+    )
+    seen, updates = set(), []
+    for pk, user_id, data in reminders.iterator():
+        if not isinstance(data, dict) or 'listing_id' not in data or 'days_left' not in data:
+            continue
+        key = f"listing:{data['listing_id']}:days:{data['days_left']}"
+        if (user_id, key) not in seen:
+            seen.add((user_id, key))
+            updates.append(Notification(id=pk, dedupe_key=key))
+    Notification.objects.bulk_update(updates, ['dedupe_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_notification_archive_sync_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='dedupe_key',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.RunPython(key_existing_reminders, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('dedupe_key__isnull', False)), fields=('user', 'notification_type', 'dedupe_key'), name='notif_dedupe_uniq'),
+        ),
+    ]
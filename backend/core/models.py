@@ -1,8 +1,16 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from accounts.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 # Create your models here.
 
+class ListingManager(models.Manager):
+    """Hides soft-deleted listings; ``OJTListing.all_objects`` still sees them"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class OJTListing(models.Model):
     COURSE_CHOICES = [
         ('cit', 'Information Technology (CIT)'),
@@ -39,6 +47,11 @@ class OJTListing(models.Model):
     ]
 
     company = models.ForeignKey(User, on_delete=models.CASCADE, related_name='listings')
+    # Snapshot of the company's public profile, kept in sync by core.company_snapshot,
+    # so the feed and search never need to join accounts_user
+    company_name = models.CharField(max_length=100, blank=True, default='')
+    company_logo = models.CharField(max_length=255, blank=True, default='')
+    company_verified = models.BooleanField(default=False)
     title = models.CharField(max_length=200, help_text="e.g., OJT Intern - IT Department")
     ojt_type = models.CharField(max_length=20, choices=OJT_TYPE_CHOICES, default='required')
     required_hours = models.IntegerField(default=500)
@@ -69,27 +82,87 @@ class OJTListing(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set by core.archival.soft_delete_listing; the purge job removes the row and its applications later
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ListingManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # Deadline reminders look up open listings closing on a given day
+            models.Index(fields=['status', 'application_deadline'], name='listing_status_deadline_idx'),
+            # Purge queue: only soft-deleted rows are indexed
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='listing_deleted_idx'),
+            # Term archival picks listings whose OJT ended long ago
+            models.Index(fields=['end_date'], name='listing_end_date_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.title} - {self.company.company_name}"
+        return f"{self.title} - {self.company_name}"
     
     @property
     def is_active(self):
         return self.status == 'open'
     
-    @property
-    def company_name(self):
-        return self.company.company_name
-    
     @property
     def duration_months(self):
         """Calculate approximate duration in months"""
         return round(self.duration_weeks / 4.33, 1)
     
+    @staticmethod
+    def company_snapshot(company):
+        """Field values for the denormalized company snapshot"""
+        return {
+            'company_name': company.company_name or '',
+            'company_logo': company.profile_image.url if company.profile_image else '',
+            'company_verified': company.is_verified,
+        }
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored company so save() can refresh the snapshot when it changes
+        instance._loaded_company_id = instance.__dict__.get('company_id')
+        return instance
+
     def save(self, *args, **kwargs):
         # Auto-set has_allowance based on allowance field
         self.has_allowance = bool(self.allowance)
+        moved = self.company_id != getattr(self, '_loaded_company_id', self.company_id)
+        if self.company_id and (self._state.adding or moved):
+            snapshot = self.company_snapshot(self.company)
+            for field, value in snapshot.items():
+                setattr(self, field, value)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], *snapshot}
         super().save(*args, **kwargs)
+        self._loaded_company_id = self.company_id
+
+class ApplicationQuerySet(models.QuerySet):
+    def visible(self):
+        """Applications whose listing isn't soft-deleted (it's still there until the purge job runs)"""
+        return self.filter(listing__deleted_at__isnull=True)
+
+    def set_status(self, status, **fields):
+        """
+        Bulk status change that still records one ApplicationStatusChange per
+        application and keeps stored dashboard stats current. Use this
+        instead of ``.update(status=...)``.
+        Returns the number of applications changed.
+        """
+        from .stats import applications_updated
+
+        now = timezone.now()
+        with transaction.atomic():
+            previous = dict(self.exclude(status=status).values_list('id', 'status'))
+            if not previous:
+                return 0
+            Application.objects.filter(id__in=previous).update(status=status, updated_at=now, **fields)
+            ApplicationStatusChange.record_many(previous, status, now)
+            applications_updated(list(previous))
+        return len(previous)
+
 
 class Application(models.Model):
     STATUS_CHOICES = [
@@ -121,12 +194,105 @@ class Application(models.Model):
     interview_notes = models.TextField(blank=True)
     final_feedback = models.TextField(blank=True)
 
+    objects = ApplicationQuerySet.as_manager()
+
     class Meta:
         unique_together = ['student', 'listing']
         ordering = ['-applied_at']
+        indexes = [
+            # Analytics rollups re-read applications by day
+            models.Index(fields=['applied_at'], name='application_applied_idx'),
+            models.Index(fields=['updated_at'], name='application_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.username} - {self.listing.title}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so save() can log transitions
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def save(self, *args, **kwargs):
+        previous = getattr(self, '_loaded_status', None)
+        super().save(*args, **kwargs)
+        if previous != self.status:
+            ApplicationStatusChange.record(self, previous, self.status)
+            self._loaded_status = self.status
+
+
+class ApplicationStatusChange(models.Model):
+    """
+    Append-only log of application status transitions. Statuses are stored as
+    small integer codes (see STATUS_CODES, 0 = newly created) to keep rows compact.
+    """
+    STATUS_CODES = {value: code for code, (value, _) in enumerate(Application.STATUS_CHOICES, start=1)}
+    STATUS_NAMES = {code: value for value, code in STATUS_CODES.items()}
+
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='status_changes')
+    from_status = models.PositiveSmallIntegerField(default=0)
+    to_status = models.PositiveSmallIntegerField()
+    changed_at = models.DateTimeField()
+    # Time spent in from_status, filled at write time so reports never need to pair rows
+    dwell_seconds = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['changed_at']
+        indexes = [
+            models.Index(fields=['changed_at', 'to_status'], name='status_change_time_idx'),
+            models.Index(fields=['application', 'changed_at'], name='status_change_app_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.application_id}: {self.from_status_name or "-"} -> {self.to_status_name}'
+
+    @property
+    def from_status_name(self):
+        return self.STATUS_NAMES.get(self.from_status)
+
+    @property
+    def to_status_name(self):
+        return self.STATUS_NAMES.get(self.to_status)
+
+    @classmethod
+    def record(cls, application, from_status, to_status):
+        now = timezone.now()
+        entered_at = (
+            cls.objects.filter(application=application)
+            .order_by('-changed_at').values_list('changed_at', flat=True).first()
+        ) or (application.applied_at if from_status else None)
+        return cls.objects.create(
+            application=application,
+            from_status=cls.STATUS_CODES.get(from_status, 0),
+            to_status=cls.STATUS_CODES[to_status],
+            changed_at=now,
+            dwell_seconds=int((now - entered_at).total_seconds()) if entered_at else None,
+        )
+
+    @classmethod
+    def record_many(cls, previous_statuses, to_status, changed_at):
+        """Log a bulk change; ``previous_statuses`` maps application id to its old status"""
+        entered = dict(
+            cls.objects.filter(application_id__in=previous_statuses)
+            .values('application_id').annotate(last=models.Max('changed_at'))
+            .values_list('application_id', 'last')
+        )
+        missing = [pk for pk in previous_statuses if pk not in entered]
+        if missing:
+            entered.update(Application.objects.filter(id__in=missing).values_list('id', 'applied_at'))
+
+        cls.objects.bulk_create([
+            cls(
+                application_id=pk,
+                from_status=cls.STATUS_CODES.get(status, 0),
+                to_status=cls.STATUS_CODES[to_status],
+                changed_at=changed_at,
+                dwell_seconds=int((changed_at - entered[pk]).total_seconds()) if entered.get(pk) else None,
+            )
+            for pk, status in previous_statuses.items()
+        ], batch_size=1000)
     
 
 class Notification(models.Model):
@@ -145,12 +311,34 @@ class Notification(models.Model):
     title = models.CharField(max_length=200)
     message = models.TextField()
     data = models.JSONField(default=dict, blank=True)
+    # Set on notifications a job must send only once per user, e.g. deadline
+    # reminders ("listing:<id>:days:<n>"); unique per user and type
+    dedupe_key = models.CharField(max_length=100, null=True, blank=True)
     is_read = models.BooleanField(default=False)
     is_email_sent = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            # Also the index the reminder job's "already sent" anti-join uses
+            models.UniqueConstraint(
+                fields=['user', 'notification_type', 'dedupe_key'],
+                condition=models.Q(dedupe_key__isnull=False),
+                name='notif_dedupe_uniq',
+            ),
+        ]
+        indexes = [
+            # Cursor pagination walks (user, created_at, id) newest first
+            models.Index(fields=['user', '-created_at', '-id'], name='notif_user_created_idx'),
+            # Delta sync picks up rows created or changed since the last poll
+            models.Index(fields=['user', 'updated_at'], name='notif_user_updated_idx'),
+            # Retention sweeps expire read rows per type by age
+            models.Index(fields=['notification_type', 'is_read', 'created_at'], name='notif_retention_idx'),
+            # Email dispatcher queue: only unsent rows are indexed
+            models.Index(fields=['id'], condition=models.Q(is_email_sent=False), name='notif_email_pending_idx'),
+        ]
 
     def __str__(self):
             return f'{self.user.username} - {self.title}'
@@ -161,4 +349,178 @@ class Notification(models.Model):
 
     def mark_email_sent(self):
             self.is_email_sent = True
-            self.save()
\ No newline at end of file
+            self.save()
+
+
+class DashboardStats(models.Model):
+    """Materialized dashboard numbers per user, maintained by core.stats"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='dashboard_stats')
+    stats = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Dashboard stats for {self.user_id}'
+
+
+class ApplicationDailyRollup(models.Model):
+    """
+    Application counts per day, student course and company, maintained by
+    core.analytics. Applications count on the day they were submitted,
+    decisions (accepted/rejected) on the day they were made.
+    """
+    day = models.DateField()
+    course = models.CharField(max_length=10, blank=True, default='')
+    company = models.ForeignKey(User, on_delete=models.CASCADE, related_name='application_rollups')
+    applications = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    decision_seconds = models.BigIntegerField(default=0, help_text="Sum of applied-to-decision time over decisions")
+
+    class Meta:
+        unique_together = ['day', 'course', 'company']
+        ordering = ['-day']
+
+    def __str__(self):
+        return f'{self.day} {self.course or "-"} {self.company_id}'
+
+
+class CoursePlacementSnapshot(models.Model):
+    """Daily per-course snapshot of how many students applied and got placed"""
+    day = models.DateField()
+    course = models.CharField(max_length=10, blank=True, default='')
+    students = models.PositiveIntegerField(default=0)
+    applicants = models.PositiveIntegerField(default=0)
+    placed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['day', 'course']
+        ordering = ['-day']
+
+    def __str__(self):
+        return f'{self.day} {self.course or "-"}'
+
+
+class AnalyticsCheckpoint(models.Model):
+    """Last time a rollup job ran, so the next run only revisits changed days"""
+    name = models.CharField(max_length=50, primary_key=True)
+    last_run_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.name} @ {self.last_run_at}'
+
+
+class NotificationArchive(models.Model):
+    """Cold storage for notifications moved out of the hot table by core.retention"""
+    original_id = models.BigIntegerField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    notification_type = models.CharField(max_length=50, choices=Notification.TYPE_CHOICES)
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+    is_read = models.BooleanField(default=False)
+    is_email_sent = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notif_archive_user_idx'),
+            # Delta sync reports what was archived since the client's last sync
+            models.Index(fields=['user', 'archived_at'], name='notif_archive_sync_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} - {self.title} (archived)'
+
+
+class ListingArchive(models.Model):
+    """Cold storage for listings moved out of the hot table by core.archival"""
+    REASON_CHOICES = [
+        ('deleted', 'Deleted'),
+        ('term_ended', 'Term Ended'),
+    ]
+
+    original_id = models.BigIntegerField(unique=True)
+    # Plain ids: archived rows outlive the accounts they point to
+    company_id = models.BigIntegerField(db_index=True)
+    company_name = models.CharField(max_length=100, blank=True, default='')
+    title = models.CharField(max_length=200)
+    status = models.CharField(max_length=20, choices=OJTListing.STATUS_CHOICES)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    # Every other column of the listing, as it was when archived
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-archived_at']
+
+    def __str__(self):
+        return f'{self.title} - {self.company_name} (archived)'
+
+
+class ApplicationArchive(models.Model):
+    """Cold storage for applications moved out of the hot table by core.archival"""
+    original_id = models.BigIntegerField(unique=True)
+    listing_id = models.BigIntegerField(db_index=True)
+    student_id = models.BigIntegerField(db_index=True)
+    status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES)
+    applied_at = models.DateTimeField()
+    # Every other column plus the status history, as they were when archived
+    data = models.JSONField(default=dict, blank=True)
+    reason = models.CharField(max_length=20, choices=ListingArchive.REASON_CHOICES)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-applied_at']
+
+    def __str__(self):
+        return f'{self.student_id} - {self.listing_id} (archived)'
+
+
+class IdempotencyRecord(models.Model):
+    """
+    The stored outcome of a create request sent with an ``Idempotency-Key``
+    header, so retries are answered without running it again (core.idempotency)
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_records')
+    key = models.CharField(max_length=255)
+    request_path = models.CharField(max_length=255)
+    # Null while the first request is still being processed
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} {self.key} -> {self.status_code or "pending"}'
+
+
+class CandidateIndex(models.Model):
+    """
+    One row per student listed in the candidate search, maintained by
+    core.candidate_search. ``document`` feeds the full-text index the
+    migration creates next to this table (FTS5 on SQLite, GIN on PostgreSQL).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='candidate_index')
+    course = models.CharField(max_length=10, blank=True, default='')
+    year_level = models.IntegerField(null=True, blank=True)
+    document = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Filter-only searches walk (course, year_level) newest user first
+            models.Index(fields=['course', 'year_level', '-user'], name='candidate_filter_idx'),
+        ]
+
+    def __str__(self):
+        return f'Candidate {self.user_id}'
@@ -0,0 +1,29 @@
+import base64
+import json
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.pagination import CursorPagination
+
+
+class NotificationCursorPagination(CursorPagination):
+    """Keyset pagination over (created_at, id), newest first"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+def encode_sync_token(updated_at, last_id, deleted_after):
+    """Delta sync position: the last (updated_at, id) sent, and when deletions were last reported"""
+    values = [updated_at.isoformat(), last_id, deleted_after.isoformat()]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_sync_token(token):
+    """(updated_at, id, deleted_after) from a sync token, or None if it is malformed"""
+    try:
+        updated_at, last_id, deleted_after = json.loads(base64.urlsafe_b64decode(token.encode()))
+        position = parse_datetime(updated_at), int(last_id), parse_datetime(deleted_after)
+    except (ValueError, TypeError):
+        return None
+    return None if None in position else position
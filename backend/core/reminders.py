@@ -0,0 +1,85 @@
+"""
+Deadline reminders for students who haven't applied yet.
+
+For every open listing whose deadline is exactly N days away (N from
+``DEADLINE_REMINDER_DAYS``) the eligible students are selected in one query
+per listing: course/year rules from ``ApplicationSerializer.validate``, minus
+students who already applied, minus students who already got this reminder.
+A reminder is identified by its ``dedupe_key`` (listing and days left), so
+that last check is a probe of the ``notif_dedupe_uniq`` index rather than a
+scan of the student's notifications, and the constraint turns a concurrent
+rerun's inserts into no-ops. Reruns on the same day therefore send nothing.
+"""
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+
+from accounts.models import User
+from .models import Application, Notification, OJTListing
+
+INSERT_BATCH_SIZE = 5000
+
+
+def eligible_students(listing):
+    """Active students allowed to apply to ``listing`` (mirrors ApplicationSerializer.validate)"""
+    students = User.objects.filter(role='student', is_active=True)
+    if listing.course_requirement != 'all':
+        students = students.filter(course=listing.course_requirement)
+    if listing.year_level_requirement > 0:
+        students = students.filter(year_level__gte=listing.year_level_requirement)
+    return students
+
+
+def reminder_key(listing, days_left):
+    return f'listing:{listing.id}:days:{days_left}'
+
+
+def students_to_remind(listing, days_left):
+    already_applied = Application.objects.filter(student=OuterRef('pk'), listing=listing)
+    already_reminded = Notification.objects.filter(
+        user=OuterRef('pk'),
+        notification_type='deadline_reminder',
+        dedupe_key=reminder_key(listing, days_left),
+    )
+    return (
+        eligible_students(listing)
+        .filter(~Exists(already_applied), ~Exists(already_reminded))
+        .values_list('id', flat=True)
+    )
+
+
+def _reminder(student_id, listing, days_left):
+    when = 'tomorrow' if days_left == 1 else f'in {days_left} days'
+    return Notification(
+        user_id=student_id,
+        notification_type='deadline_reminder',
+        title='Application Deadline Approaching',
+        message=f'Applications for "{listing.title}" at {listing.company_name} close {when} '
+                f'({listing.application_deadline:%b %d, %Y}).',
+        data={'listing_id': listing.id, 'days_left': days_left},
+        dedupe_key=reminder_key(listing, days_left),
+    )
+
+
+def send_deadline_reminders(today=None, windows=None):
+    """Create deadline_reminder notifications. Returns the number created."""
+    today = today or date.today()
+    windows = windows or getattr(settings, 'DEADLINE_REMINDER_DAYS', [7, 3, 1])
+
+    created = 0
+    for days_left in sorted(set(windows), reverse=True):
+        listings = (
+            OJTListing.objects
+            .filter(status='open', application_deadline=today + timedelta(days=days_left))
+        )
+        for listing in listings:
+            # Materialise ids first: the inserts below feed the dedupe subquery
+            student_ids = list(students_to_remind(listing, days_left))
+            for start in range(0, len(student_ids), INSERT_BATCH_SIZE):
+                Notification.objects.bulk_create([
+                    _reminder(student_id, listing, days_left)
+                    for student_id in student_ids[start:start + INSERT_BATCH_SIZE]
+                ], ignore_conflicts=True)
+            created += len(student_ids)
+    return created
@@ -0,0 +1,160 @@
+"""
+Notification retention: keeps the hot ``core_notification`` table small.
+
+- ``archive_expired_notifications`` moves read notifications past their
+  type's TTL into ``NotificationArchive`` in small chunks
+- ``compact_notification_bursts`` folds many notifications of the same type
+  for the same user on the same day into one digest row
+
+Both are run by ``manage.py prune_notifications``.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Notification, NotificationArchive
+
+
+def get_retention_settings():
+    config = {
+        'DEFAULT_TTL_DAYS': 180,
+        'TTL_DAYS': {},
+        'CHUNK_SIZE': 1000,
+        'DIGEST_TYPES': [],
+        'DIGEST_THRESHOLD': 5,
+        'DIGEST_SETTLE_MINUTES': 60,
+        # Only bursts this recent are looked at; older ones were compacted by earlier runs
+        'DIGEST_LOOKBACK_DAYS': 7,
+    }
+    config.update(getattr(settings, 'NOTIFICATION_RETENTION', {}))
+    return config
+
+
+def _archive_ids(ids):
+    """Copy the given notifications into the archive and delete them, atomically"""
+    with transaction.atomic():
+        rows = Notification.objects.filter(id__in=ids)
+        NotificationArchive.objects.bulk_create([
+            NotificationArchive(
+                original_id=n.id,
+                user_id=n.user_id,
+                notification_type=n.notification_type,
+                title=n.title,
+                message=n.message,
+                data=n.data,
+                is_read=n.is_read,
+                is_email_sent=n.is_email_sent,
+                created_at=n.created_at,
+            )
+            for n in rows
+        ])
+        deleted, _ = rows.delete()
+    return deleted
+
+
+def _archive_in_chunks(queryset, chunk_size):
+    archived = 0
+    while True:
+        ids = list(queryset.order_by('id').values_list('id', flat=True)[:chunk_size])
+        if not ids:
+            return archived
+        archived += _archive_ids(ids)
+
+
+def archive_notifications(queryset, chunk_size=None):
+    """Archive the notifications in ``queryset`` regardless of age. Returns the row count."""
+    return _archive_in_chunks(queryset, chunk_size or get_retention_settings()['CHUNK_SIZE'])
+
+
+def archive_expired_notifications(now=None, chunk_size=None):
+    """Archive read notifications older than their type's TTL. Returns the row count."""
+    config = get_retention_settings()
+    now = now or timezone.now()
+    chunk_size = chunk_size or config['CHUNK_SIZE']
+
+    archived = 0
+    for notification_type, _ in Notification.TYPE_CHOICES:
+        ttl_days = config['TTL_DAYS'].get(notification_type, config['DEFAULT_TTL_DAYS'])
+        if ttl_days is None:
+            continue  # kept forever
+        expired = Notification.objects.filter(
+            notification_type=notification_type,
+            is_read=True,
+            created_at__lt=now - timedelta(days=ttl_days),
+        )
+        archived += _archive_in_chunks(expired, chunk_size)
+    return archived
+
+
+def compact_notification_bursts(now=None, threshold=None, chunk_size=None):
+    """
+    Replace bursts of same-type notifications for one user on one day with a
+    single digest row. The originals are archived, not lost. Only notifications
+    whose email already went out are folded in, so the dispatcher never loses
+    any. Returns the number of digests created.
+    """
+    config = get_retention_settings()
+    now = now or timezone.now()
+    threshold = threshold or config['DIGEST_THRESHOLD']
+    chunk_size = chunk_size or config['CHUNK_SIZE']
+    settled_before = now - timedelta(minutes=config['DIGEST_SETTLE_MINUTES'])
+    # From midnight, so the oldest day in range is grouped whole
+    lookback_from = timezone.localtime(settled_before - timedelta(days=config['DIGEST_LOOKBACK_DAYS']))
+    lookback_from = lookback_from.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    candidates = Notification.objects.filter(
+        notification_type__in=config['DIGEST_TYPES'],
+        created_at__gte=lookback_from,
+        created_at__lt=settled_before,
+        is_email_sent=True,
+    ).exclude(data__has_key='digest')
+
+    # Keys first: the loop inserts into and deletes from the table being grouped
+    bursts = list(
+        candidates
+        .annotate(day=TruncDate('created_at'))
+        .values('user_id', 'notification_type', 'day')
+        .annotate(total=Count('id'))
+        .filter(total__gte=threshold)
+        .order_by()
+    )
+
+    digests = 0
+    for burst in bursts:
+        rows = candidates.filter(
+            user_id=burst['user_id'],
+            notification_type=burst['notification_type'],
+            created_at__date=burst['day'],
+        )
+        summary = list(rows.order_by('created_at').values('id', 'is_read', 'created_at', 'data'))
+        if len(summary) < threshold:
+            continue
+
+        label = dict(Notification.TYPE_CHOICES)[burst['notification_type']]
+        with transaction.atomic():
+            digest = Notification.objects.create(
+                user_id=burst['user_id'],
+                notification_type=burst['notification_type'],
+                title=f'{len(summary)} x {label}',
+                message=f'You had {len(summary)} "{label}" notifications on {burst["day"]:%b %d, %Y}.',
+                data={
+                    'digest': True,
+                    'count': len(summary),
+                    'items': [row['data'] for row in summary],
+                },
+                is_read=all(row['is_read'] for row in summary),
+                # The digest is already summarised, don't email it again
+                is_email_sent=True,
+            )
+            # Keep the digest where the burst was in the timeline
+            Notification.objects.filter(pk=digest.pk).update(created_at=summary[-1]['created_at'])
+
+            ids = [row['id'] for row in summary]
+            for start in range(0, len(ids), chunk_size):
+                _archive_ids(ids[start:start + chunk_size])
+        digests += 1
+    return digests
@@ -1,10 +1,10 @@
 from rest_framework import serializers
+from backend.instrumentation import TimedSerializerMixin
 from .models import OJTListing, Application, Notification
 from accounts.serializers import UserProfileSerializer
 from datetime import date
 
-class OJTListingSerializer(serializers.ModelSerializer):
-    company_name = serializers.CharField(source='company.company_name', read_only = True)
+class OJTListingSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     company_details = UserProfileSerializer(source='company', read_only= True)
     duration_months = serializers.FloatField(read_only = True)
     is_expired = serializers.SerializerMethodField()
@@ -17,9 +17,12 @@ class OJTListingSerializer(serializers.ModelSerializer):
             'course_requirement', 'year_level_requirement', 'skills_required',
             'slots_available', 'allowance', 'has_allowance', 'start_date', 'end_date',
             'application_deadline', 'status', 'created_at', 'company', 'company_name',
-            'company_details', 'is_expired'
+            'company_logo', 'company_verified', 'company_details', 'is_expired'
+        ]
+        read_only_fields = [
+            'company', 'status', 'created_at', 'updated_at', 'has_allowance',
+            'company_name', 'company_logo', 'company_verified',
         ]
-        read_only_fields = ['company', 'status', 'created_at', 'updated_at', 'has_allowance']
     
     def get_is_expired(self, obj):
         return obj.application_deadline < date.today()
@@ -50,7 +53,15 @@ class OJTListingSerializer(serializers.ModelSerializer):
         
         return data
     
-class ApplicationSerializer(serializers.ModelSerializer):
+class OJTListingFeedSerializer(OJTListingSerializer):
+    """Listing feed rows: company info comes from the listing's own snapshot, without the nested profile"""
+    company_details = None
+
+    class Meta(OJTListingSerializer.Meta):
+        fields = [field for field in OJTListingSerializer.Meta.fields if field != 'company_details']
+
+
+class ApplicationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     student_details = UserProfileSerializer(source='student', read_only=True)
     listing_details = OJTListingSerializer(source='listing', read_only=True)
     can_withdraw = serializers.SerializerMethodField()
@@ -136,14 +147,42 @@ class ApplicationSerializer(serializers.ModelSerializer):
         validated_data['student'] = user
         return super().create(validated_data)
 
-class ApplicationStatusSerializer(serializers.ModelSerializer):
+class ApplicationStatusSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for companies to update application status"""
     class Meta:
         model = Application
         fields = ['status', 'interview_date', 'interview_notes', 'final_feedback']
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class InterviewWindowSerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+    def validate(self, data):
+        if data['end'] <= data['start']:
+            raise serializers.ValidationError({"end": "End must be after start."})
+        return data
+
+
+class InterviewScheduleSerializer(serializers.Serializer):
+    """Input for batch interview scheduling: which applicants, and when the interviewers are free"""
+    MAX_APPLICATIONS = 2000
+
+    applications = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=MAX_APPLICATIONS
+    )
+    listing = serializers.IntegerField(required=False)
+    windows = InterviewWindowSerializer(many=True, allow_empty=False)
+    slot_minutes = serializers.IntegerField(min_value=5, max_value=480, default=30)
+    gap_minutes = serializers.IntegerField(min_value=0, max_value=240, default=0)
+
+    def validate(self, data):
+        if 'applications' not in data and 'listing' not in data:
+            raise serializers.ValidationError("Give the applications to schedule or a listing.")
+        return data
+
+
+class NotificationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     time_ago = serializers.SerializerMethodField()
     
     class Meta:
@@ -0,0 +1,14 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    // Reload the changelist with the picked value, keeping the other filters
+    $(document).on('change', '.autocomplete-filter select', function() {
+        const container = this.closest('.autocomplete-filter');
+        const params = new URLSearchParams(container.dataset.queryString);
+        if (this.value) {
+            params.set(container.dataset.parameter, this.value);
+        }
+        window.location.search = params.toString();
+    });
+}
@@ -0,0 +1,200 @@
+"""
+Dashboard statistics.
+
+Each dashboard is computed with a single conditional-aggregation query. When
+``DASHBOARD_STATS_MATERIALIZED`` is on, the result is also stored per user in
+``DashboardStats`` and refreshed whenever one of the user's applications or
+listings changes, so dashboard loads become a primary-key lookup. Bulk jobs
+wrap their work in ``batched_refresh()`` so each user is refreshed once.
+Writes that bypass the signals (``.update()``, ``set_status``) call
+``applications_updated`` / ``company_listings_hidden`` instead, which drop
+the stored rows so they are recomputed on the next load.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Application, DashboardStats, OJTListing
+
+APPLICATION_STATUSES = [value for value, _ in Application.STATUS_CHOICES]
+
+_batch = ContextVar('dashboard_refresh_batch', default=None)
+
+
+def _status_counts(prefix=''):
+    field = f'{prefix}status' if prefix else 'status'
+    counted = prefix.rstrip('_') or 'id'
+    return {
+        f'status_{value}': Count(counted, filter=Q(**{field: value}))
+        for value in APPLICATION_STATUSES
+    }
+
+
+def compute_company_stats(company):
+    """Totals, per-status and per-listing counts from one grouped query over the company's listings"""
+    rows = (
+        OJTListing.objects
+        .filter(company=company)
+        .values('id', 'title', 'status')
+        .annotate(applications_total=Count('applications'), **_status_counts('applications__'))
+        .order_by('-created_at')
+    )
+
+    by_status = dict.fromkeys(APPLICATION_STATUSES, 0)
+    listings = []
+    for row in rows:
+        counts = {value: row[f'status_{value}'] for value in APPLICATION_STATUSES}
+        for value, count in counts.items():
+            by_status[value] += count
+        listings.append({
+            'id': row['id'],
+            'title': row['title'],
+            'status': row['status'],
+            'total_applications': row['applications_total'],
+            'applications_by_status': counts,
+        })
+
+    return {
+        'total_listings': len(listings),
+        'active_listings': sum(1 for listing in listings if listing['status'] == 'open'),
+        'total_applications': sum(by_status.values()),
+        'pending_applications': by_status['applied'],
+        'applications_by_status': by_status,
+        'listings': listings,
+    }
+
+
+def compute_student_stats(student):
+    counts = Application.objects.visible().filter(student=student).aggregate(
+        total=Count('id'), **_status_counts()
+    )
+    by_status = {value: counts[f'status_{value}'] for value in APPLICATION_STATUSES}
+    return {
+        'total_applications': counts['total'],
+        'pending_applications': by_status['applied'],
+        'accepted_applications': by_status['accepted'],
+        'applications_by_status': by_status,
+    }
+
+
+def compute_dashboard_stats(user):
+    if user.role == 'company':
+        return compute_company_stats(user)
+    return compute_student_stats(user)
+
+
+def is_materialized():
+    return getattr(settings, 'DASHBOARD_STATS_MATERIALIZED', False)
+
+
+def get_dashboard_stats(user):
+    if not is_materialized():
+        return compute_dashboard_stats(user)
+
+    stored = DashboardStats.objects.filter(user=user).values_list('stats', flat=True).first()
+    if stored is None:
+        stored = refresh_dashboard_stats(user)
+    return stored
+
+
+def refresh_dashboard_stats(user):
+    stats = compute_dashboard_stats(user)
+    DashboardStats.objects.update_or_create(user=user, defaults={'stats': stats})
+    return stats
+
+
+def _schedule_refresh(*user_ids):
+    from accounts.models import User
+
+    def refresh():
+        for user in User.objects.filter(pk__in=set(user_ids)):
+            refresh_dashboard_stats(user)
+
+    transaction.on_commit(refresh)
+
+
+def _invalidate(user_ids):
+    """Drop stored stats once the transaction commits; the next dashboard load recomputes them"""
+    transaction.on_commit(lambda: DashboardStats.objects.filter(user_id__in=user_ids).delete())
+
+
+def applications_updated(application_ids):
+    """
+    Bulk writes (``.update()``, ``set_status``) skip post_save: call this
+    after one so the students' and companies' stored stats don't go stale.
+    """
+    if not is_materialized():
+        return
+    rows = Application.objects.filter(id__in=application_ids).values_list('student_id', 'listing__company_id')
+    user_ids = {user_id for row in rows for user_id in row}
+    batch = _batch.get()
+    if batch is not None:
+        batch['users'].update(user_ids)
+    elif user_ids:
+        _invalidate(user_ids)
+
+
+def company_listings_hidden(company):
+    """
+    A company's listings were soft-deleted with one ``.update()``: its own
+    stats and those of every student who applied to them are dropped.
+    """
+    if not is_materialized():
+        return
+    students = Application.objects.filter(listing__company=company).values('student_id')
+    _invalidate([company.pk])
+    _invalidate(students)
+
+
+@contextmanager
+def batched_refresh():
+    """Collect the refreshes triggered inside the block and run each user's once, at the end"""
+    batch = {'users': set(), 'listings': set()}
+    token = _batch.set(batch)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+    # Listings purged in the block are gone; their delete already queued the company
+    batch['users'].update(
+        OJTListing.all_objects.filter(pk__in=batch['listings']).values_list('company_id', flat=True)
+    )
+    batch['users'].discard(None)
+    if batch['users']:
+        _schedule_refresh(*batch['users'])
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+def application_changed(sender, instance, **kwargs):
+    if not is_materialized():
+        return
+    batch = _batch.get()
+    if batch is not None:
+        batch['users'].add(instance.student_id)
+        batch['listings'].add(instance.listing_id)
+        return
+    if Application.listing.is_cached(instance):
+        company_id = instance.listing.company_id
+    else:
+        # The listing may already be gone when this is a cascade delete;
+        # listing_changed covers the company in that case
+        company_id = OJTListing.all_objects.filter(pk=instance.listing_id).values_list('company_id', flat=True).first()
+    _schedule_refresh(instance.student_id, company_id)
+
+
+@receiver(post_save, sender=OJTListing)
+@receiver(post_delete, sender=OJTListing)
+def listing_changed(sender, instance, **kwargs):
+    if not is_materialized():
+        return
+    batch = _batch.get()
+    if batch is not None:
+        batch['users'].add(instance.company_id)
+    else:
+        _schedule_refresh(instance.company_id)
@@ -0,0 +1,283 @@
+"""
+Synthetic data at production-like volume (``manage.py generate_synthetic_data``).
+
+Everything is drawn from one seeded ``random.Random`` so the same options give
+the same dataset. Rows are built lazily and written with chunked
+``bulk_create`` (one transaction per chunk), every account shares one
+pre-hashed password, and timestamps are spread over a term instead of all
+being "now". Listing popularity and company size follow a Zipf-like curve, so
+a few listings get most of the applications as they do in real use.
+
+Status history (``ApplicationStatusChange``) is not generated; run
+``rollup_analytics --full`` afterwards if the reports are needed.
+"""
+import contextlib
+import itertools
+import random
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from .company_snapshot import backfill_company_snapshots
+from .models import Application, Notification, OJTListing
+
+CHUNK_SIZE = 5000
+
+COURSE_WEIGHTS = {'cit': 35, 'cba': 20, 'coa': 15, 'coed': 15, 'chm': 15}
+LISTING_COURSE_WEIGHTS = {'all': 30, 'cit': 30, 'cba': 12, 'coa': 10, 'coed': 9, 'chm': 9}
+APPLICATION_STATUS_WEIGHTS = {
+    'applied': 30, 'under_review': 20, 'for_interview': 8, 'interviewed': 5,
+    'accepted': 10, 'rejected': 22, 'withdrawn': 5,
+}
+NOTIFICATION_TYPE_WEIGHTS = {
+    'application_submitted': 30, 'application_status_changed': 30, 'interview_scheduled': 5,
+    'new_application': 20, 'deadline_reminder': 10, 'system_announcement': 5,
+}
+
+TITLES = [
+    'IT Intern', 'Web Developer Trainee', 'Network Support Intern', 'Accounting Assistant', 'Audit Trainee',
+    'Teaching Aide', 'Front Desk Trainee', 'Kitchen Operations Intern', 'Marketing Intern', 'HR Assistant',
+    'QA Tester', 'Data Encoder', 'Sales Associate Trainee', 'Junior Bookkeeper',
+]
+SKILLS = [
+    'Python', 'JavaScript', 'Excel', 'Communication', 'Bookkeeping', 'Customer service', 'Lesson planning',
+    'SQL', 'Networking', 'Canva', 'Food safety', 'Public speaking', 'Data entry', 'Teamwork',
+]
+CITIES = ['Manila', 'Quezon City', 'Cebu City', 'Davao City', 'Makati', 'Pasig', 'Taguig', 'Iloilo City', 'Baguio']
+FIRST_NAMES = ['Juan', 'Maria', 'Jose', 'Ana', 'Mark', 'Angel', 'John', 'Princess', 'Carlo', 'Mae', 'Paolo', 'Joy']
+LAST_NAMES = ['Santos', 'Reyes', 'Cruz', 'Bautista', 'Garcia', 'Mendoza', 'Torres', 'Flores', 'Ramos', 'Aquino']
+COMPANY_WORDS = ['Global', 'Pacific', 'Tech', 'Solutions', 'Foods', 'Holdings', 'Hotel', 'Learning', 'Digital', 'Trading']
+
+
+def zipf_weights(count, exponent=1.0):
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def chunked(iterable, size=CHUNK_SIZE):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+@contextlib.contextmanager
+def manual_timestamps(model, *field_names):
+    """Let bulk_create keep the timestamps we set instead of auto_now(_add) overwriting them"""
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Generator:
+    def __init__(self, students, companies, listings, applications, notifications,
+                 seed=1, prefix='syn', password='synthetic-password', progress=None):
+        self.counts = {
+            'students': students, 'companies': companies, 'listings': listings,
+            'applications': applications, 'notifications': notifications,
+        }
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.password = password
+        self.progress = progress or (lambda label, done: None)
+        # A term of about four months; about half of it has already happened
+        self.term_start = date.today() - timedelta(days=60)
+        self.term_end = date.today() + timedelta(days=60)
+
+    def _at(self, day):
+        """A random time during office hours on ``day``, capped at now"""
+        moment = timezone.make_aware(datetime.combine(day, time(8)) + timedelta(seconds=self.rng.randrange(10 * 3600)))
+        return min(moment, timezone.now())
+
+    def _write(self, label, model, rows):
+        done = 0
+        for chunk in chunked(rows):
+            with transaction.atomic():
+                model.objects.bulk_create(chunk)
+            done += len(chunk)
+            self.progress(label, done)
+
+    def _new_ids(self, model, after_id):
+        return list(model.objects.filter(pk__gt=after_id).order_by('pk').values_list('pk', flat=True))
+
+    def _last_id(self, model):
+        return model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+    def generate(self):
+        if User.objects.filter(username__startswith=f'{self.prefix}-').exists():
+            raise ValueError(f'Users prefixed "{self.prefix}-" already exist; use another prefix or a fresh database')
+        password = make_password(self.password)
+
+        students = self.create_students(password)
+        companies = self.create_companies(password)
+        listings = self.create_listings(companies)
+        self.create_applications(students, listings)
+        self.create_notifications(students, companies)
+        return {label: count for label, count in self.counts.items()}
+
+    def create_students(self, password):
+        rng = self.rng
+        courses, course_weights = list(COURSE_WEIGHTS), list(COURSE_WEIGHTS.values())
+        after_id = self._last_id(User)
+
+        def rows():
+            for i in range(self.counts['students']):
+                first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                yield User(
+                    username=f'{self.prefix}-student-{i}', email=f'{self.prefix}-student-{i}@example.com',
+                    password=password, role='student', first_name=first_name, last_name=last_name,
+                    student_id=f'{2021 + i % 4}-{i:06d}', course=rng.choices(courses, course_weights)[0],
+                    year_level=rng.choices([3, 4], [35, 65])[0],
+                )
+
+        self._write('students', User, rows())
+        return list(
+            User.objects.filter(pk__gt=after_id, role='student').order_by('pk').values_list('pk', 'course', 'year_level')
+        )
+
+    def create_companies(self, password):
+        rng = self.rng
+        after_id = self._last_id(User)
+
+        def rows():
+            for i in range(self.counts['companies']):
+                name = ' '.join(rng.sample(COMPANY_WORDS, 2)) + f' {i}'
+                yield User(
+                    username=f'{self.prefix}-company-{i}', email=f'{self.prefix}-company-{i}@example.com',
+                    password=password, role='company', company_name=name, company_address=rng.choice(CITIES),
+                    company_description=f'{name} offers OJT placements every term.', is_verified=rng.random() < 0.8,
+                )
+
+        self._write('companies', User, rows())
+        return self._new_ids(User, after_id)
+
+    def create_listings(self, companies):
+        rng = self.rng
+        courses, course_weights = list(LISTING_COURSE_WEIGHTS), list(LISTING_COURSE_WEIGHTS.values())
+        company_weights = zipf_weights(len(companies), 0.8)
+        term_days = (self.term_end - self.term_start).days
+        after_id = self._last_id(OJTListing)
+
+        def rows():
+            owners = rng.choices(companies, company_weights, k=self.counts['listings'])
+            for company_id in owners:
+                deadline = self.term_start + timedelta(days=rng.randrange(15, term_days))
+                posted = deadline - timedelta(days=rng.randint(14, 60))
+                start = deadline + timedelta(days=rng.randint(7, 30))
+                allowance = rng.choice([None, None, 2000, 3000, 5000, 8000])
+                created_at = self._at(posted)
+                yield OJTListing(
+                    company_id=company_id,
+                    title=rng.choice(TITLES),
+                    ojt_type=rng.choices(['required', 'elective', 'summer'], [75, 15, 10])[0],
+                    required_hours=rng.choice([300, 400, 486, 500, 600]),
+                    work_setup=rng.choices(['onsite', 'hybrid', 'wfh'], [60, 30, 10])[0],
+                    location=rng.choice(CITIES),
+                    description=' '.join(rng.choices(SKILLS + TITLES, k=40)),
+                    responsibilities='Assist the team with daily tasks and assigned projects.',
+                    learning_outcomes='Hands-on industry experience and professional skills.',
+                    course_requirement=rng.choices(courses, course_weights)[0],
+                    year_level_requirement=rng.choices([0, 3, 4], [40, 20, 40])[0],
+                    skills_required=', '.join(rng.sample(SKILLS, 3)),
+                    slots_available=rng.choices([1, 2, 3, 5, 10], [30, 30, 20, 15, 5])[0],
+                    allowance=allowance,
+                    has_allowance=allowance is not None,
+                    start_date=start,
+                    end_date=start + timedelta(weeks=10),
+                    application_deadline=deadline,
+                    status='open' if deadline >= date.today() else rng.choices(['closed', 'filled', 'ongoing'], [50, 20, 30])[0],
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+
+        with manual_timestamps(OJTListing, 'created_at', 'updated_at'):
+            self._write('listings', OJTListing, rows())
+        # bulk_create skips OJTListing.save(), which fills the company snapshot
+        backfill_company_snapshots()
+        return list(
+            OJTListing.objects.filter(pk__gt=after_id).order_by('pk')
+            .values_list(
+                'pk', 'company_id', 'created_at', 'application_deadline', 'course_requirement', 'year_level_requirement',
+            )
+        )
+
+    def create_applications(self, students, listings):
+        rng = self.rng
+        now = timezone.now()
+        statuses, status_weights = list(APPLICATION_STATUS_WEIGHTS), list(APPLICATION_STATUS_WEIGHTS.values())
+        # Popularity is independent of posting order
+        popularity = zipf_weights(len(listings), 0.9)
+        rng.shuffle(popularity)
+        cumulative = list(itertools.accumulate(popularity))
+
+        # Students only apply where ApplicationSerializer.validate would let them
+        pools = {}
+        for course, year_level in {(listing[4], listing[5]) for listing in listings}:
+            pools[course, year_level] = [
+                pk for pk, student_course, student_year in students
+                if course in ('all', student_course) and student_year >= year_level
+            ]
+        eligible = [pools[listing[4], listing[5]] for listing in listings]
+        wanted = min(self.counts['applications'], sum(len(pool) for pool in eligible))
+
+        def rows():
+            seen = set()
+            while len(seen) < wanted:
+                for listing_index in rng.choices(range(len(listings)), cum_weights=cumulative, k=CHUNK_SIZE):
+                    pool = eligible[listing_index]
+                    if not pool:
+                        continue
+                    student_id = rng.choice(pool)
+                    if (student_id, listing_index) in seen:
+                        continue  # (student, listing) is unique
+                    seen.add((student_id, listing_index))
+                    listing_id, _company, created_at, deadline, _course, _year = listings[listing_index]
+                    opened, closes = created_at.date(), min(deadline, date.today())
+                    applied_at = self._at(opened + timedelta(days=rng.randint(0, max(0, (closes - opened).days))))
+                    status = rng.choices(statuses, status_weights)[0] if applied_at < now - timedelta(days=3) else 'applied'
+                    updated_at = applied_at if status == 'applied' else min(
+                        applied_at + timedelta(hours=rng.randint(2, 24 * 21)), now,
+                    )
+                    yield Application(
+                        student_id=student_id, listing_id=listing_id,
+                        cover_letter='I am eager to learn and contribute to your team.',
+                        status=status, applied_at=applied_at, updated_at=updated_at,
+                    )
+                    if len(seen) == wanted:
+                        return
+
+        self.counts['applications'] = wanted
+        with manual_timestamps(Application, 'applied_at', 'updated_at'):
+            self._write('applications', Application, rows())
+
+    def create_notifications(self, students, companies):
+        rng = self.rng
+        types, type_weights = list(NOTIFICATION_TYPE_WEIGHTS), list(NOTIFICATION_TYPE_WEIGHTS.values())
+        term_days = (date.today() - self.term_start).days
+        student_ids = [student[0] for student in students]
+
+        def rows():
+            for _ in range(self.counts['notifications']):
+                notification_type = rng.choices(types, type_weights)[0]
+                user_id = rng.choice(companies if notification_type == 'new_application' else student_ids)
+                created_at = self._at(self.term_start + timedelta(days=rng.randint(0, term_days)))
+                age_days = (timezone.now() - created_at).days
+                yield Notification(
+                    user_id=user_id, notification_type=notification_type,
+                    title=notification_type.replace('_', ' ').capitalize(),
+                    message='This is a generated notification.',
+                    # Older notifications are mostly read, and almost all have been emailed
+                    is_read=rng.random() < min(0.95, 0.2 + age_days / 30),
+                    is_email_sent=rng.random() < 0.98,
+                    created_at=created_at, updated_at=created_at,
+                )
+
+        with manual_timestamps(Notification, 'created_at', 'updated_at'):
+            self._write('notifications', Notification, rows())
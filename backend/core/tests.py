@@ -1,3 +1,963 @@
-from django.test import TestCase
+import json
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib import admin
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection, connections
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from backend import db_router
+from backend.compression import CompressionMiddleware
+from backend.db_router import PIN_COOKIE, ReplicaRoutingMiddleware
+from backend.fast_json import dumps
+from backend.instrumentation import RequestTimings, ServerTimingMiddleware, _timings
+from backend.query_inspector import QueryInspectorMiddleware, QueryProblem, inspect_queries
+from . import async_views, views
+from .admin import NotificationAdmin
+from .admin_tools import EstimatedCountPaginator, LargeTableAdmin, SoftDeleteMixin
+from .analytics import update_rollups
+from .archival import purge_deleted_accounts, soft_delete_account, soft_delete_listing
+from .models import (
+    AnalyticsCheckpoint, Application, ApplicationDailyRollup, ApplicationStatusChange, CoursePlacementSnapshot,
+    DashboardStats, IdempotencyRecord, Notification, OJTListing,
+)
+from .stats import get_dashboard_stats
+from .emails import dispatch_pending_emails
+from .interviews import schedule_interviews
+from .reminders import send_deadline_reminders
+from .fast_serializers import ValuesSerializer
+from .serializers import (
+    ApplicationSerializer, NotificationSerializer, OJTListingFeedSerializer, OJTListingSerializer,
+)
+from .retention import archive_notifications, compact_notification_bursts
+
+
+def login(client, user):
+    client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+
+
+def make_listing(company, **fields):
+    today = timezone.localdate()
+    return OJTListing.objects.create(
+        company=company, title=fields.pop('title', 'Intern'), location='Manila', description='-',
+        responsibilities='-', learning_outcomes='-', start_date=today + timedelta(days=60),
+        end_date=today + timedelta(days=120), application_deadline=today + timedelta(days=30), **fields,
+    )
+
+
+def apply(student, listing, **fields):
+    return Application.objects.create(student=student, listing=listing, cover_letter='-', **fields)
+
+
+class NotificationDeltaSyncTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(username='student', password='pw', role='student')
+        login(self.client, self.student)
+        self.started = timezone.now() - timedelta(seconds=1)
+
+    def notify(self, title='Hello'):
+        return Notification.objects.create(
+            user=self.student, notification_type='system_announcement', title=title, message='-',
+        )
+
+    def sync(self, **params):
+        response = self.client.get('/api/notifications/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_through_changes_in_order(self):
+        created = [self.notify(f'n{index}') for index in range(5)]
+
+        first = self.sync(since=self.started.isoformat(), page_size=2)
+        self.assertEqual([row['id'] for row in first['results']], [n.id for n in created[:2]])
+        self.assertTrue(first['has_more'])
+
+        second = self.sync(sync=first['sync'], page_size=2)
+        third = self.sync(sync=second['sync'], page_size=2)
+        self.assertEqual([row['id'] for row in second['results'] + third['results']], [n.id for n in created[2:]])
+        self.assertFalse(third['has_more'])
+
+        self.assertEqual(self.sync(sync=third['sync'])['results'], [])
+
+    def test_read_state_change_is_picked_up_after_rows_are_archived(self):
+        kept, archived = self.notify('kept'), self.notify('archived')
+        token = self.sync(since=self.started.isoformat())['sync']
+
+        archive_notifications(Notification.objects.filter(pk=archived.pk))
+        kept.mark_as_read()
+
+        delta = self.sync(sync=token)
+        self.assertEqual([(row['id'], row['is_read']) for row in delta['results']], [(kept.id, True)])
+        self.assertEqual(delta['deleted'], [archived.id])
+
+        # Deletions are reported once
+        self.assertEqual(self.sync(sync=delta['sync'])['deleted'], [])
+
+    def test_mark_all_read_shows_up_in_the_delta(self):
+        notification = self.notify()
+        token = self.sync(since=self.started.isoformat())['sync']
+
+        self.client.post('/api/notifications/read-all/')
+
+        delta = self.sync(sync=token)
+        self.assertEqual([(row['id'], row['is_read']) for row in delta['results']], [(notification.id, True)])
+
+    def test_bad_parameters_are_rejected(self):
+        self.assertEqual(self.client.get('/api/notifications/', {'sync': 'nope'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/notifications/', {'since': 'yesterday'}).status_code, 400)
+
+    def test_plain_list_is_unchanged(self):
+        self.notify()
+        response = self.client.get('/api/notifications/')
+        self.assertIsInstance(response.json(), list)
+
+
+class BurstCompactionTests(TestCase):
+    def setUp(self):
+        self.company = User.objects.create_user(username='company', password='pw', role='company')
+
+    def burst(self, count, is_email_sent, days_ago=1):
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                user=self.company, notification_type='new_application', title='New Application Received',
+                message='-', is_email_sent=is_email_sent,
+            )
+            for _ in range(count)
+        ])
+        Notification.objects.filter(pk__in=[n.pk for n in notifications]).update(
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+
+    def test_sent_burst_is_folded_into_one_digest(self):
+        self.burst(6, is_email_sent=True)
+
+        self.assertEqual(compact_notification_bursts(threshold=5), 1)
+        digest = Notification.objects.get(user=self.company)
+        self.assertEqual(digest.data['count'], 6)
+        self.assertTrue(digest.is_email_sent)
+
+    def test_unsent_notifications_are_left_for_the_dispatcher(self):
+        self.burst(6, is_email_sent=False)
+
+        self.assertEqual(compact_notification_bursts(threshold=5), 0)
+        self.assertEqual(Notification.objects.filter(user=self.company, is_email_sent=False).count(), 6)
+
+    def test_bursts_older_than_the_lookback_are_not_rescanned(self):
+        self.burst(6, is_email_sent=True, days_ago=30)
+
+        self.assertEqual(compact_notification_bursts(threshold=5), 0)
+
+
+class FlakyBackend(EmailBackend):
+    """Fails the first attempt at every message addressed to ``flaky``"""
+    def __init__(self, flaky, **kwargs):
+        super().__init__(**kwargs)
+        self.flaky = flaky
+        self.failed = set()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if self.flaky in message.to and message.subject not in self.failed:
+                self.failed.add(message.subject)
+                raise ConnectionError('connection dropped')
+        return super().send_messages(messages)
+
+
+class DropsMidBatchBackend(EmailBackend):
+    """Like SMTP: the messages before the one that fails are already delivered when it raises"""
+    def __init__(self, flaky, **kwargs):
+        super().__init__(**kwargs)
+        self.flaky = flaky
+        self.failed = False
+        self.calls = 0
+
+    def send_messages(self, messages):
+        self.calls += 1
+        for message in messages:
+            message.message()
+            if self.flaky in message.to and not self.failed:
+                self.failed = True
+                raise ConnectionError('connection dropped')
+            mail.outbox.append(message)
+        return len(messages)
+
+
+class DownBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError('connection refused')
+
+
+@override_settings(NOTIFICATION_EMAIL={'DIGEST_MIN': 3, 'RETRY_BACKOFF_SECONDS': 0, 'MAX_RETRIES': 1})
+class NotificationEmailTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='pw')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='pw')
+
+    def notify(self, user, count=1):
+        return Notification.objects.bulk_create([
+            Notification(user=user, notification_type='system_announcement', title=f'{user.username} {index}', message='-')
+            for index in range(count)
+        ])
+
+    def test_each_notification_is_emailed_once(self):
+        self.notify(self.alice)
+        self.notify(self.bob, 2)
+
+        self.assertEqual(dispatch_pending_emails(), (3, 3, 0))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['alice@example.com', 'bob@example.com', 'bob@example.com'])
+        self.assertFalse(Notification.objects.filter(is_email_sent=False).exists())
+
+        self.assertEqual(dispatch_pending_emails(), (0, 0, 0))
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_digest_covers_all_of_a_users_notifications_across_batches(self):
+        self.notify(self.alice)
+        self.notify(self.bob, 4)
+        self.notify(self.alice, 2)
+
+        dispatch_pending_emails(batch_size=2)
+
+        self.assertEqual(len(mail.outbox), 2)
+        by_recipient = {m.to[0]: m for m in mail.outbox}
+        self.assertEqual(by_recipient['alice@example.com'].subject, 'You have 3 new notifications')
+        self.assertEqual(by_recipient['bob@example.com'].subject, 'You have 4 new notifications')
+
+    def test_retry_resends_only_the_failed_message(self):
+        self.notify(self.alice)
+        self.notify(self.bob)
+
+        with self.assertLogs('core.emails', 'WARNING'):
+            emails, marked, _ = dispatch_pending_emails(connection=FlakyBackend('bob@example.com'))
+
+        self.assertEqual((emails, marked), (2, 2))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['alice@example.com', 'bob@example.com'])
+
+    def test_batch_goes_out_in_one_call(self):
+        self.notify(self.alice)
+        self.notify(self.bob, 2)
+        backend = DropsMidBatchBackend('nobody@example.com')
+
+        dispatch_pending_emails(connection=backend)
+
+        self.assertEqual((backend.calls, len(mail.outbox)), (1, 3))
+
+    def test_failure_mid_batch_resumes_at_the_failed_message(self):
+        self.notify(self.alice)
+        self.notify(self.bob)
+        backend = DropsMidBatchBackend('bob@example.com')
+
+        with self.assertLogs('core.emails', 'WARNING'):
+            emails, marked, _ = dispatch_pending_emails(connection=backend)
+
+        self.assertEqual((emails, marked, backend.calls), (2, 2, 2))
+        self.assertEqual([m.to[0] for m in mail.outbox], ['alice@example.com', 'bob@example.com'])
+
+    def test_message_that_keeps_failing_is_left_for_the_next_run(self):
+        self.notify(self.alice)
+        self.notify(self.bob)
+
+        with self.assertLogs('core.emails', 'WARNING'):
+            self.assertEqual(dispatch_pending_emails(connection=DownBackend())[:2], (0, 0))
+        self.assertEqual(Notification.objects.filter(is_email_sent=False).count(), 2)
+
+    def test_users_without_email_are_skipped_not_rescanned(self):
+        nobody = User.objects.create_user(username='nobody', email='', password='pw')
+        self.notify(nobody, 2)
+
+        self.assertEqual(dispatch_pending_emails(), (0, 0, 2))
+        self.assertEqual(mail.outbox, [])
+        self.assertFalse(Notification.objects.filter(is_email_sent=False).exists())
+
+
+@override_settings(DASHBOARD_STATS_MATERIALIZED=True)
+class MaterializedStatsTests(TestCase):
+    def setUp(self):
+        self.company = User.objects.create_user(username='company', password='pw', role='company')
+        self.student = User.objects.create_user(username='student', password='pw', role='student')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.listing = make_listing(self.company)
+            self.application = apply(self.student, self.listing)
+
+    def test_set_status_refreshes_both_dashboards(self):
+        self.assertEqual(get_dashboard_stats(self.student)['applications_by_status']['applied'], 1)
+        self.assertEqual(get_dashboard_stats(self.company)['pending_applications'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.filter(pk=self.application.pk).set_status('accepted')
+
+        self.assertEqual(get_dashboard_stats(self.student)['accepted_applications'], 1)
+        self.assertEqual(get_dashboard_stats(self.company)['applications_by_status']['accepted'], 1)
+
+    def test_soft_deleted_company_drops_stored_stats(self):
+        get_dashboard_stats(self.company)
+        get_dashboard_stats(self.student)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            soft_delete_account(self.company)
+
+        self.assertFalse(DashboardStats.objects.filter(user__in=[self.company, self.student]).exists())
+        self.assertEqual(get_dashboard_stats(self.company)['total_listings'], 0)
+        self.assertEqual(get_dashboard_stats(self.student)['total_applications'], 0)
+
+
+class AnalyticsRollupTests(TestCase):
+    def setUp(self):
+        self.company = User.objects.create_user(username='company', password='pw', role='company')
+        self.student = User.objects.create_user(username='student', password='pw', role='student', course='cit')
+        self.listing = make_listing(self.company)
+        self.application = apply(self.student, self.listing)
+
+    def totals(self):
+        rows = ApplicationDailyRollup.objects.all()
+        return sum(row.applications for row in rows), sum(row.accepted for row in rows)
+
+    def move_checkpoint_back(self, days):
+        AnalyticsCheckpoint.objects.update(last_run_at=timezone.now() - timedelta(days=days))
+
+    def test_later_edit_does_not_move_or_double_count_a_decision(self):
+        Application.objects.filter(pk=self.application.pk).update(applied_at=timezone.now() - timedelta(days=3))
+        self.application.refresh_from_db()
+        self.application.status = 'accepted'
+        self.application.save()
+        update_rollups()
+        self.assertEqual(self.totals(), (1, 1))
+
+        # Editing feedback a day later bumps updated_at, not the decision day
+        Application.objects.filter(pk=self.application.pk).update(
+            final_feedback='Great', updated_at=timezone.now() + timedelta(days=1)
+        )
+        self.move_checkpoint_back(2)
+        update_rollups()
+        self.assertEqual(self.totals(), (1, 1))
+
+    def test_placement_snapshot_recounts_changed_courses_only(self):
+        update_rollups()
+        CoursePlacementSnapshot.objects.update(day=timezone.localdate() - timedelta(days=1))
+        self.move_checkpoint_back(1)
+        # A course nobody touched since the last run is carried over as it was
+        CoursePlacementSnapshot.objects.create(
+            day=timezone.localdate() - timedelta(days=1), course='coed', students=7, applicants=3, placed=1,
+        )
+        User.objects.create_user(username='new-student', password='pw', role='student', course='cit')
+
+        update_rollups()
+
+        today = {snapshot.course: snapshot for snapshot in CoursePlacementSnapshot.objects.filter(day=timezone.localdate())}
+        self.assertEqual((today['cit'].students, today['cit'].applicants), (2, 1))
+        self.assertEqual(today['coed'].students, 7)
+
+
+class AnalyticsViewTests(TestCase):
+    def test_impossible_dates_are_rejected(self):
+        admin = User.objects.create_user(username='admin', password='pw', role='admin')
+        login(self.client, admin)
+
+        for value in ('2024-13-45', 'yesterday'):
+            response = self.client.get('/api/analytics/companies/', {'start': value})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('start', response.json())
+        self.assertEqual(self.client.get('/api/analytics/companies/', {'start': '2024-01-31'}).status_code, 200)
+
+
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        self.company = User.objects.create_user(username='acme', password='pw', role='company')
+        make_listing(self.company, title='Open', status='open')
+
+    def test_custom_middleware_stays_async(self):
+        async def get_response(request):
+            return None
+
+        for middleware in (ServerTimingMiddleware, CompressionMiddleware, QueryInspectorMiddleware,
+                           ReplicaRoutingMiddleware):
+            self.assertTrue(iscoroutinefunction(middleware(get_response)), middleware.__name__)
+
+    def test_asgi_request_through_the_middleware(self):
+        response = async_to_sync(AsyncClient().get)('/api/listings/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([listing['title'] for listing in response.json()], ['Open'])
+
+    def test_bad_filter_is_a_400_not_a_500(self):
+        request = RequestFactory().get('/api/listings/', {'status': 'bogus'})
+
+        response = async_to_sync(async_views.listing_list)(request)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', json.loads(response.content))
+
+
+class AsyncDeniedParityTests(TestCase):
+    def assertSameResponse(self, sync_view, async_view, path, user=None):
+        def get():
+            request = RequestFactory().get(path)
+            if user:
+                request.COOKIES['access_token'] = str(RefreshToken.for_user(user).access_token)
+            return request
+
+        expected = sync_view(get()).render()
+        actual = async_to_sync(async_view)(get())
+
+        self.assertEqual(
+            (actual.status_code, json.loads(actual.content), actual.get('WWW-Authenticate')),
+            (expected.status_code, json.loads(expected.content), expected.get('WWW-Authenticate')),
+        )
+        return actual
+
+    def test_anonymous_requests_get_the_same_401(self):
+        for sync_view, async_view, path in (
+            (views.NotificationList.as_view(), async_views.notification_list, '/api/notifications/'),
+            (views.student_dashboard_stats, async_views.student_dashboard_stats, '/api/dashboard/student-stats/'),
+            (views.company_dashboard_stats, async_views.company_dashboard_stats, '/api/dashboard/company-stats/'),
+        ):
+            response = self.assertSameResponse(sync_view, async_view, path)
+            self.assertEqual((response.status_code, response['WWW-Authenticate']), (401, 'Bearer realm="api"'))
+
+    def test_wrong_role_gets_the_same_403(self):
+        company = User.objects.create_user(username='acme', password='pw', role='company')
+
+        response = self.assertSameResponse(views.student_dashboard_stats, async_views.student_dashboard_stats,
+                                           '/api/dashboard/student-stats/', company)
+        self.assertEqual(response.status_code, 403)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """A second SQLite alias mirroring the test database stands in for the replica"""
+    # Resolved in setUpClass, after replica1 is registered
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        # connections.settings is settings.DATABASES, so the router sees it too
+        connections.settings['replica1'] = {**connections['default'].settings_dict, 'TEST': {'MIRROR': 'default'}}
+        cls.addClassCleanup(cls.drop_replica)
+        super().setUpClass()
+
+    @classmethod
+    def drop_replica(cls):
+        connections['replica1'].close()
+        del connections['replica1']
+        del connections.settings['replica1']
+
+    def setUp(self):
+        # The router caches its replica list on first use
+        db_router._replica_cycle = None
+        self.addCleanup(setattr, db_router, '_replica_cycle', None)
+        self.company = User.objects.create_user(username='acme', password='pw', role='company')
+        self.listing = make_listing(self.company, title='Open', status='open')
+
+    def capture(self, make_request):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica1']) as replica:
+            response = make_request()
+        self.assertLess(response.status_code, 400)
+        return response, len(primary), len(replica)
+
+    def test_listed_endpoint_reads_from_the_replica(self):
+        response, primary, replica = self.capture(lambda: self.client.get('/api/listings/'))
+
+        self.assertEqual([listing['title'] for listing in response.json()], ['Open'])
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_unlisted_endpoint_reads_from_the_primary(self):
+        login(self.client, self.company)
+
+        _, primary, replica = self.capture(lambda: self.client.get('/api/company/listings/'))
+
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_writes_go_to_the_primary_while_reads_are_routed(self):
+        token = db_router._read_from_replica.set(True)
+        try:
+            with CaptureQueriesContext(connections['default']) as primary, \
+                    CaptureQueriesContext(connections['replica1']) as replica:
+                listing = OJTListing.objects.get(pk=self.listing.pk)
+                listing.title = 'Senior intern'
+                listing.save()
+        finally:
+            db_router._read_from_replica.reset(token)
+
+        self.assertEqual([query['sql'].split()[0] for query in replica], ['SELECT'])
+        self.assertTrue(primary)
+        self.assertTrue(all(query['sql'].split()[0] != 'SELECT' for query in primary))
+
+    def test_write_pins_the_client_to_the_primary(self):
+        student = User.objects.create_user(username='student', password='pw', role='student')
+        login(self.client, student)
+
+        response = self.client.post('/api/notifications/read-all/')
+        self.assertIn(PIN_COOKIE, response.cookies)
+        _, primary, replica = self.capture(lambda: self.client.get('/api/listings/'))
+
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_flag_is_reset_after_each_request(self):
+        self.assertEqual(self.client.get('/api/listings/').status_code, 200)
+        self.assertFalse(db_router._read_from_replica.get())
+
+        self.assertEqual(async_to_sync(AsyncClient().get)('/api/listings/').status_code, 200)
+        self.assertFalse(db_router._read_from_replica.get())
+        self.assertEqual(OJTListing.objects.all().db, 'default')
+
+
+class IdempotencyReplayTests(TestCase):
+    def setUp(self):
+        company = User.objects.create_user(username='acme', password='pw', role='company')
+        self.listing = make_listing(company)
+        self.student = User.objects.create_user(username='student', password='pw', role='student', year_level=4)
+        login(self.client, self.student)
+
+    def post(self, key, **body):
+        return self.client.post(
+            '/api/applications/', {'listing': self.listing.id, 'cover_letter': 'Hi', **body},
+            content_type='application/json', HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post('apply-1')
+        retry = self.post('apply-1')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.json()), (201, first.json()))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Application.objects.filter(student=self.student).count(), 1)
+
+    def test_failed_request_releases_the_key(self):
+        self.assertEqual(self.post('apply-2', listing=None).status_code, 400)
+        self.assertFalse(IdempotencyRecord.objects.exists())
+
+        self.assertEqual(self.post('apply-2').status_code, 201)
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        company = User.objects.create_user(username='acme', password='pw', role='company')
+        make_listing(company, status='open')
+
+    def test_header_only_for_staff(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/listings/'))
+
+        login(self.client, User.objects.create_user(username='dev', password='pw', is_staff=True))
+        self.assertIn('db;dur=', self.client.get('/api/listings/')['Server-Timing'])
+
+    @override_settings(DEBUG=True)
+    def test_header_for_everyone_in_debug(self):
+        self.assertIn('Server-Timing', self.client.get('/api/listings/'))
+
+    def test_serializer_phase_is_timed(self):
+        user = User.objects.create_user(username='student', password='pw')
+        Notification.objects.create(user=user, notification_type='general', title='Hi', message='-')
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        try:
+            NotificationSerializer(Notification.objects.all(), many=True).data
+        finally:
+            _timings.reset(token)
+
+        self.assertGreater(timings.durations['serializer'], 0)
+
+
+class MetricsEndpointTests(TestCase):
+    @override_settings(INSTRUMENTATION={'METRICS_TOKEN': 's3cret'})
+    def test_token_or_staff_session(self):
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        self.assertEqual(self.client.get('/metrics/', headers={'Authorization': 'Bearer wrong'}).status_code, 403)
+
+        response = self.client.get('/metrics/', headers={'Authorization': 'Bearer s3cret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('text/plain', response['Content-Type'])
+
+        self.client.force_login(User.objects.create_user(username='ops', password='pw', is_staff=True))
+        self.assertEqual(self.client.get('/metrics/').status_code, 200)
+
+    @override_settings(INSTRUMENTATION={'METRICS_TOKEN': ''})
+    def test_missing_token_hides_the_endpoint(self):
+        self.client.force_login(User.objects.create_user(username='ops', password='pw', is_staff=True))
+        self.assertEqual(self.client.get('/metrics/', headers={'Authorization': 'Bearer '}).status_code, 404)
+
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics/').status_code, 200)
+
+
+class QueryInspectorStrictTests(TestCase):
+    def setUp(self):
+        self.company = User.objects.create_user(username='acme', password='pw', role='company')
+        listing = make_listing(self.company)
+        for index in range(6):
+            apply(User.objects.create_user(username=f'student{index}', password='pw', role='student'), listing)
+
+    def test_n_plus_one_raises_in_strict_mode(self):
+        with self.assertRaisesMessage(QueryProblem, '6 x SELECT'), self.assertLogs('backend.queries', 'WARNING'):
+            with inspect_queries('student names', STRICT=True, N_PLUS_ONE_THRESHOLD=5):
+                [application.student.username for application in Application.objects.all()]
+
+    def test_n_plus_one_only_logs_when_not_strict(self):
+        with self.assertLogs('backend.queries', 'WARNING') as logs:
+            with inspect_queries('student names', STRICT=False, N_PLUS_ONE_THRESHOLD=5):
+                [application.student.username for application in Application.objects.all()]
+
+        self.assertIn('Possible N+1 in student names', logs.output[0])
+
+    def test_company_application_list_stays_batched(self):
+        login(self.client, self.company)
+
+        with inspect_queries('application list', STRICT=True, N_PLUS_ONE_THRESHOLD=5):
+            response = self.client.get('/api/applications/')
+
+        self.assertEqual(len(response.json()), 6)
+
+
+class LargeTableAdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='root', password='pw', email='root@example.com')
+        self.client.force_login(self.admin)
+        self.notifications = Notification.objects.bulk_create([
+            Notification(user=self.admin, notification_type='general', title=f'Hi {index}', message='-')
+            for index in range(5)
+        ])
+
+    def set_row_estimate(self, model, rows):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            cursor.execute('UPDATE sqlite_stat1 SET stat = %s WHERE tbl = %s', [f'{rows} 1', model._meta.db_table])
+
+    def updates(self, queries, model):
+        return [query for query in queries if query['sql'].startswith(f'UPDATE "{model._meta.db_table}"')]
+
+    def test_paginator_estimates_only_big_unfiltered_changelists(self):
+        self.set_row_estimate(Notification, 50)
+        self.assertEqual(EstimatedCountPaginator(Notification.objects.all(), 10).count, 5)
+
+        self.set_row_estimate(Notification, 250000)
+        self.assertEqual(EstimatedCountPaginator(Notification.objects.all(), 10).count, 250000)
+        self.assertEqual(EstimatedCountPaginator(Notification.objects.filter(is_read=False), 10).count, 5)
+
+    def test_changelist_uses_the_estimate(self):
+        self.set_row_estimate(Notification, 250000)
+
+        response = self.client.get('/admin/core/notification/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 250000)
+
+    @mock.patch.object(NotificationAdmin, 'update_chunk_size', 2)
+    def test_mark_read_updates_in_chunks(self):
+        ids = [notification.id for notification in self.notifications]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/admin/core/notification/', {'action': 'mark_read', '_selected_action': ids})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(self.updates(queries, Notification)), 3)
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+
+        self.client.post('/admin/core/notification/', {'action': 'mark_unread', '_selected_action': ids[:3]})
+        self.assertEqual(Notification.objects.filter(is_read=False).count(), 3)
+
+    def test_delete_action_soft_deletes_listings(self):
+        listings = [make_listing(self.admin, title=f'Intern {index}') for index in range(3)]
+
+        response = self.client.post('/admin/core/ojtlisting/', {
+            'action': 'delete_selected', '_selected_action': [listing.id for listing in listings[:2]], 'post': 'yes',
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(OJTListing.objects.get().pk, listings[2].pk)
+        self.assertEqual(OJTListing.all_objects.filter(deleted_at__isnull=False).count(), 2)
+
+    def test_default_soft_delete_stamps_in_chunks(self):
+        class PlainListingAdmin(SoftDeleteMixin, LargeTableAdmin):
+            update_chunk_size = 2
+
+        listings = [make_listing(self.admin, title=f'Intern {index}') for index in range(3)]
+        model_admin = PlainListingAdmin(OJTListing, admin.site)
+
+        with CaptureQueriesContext(connection) as queries:
+            model_admin.delete_queryset(None, OJTListing.objects.all())
+        model_admin.delete_model(None, make_listing(self.admin))
+
+        self.assertEqual(len(self.updates(queries, OJTListing)), 2)
+        self.assertFalse(OJTListing.objects.exists())
+        self.assertEqual(OJTListing.all_objects.count(), len(listings) + 1)
+
+
+class ValuesSerializerParityTests(TestCase):
+    def setUp(self):
+        company = User.objects.create_user(
+            username='acme', password='pw', role='company', company_name='Acme', is_verified=True,
+        )
+        User.objects.filter(pk=company.pk).update(
+            profile_image='profile_images/acme.png',
+            profile_thumbnails={'source': 'profile_images/acme.png', 'small': {'webp': 'thumbs/acme.webp'}},
+        )
+        # Every nullable profile field left empty
+        bare = User.objects.create_user(username='student', password='pw', role='student')
+        filled = User.objects.create_user(
+            username='dee', password='pw', role='student', course='BSIT', year_level=4, phone=9171234567, bio='Hi',
+        )
+        open_listing = make_listing(company, title='Open', status='open', allowance=Decimal('5000.50'))
+        expired = make_listing(company, title='Expired')
+        OJTListing.objects.filter(pk=expired.pk).update(application_deadline=timezone.localdate() - timedelta(days=1))
+        apply(bare, open_listing)
+        apply(filled, open_listing, status='for_interview', resume='resumes/dee.pdf',
+              interview_date=datetime(2026, 3, 2, 9, 30, 15, 123456, tzinfo=dt_timezone.utc))
+        apply(filled, make_listing(company, title='Other'), status='rejected')
+
+    def assertSameOutput(self, serializer_class, queryset):
+        context = {'request': RequestFactory().get('/api/')}
+        expected = serializer_class(queryset, many=True, context=context).data
+
+        self.assertEqual(ValuesSerializer(serializer_class, context).serialize(queryset), expected)
+
+    def test_listings(self):
+        for time_zone in ('UTC', 'Asia/Manila'):
+            with self.subTest(time_zone=time_zone), self.settings(TIME_ZONE=time_zone):
+                self.assertSameOutput(OJTListingSerializer, OJTListing.objects.order_by('id'))
+                self.assertSameOutput(OJTListingFeedSerializer, OJTListing.objects.order_by('id'))
+
+    def test_applications(self):
+        for time_zone in ('UTC', 'Asia/Manila'):
+            with self.subTest(time_zone=time_zone), self.settings(TIME_ZONE=time_zone):
+                self.assertSameOutput(ApplicationSerializer, Application.objects.order_by('id'))
+
+
+class FastJSONTests(TestCase):
+    def test_orjson_dates_match_drf(self):
+        data = {
+            'utc': datetime(2026, 5, 1, 10, 0, 0, 123456, tzinfo=dt_timezone.utc),
+            'offset': datetime(2026, 5, 1, 18, 0, tzinfo=dt_timezone(timedelta(hours=8))),
+            'naive': datetime(2026, 5, 1, 10, 0),
+            'day': date(2026, 5, 1),
+        }
+
+        self.assertEqual(dumps(data, 'orjson'), JSONRenderer().render(data))
+
+
+class CompanySnapshotTests(TestCase):
+    def setUp(self):
+        self.company = User.objects.create_user(username='acme', password='pw', role='company',
+                                                company_name='Acme')
+        self.listing = make_listing(self.company)
+
+    def test_profile_change_reaches_listings(self):
+        self.company.company_name = 'Acme Corp'
+        self.company.is_verified = True
+        self.company.save()
+
+        self.listing.refresh_from_db()
+        self.assertEqual((self.listing.company_name, self.listing.company_verified), ('Acme Corp', True))
+
+    def test_moving_a_listing_takes_the_new_company(self):
+        other = User.objects.create_user(username='globex', password='pw', role='company',
+                                         company_name='Globex', is_verified=True)
+        listing = OJTListing.objects.get(pk=self.listing.pk)
+
+        listing.company = other
+        listing.save(update_fields=['company'])
+
+        listing.refresh_from_db()
+        self.assertEqual((listing.company_name, listing.company_verified), ('Globex', True))
+
+    def test_unrelated_edit_keeps_the_snapshot(self):
+        listing = OJTListing.objects.get(pk=self.listing.pk)
+        with self.assertNumQueries(1):
+            listing.title = 'Senior intern'
+            listing.save()
+
+
+class AccountDeletionTests(TestCase):
+    def setUp(self):
+        self.company = User.objects.create_user(username='acme', password='pw', role='company')
+        self.student = User.objects.create_user(username='student', password='pw', role='student')
+        self.listing = make_listing(self.company)
+        apply(self.student, self.listing)
+
+    def test_applications_to_deleted_listings_leave_both_lists(self):
+        soft_delete_listing(self.listing)
+
+        for user in (self.student, self.company):
+            login(self.client, user)
+            self.assertEqual(self.client.get('/api/applications/').json(), [], user.role)
+
+    def test_purge_removes_dependents_before_the_user(self):
+        expires_at = timezone.now() + timedelta(days=1)
+        IdempotencyRecord.objects.bulk_create([
+            IdempotencyRecord(user=self.student, key=f'key-{index}', request_path='/api/applications/',
+                              expires_at=expires_at)
+            for index in range(5)
+        ])
+        Notification.objects.create(user=self.student, notification_type='general', title='Hi', message='-')
+        soft_delete_account(self.student)
+
+        self.assertEqual(purge_deleted_accounts(chunk_size=2), 1)
+
+        self.assertFalse(User.objects.filter(pk=self.student.pk).exists())
+        self.assertFalse(IdempotencyRecord.objects.exists())
+        self.assertFalse(Notification.objects.filter(user_id=self.student.pk).exists())
+        self.assertFalse(Application.objects.filter(student_id=self.student.pk).exists())
+
+
+class CandidateSearchViewTests(TestCase):
+    def setUp(self):
+        for index in range(5):
+            User.objects.create_user(
+                username=f'student{index}', password='pw', role='student', course='BSIT', year_level=4,
+                skills='python django' if index % 2 else 'python', open_to_search=True,
+            )
+        User.objects.create_user(username='hidden', password='pw', role='student', skills='python')
+        login(self.client, User.objects.create_user(username='acme', password='pw', role='company'))
+
+    def pages(self, url):
+        usernames = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            usernames.append([candidate['username'] for candidate in response.json()['results']])
+            url = response.json()['next']
+        return usernames
+
+    def test_cursor_pages_through_every_match_once(self):
+        for query in ('', '&q=python'):
+            with self.subTest(query=query):
+                pages = self.pages(f'/api/candidates/?page_size=2{query}')
+
+                self.assertEqual([len(page) for page in pages], [2, 2, 1])
+                self.assertEqual(sorted(sum(pages, [])), [f'student{index}' for index in range(5)])
+
+    def test_filters_and_text_match(self):
+        self.assertEqual(sorted(sum(self.pages('/api/candidates/?q=django'), [])), ['student1', 'student3'])
+        self.assertEqual(self.pages('/api/candidates/?course=BSCS'), [[]])
+
+    def test_bad_page_size_is_a_400(self):
+        for page_size in ('0', '-1', 'ten', ''):
+            with self.subTest(page_size=page_size):
+                response = self.client.get('/api/candidates/', {'page_size': page_size})
+                self.assertEqual(response.status_code, 400)
+
+    def test_page_size_is_capped(self):
+        response = self.client.get('/api/candidates/', {'page_size': 1000})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((len(response.json()['results']), response.json()['next']), (5, None))
+
+    def test_bad_cursor_is_a_404(self):
+        self.assertEqual(self.client.get('/api/candidates/', {'cursor': 'nope'}).status_code, 404)
+
+
+class InterviewSchedulingTests(TestCase):
+    def setUp(self):
+        self.company = User.objects.create_user(username='acme', password='pw', role='company')
+        self.listing = make_listing(self.company)
+        self.students = [
+            User.objects.create_user(username=f'student{index}', password='pw', role='student') for index in range(3)
+        ]
+        self.applications = [apply(student, self.listing) for student in self.students]
+        self.nine = (timezone.localtime() + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+        # Two 30-minute slots: 9:00 and 9:30
+        self.windows = [(self.nine, self.nine + timedelta(hours=1))]
+
+    def schedule(self, applications):
+        ids = [application.id for application in applications]
+        return schedule_interviews(self.company, Application.objects.filter(id__in=ids), self.windows, 30)
+
+    def test_company_booking_outside_the_batch_blocks_its_slot(self):
+        other = User.objects.create_user(username='other', password='pw', role='student')
+        apply(other, self.listing, status='for_interview', interview_date=self.nine)
+
+        booked, unscheduled = self.schedule(self.applications)
+
+        first, second, third = self.applications
+        self.assertEqual(booked, {first.id: self.nine + timedelta(minutes=30)})
+        self.assertEqual(unscheduled, [second.id, third.id])
+        self.assertEqual(
+            list(Application.objects.filter(status='for_interview').values_list('id', flat=True).order_by('id')),
+            [first.id, Application.objects.get(student=other).id],
+        )
+        invited = ApplicationStatusChange.STATUS_CODES['for_interview']
+        self.assertEqual(ApplicationStatusChange.objects.filter(application=first, to_status=invited).count(), 1)
+        self.assertEqual(Notification.objects.filter(notification_type='interview_scheduled').count(), 1)
+
+    def test_student_is_not_double_booked_across_companies(self):
+        rival = User.objects.create_user(username='rival', password='pw', role='company')
+        apply(self.students[0], make_listing(rival), status='for_interview', interview_date=self.nine)
+
+        booked, unscheduled = self.schedule(self.applications[:2])
+
+        first, second = self.applications[:2]
+        self.assertEqual(booked, {first.id: self.nine + timedelta(minutes=30), second.id: self.nine})
+        self.assertEqual(unscheduled, [])
+        self.assertEqual(Application.objects.get(pk=first.id).interview_date, self.nine + timedelta(minutes=30))
+
+    @override_settings(DASHBOARD_STATS_MATERIALIZED=True)
+    def test_stored_dashboards_are_refreshed(self):
+        get_dashboard_stats(self.students[0])
+        get_dashboard_stats(self.company)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule(self.applications[:1])
+
+        self.assertEqual(get_dashboard_stats(self.students[0])['applications_by_status']['for_interview'], 1)
+        self.assertEqual(get_dashboard_stats(self.company)['applications_by_status']['for_interview'], 1)
+
+    def test_view_skips_applications_to_deleted_listings(self):
+        live = apply(self.students[0], make_listing(self.company, title='Live'))
+        Application.objects.filter(pk__in=[application.id for application in self.applications]).update(
+            status='for_interview',
+        )
+        soft_delete_listing(self.listing)
+        login(self.client, self.company)
+        windows = [{'start': self.nine.isoformat(), 'end': (self.nine + timedelta(hours=3)).isoformat()}]
+
+        by_ids = self.client.post('/api/applications/schedule-interviews/', {
+            'applications': [live.id, *[application.id for application in self.applications]], 'windows': windows,
+        }, content_type='application/json')
+        by_listing = self.client.post('/api/applications/schedule-interviews/', {
+            'listing': self.listing.id, 'windows': windows,
+        }, content_type='application/json')
+
+        self.assertEqual([row['application'] for row in by_ids.json()['scheduled']], [live.id])
+        self.assertEqual(by_listing.json(), {'scheduled': [], 'unscheduled': []})
+        self.assertFalse(Application.objects.filter(listing=self.listing, interview_date__isnull=False).exists())
+
+
+class DeadlineReminderTests(TestCase):
+    def setUp(self):
+        company = User.objects.create_user(username='acme', password='pw', role='company')
+        self.listing = make_listing(company, status='open', course_requirement='cit', year_level_requirement=4)
+        self.today = self.listing.application_deadline - timedelta(days=3)
+        self.student = User.objects.create_user(username='student', password='pw', role='student', course='cit',
+                                                year_level=4)
+
+    def reminders(self):
+        return Notification.objects.filter(notification_type='deadline_reminder')
+
+    def test_eligible_students_are_reminded_once_per_threshold(self):
+        User.objects.create_user(username='coa', password='pw', role='student', course='coa', year_level=4)
+        User.objects.create_user(username='third-year', password='pw', role='student', course='cit', year_level=3)
+        applied = User.objects.create_user(username='applied', password='pw', role='student', course='cit',
+                                           year_level=4)
+        apply(applied, self.listing)
+
+        self.assertEqual(send_deadline_reminders(today=self.today, windows=[7, 3, 1]), 1)
+        self.assertEqual(send_deadline_reminders(today=self.today, windows=[7, 3, 1]), 0)
+
+        reminder = self.reminders().get()
+        self.assertEqual((reminder.user, reminder.data), (self.student, {'listing_id': self.listing.id, 'days_left': 3}))
+
+    def test_next_threshold_sends_a_new_reminder(self):
+        send_deadline_reminders(today=self.today, windows=[3, 1])
+
+        self.assertEqual(send_deadline_reminders(today=self.today + timedelta(days=2), windows=[3, 1]), 1)
+        self.assertEqual(send_deadline_reminders(today=self.today + timedelta(days=2), windows=[3, 1]), 0)
+        self.assertEqual(sorted(self.reminders().values_list('data__days_left', flat=True)), [1, 3])
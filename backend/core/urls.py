@@ -1,10 +1,24 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+if getattr(settings, 'ASYNC_READ_VIEWS', False):
+    listing_list_view = async_views.listing_list
+    listing_detail_view = async_views.listing_detail
+    notification_list_view = async_views.notification_list
+    company_stats_view = async_views.company_dashboard_stats
+    student_stats_view = async_views.student_dashboard_stats
+else:
+    listing_list_view = views.OJTListingListCreate.as_view()
+    listing_detail_view = views.OJTListingDetail.as_view()
+    notification_list_view = views.NotificationList.as_view()
+    company_stats_view = views.company_dashboard_stats
+    student_stats_view = views.student_dashboard_stats
 
 urlpatterns = [
     # Public listings (anyone can view active listings)
-    path('listings/', views.OJTListingListCreate.as_view(), name='listings-list'),
-    path('listings/<int:pk>/', views.OJTListingDetail.as_view(), name='listings-detail'),
+    path('listings/', listing_list_view, name='listings-list'),
+    path('listings/<int:pk>/', listing_detail_view, name='listings-detail'),
     
     # Company's own listings (protected)
     path('company/listings/', views.CompanyListingsList.as_view(), name='company-listings'),
@@ -12,13 +26,24 @@ urlpatterns = [
     # Applications
     path('applications/', views.ApplicationListCreate.as_view(), name='applications-list'),
     path('applications/<int:pk>/', views.ApplicationDetail.as_view(), name='applications-detail'),
+    path('applications/schedule-interviews/', views.schedule_interviews, name='schedule-interviews'),
     
     # Dashboard Stats
-    path('dashboard/company-stats/', views.company_dashboard_stats, name='company-stats'),
-    path('dashboard/student-stats/', views.student_dashboard_stats, name='student-stats'),
+    path('dashboard/company-stats/', company_stats_view, name='company-stats'),
+    path('dashboard/student-stats/', student_stats_view, name='student-stats'),
+
+    # Admin analytics (served from rollup tables)
+    path('analytics/placement/', views.analytics_placement, name='analytics-placement'),
+    path('analytics/companies/', views.analytics_companies, name='analytics-companies'),
+    path('analytics/applications-per-month/', views.analytics_applications_per_month, name='analytics-applications-per-month'),
+    path('analytics/time-to-decision/', views.analytics_time_to_decision, name='analytics-time-to-decision'),
+    path('analytics/funnel/', views.analytics_funnel, name='analytics-funnel'),
+
+    # Candidate search (companies; students who opted in)
+    path('candidates/', views.candidate_search, name='candidate-search'),
 
     #Notif
-    path('notifications/', views.NotificationList.as_view(), name='notifications-list'),
+    path('notifications/', notification_list_view, name='notifications-list'),
     path('notifications/<int:pk>/read/', views.mark_notification_read, name='mark-notification-read'),
     path('notifications/read-all/', views.mark_all_notifications_read, name='mark-all-notifications-read'),
     path('notifications/stats/', views.notification_stats, name='notification-stats'),
@@ -3,10 +3,27 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAuthenticated, AllowAny, BasePermission
-from .models import OJTListing, Application, Notification
-from .serializers import OJTListingSerializer, ApplicationSerializer, ApplicationStatusSerializer, NotificationSerializer
-from datetime import date
+from .models import OJTListing, Application, Notification, NotificationArchive
+from .serializers import (
+    OJTListingSerializer, OJTListingFeedSerializer, ApplicationSerializer, ApplicationStatusSerializer,
+    NotificationSerializer, InterviewScheduleSerializer,
+)
+from .pagination import NotificationCursorPagination, decode_sync_token, encode_sync_token
+from .fast_serializers import ValuesListMixin, ValuesSerializer
+from .candidate_search import decode_cursor, encode_cursor, search_candidates
+from accounts.models import User
+from accounts.serializers import CandidateSerializer
+from .stats import get_dashboard_stats
+from .archival import soft_delete_listing
+from .idempotency import IdempotentCreateMixin
+from . import analytics, interviews
+from datetime import date, datetime, time, timedelta
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.utils.urls import replace_query_param
 
 # Create your views here.
 
@@ -18,13 +35,23 @@ class IsStudentUser(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.role == 'student'
     
-class OJTListingListCreate(generics.ListCreateAPIView):
+class IsAdminRole(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and (request.user.role == 'admin' or request.user.is_staff)
+    
+class OJTListingListCreate(IdempotentCreateMixin, ValuesListMixin, generics.ListCreateAPIView):
     serializer_class = OJTListingSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['ojt_type', 'location', 'course_requirement', 'work_setup', 'status']
-    search_fields = ['title', 'description', 'company__company_name', 'skills_required']
+    search_fields = ['title', 'description', 'company_name', 'skills_required']
     ordering_fields = ['created_at', 'application_deadline', 'start_date', 'allowance']
 
+    def get_serializer_class(self):
+        # The feed is served from the listings table alone (see core.company_snapshot)
+        if self.request.method == 'GET':
+            return OJTListingFeedSerializer
+        return OJTListingSerializer
+
     def get_permissions(self):
         if self.request.method == 'POST':
             return [permissions.IsAuthenticated(), IsCompanyUser()]
@@ -46,7 +73,7 @@ class OJTListingListCreate(generics.ListCreateAPIView):
         serializer.save(company = self.request.user)
 
 
-class CompanyListingsList(generics.ListAPIView):
+class CompanyListingsList(ValuesListMixin, generics.ListAPIView):
     serializer_class = OJTListingSerializer
     permission_classes = [permissions.IsAuthenticated, IsCompanyUser]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
@@ -79,10 +106,11 @@ class OJTListingDetail(generics.RetrieveUpdateDestroyAPIView):
         serializer.save()
 
     def perform_destroy(self, instance):
-        instance.delete()
+        # Applications are archived and removed in chunks by the purge job
+        soft_delete_listing(instance)
 
 
-class ApplicationListCreate(generics.ListCreateAPIView):
+class ApplicationListCreate(IdempotentCreateMixin, ValuesListMixin, generics.ListCreateAPIView):
     serializer_class = ApplicationSerializer
     parser_classes = [JSONParser, MultiPartParser, FormParser]
 
@@ -95,9 +123,9 @@ class ApplicationListCreate(generics.ListCreateAPIView):
         user = self.request.user
 
         if user.role == 'student':
-            return Application.objects.filter(student = user).order_by('-applied_at')
+            return Application.objects.visible().filter(student = user).order_by('-applied_at')
         elif user.role == 'company':
-            return Application.objects.filter(listing__company=user).order_by('-applied_at')
+            return Application.objects.visible().filter(listing__company=user).order_by('-applied_at')
         return Application.objects.none()
     
     def perform_create(self, serializer):
@@ -110,9 +138,9 @@ class ApplicationDetail(generics.RetrieveUpdateDestroyAPIView):
         user = self.request.user
 
         if user.role == 'student':
-            return Application.objects.filter(student = user)
+            return Application.objects.visible().filter(student = user)
         elif user.role == 'company':
-            return Application.objects.filter(listing__company = user)
+            return Application.objects.visible().filter(listing__company = user)
         return Application.objects.none()
     
     def get_serializer_class(self):
@@ -122,46 +150,220 @@ class ApplicationDetail(generics.RetrieveUpdateDestroyAPIView):
             return ApplicationSerializer
         
 
-@api_view(['GET'])
+@api_view(['POST'])
 @permission_classes([IsCompanyUser])
-def company_dashboard_stats(request):
-    company = request.user
-
-    total_listings = OJTListing.objects.filter(company=company).count()
-    active_listings = OJTListing.objects.filter(company=company, status='open').count()
-    total_applications = Application.objects.filter(listing__company=company).count()
-    pending_applications = Application.objects.filter(listing__company=company, status='applied').count()
-
+def schedule_interviews(request):
+    """
+    Book interviews for many applicants at once: {"applications": [ids]} or
+    {"listing": id} for everyone shortlisted on it and not yet booked, the
+    interviewers' "windows" ([{"start", "end"}]), "slot_minutes" and
+    "gap_minutes". Listed applications that already have a date are moved.
+    Applicants that don't fit come back in "unscheduled".
+    """
+    serializer = InterviewScheduleSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+
+    # Applications to soft-deleted listings can't be booked
+    visible = Application.objects.visible()
+    if 'applications' in data:
+        applications = visible.filter(id__in=data['applications'])
+        if 'listing' in data:
+            applications = applications.filter(listing_id=data['listing'])
+    else:
+        # Everyone shortlisted for the listing who isn't booked yet
+        applications = visible.filter(
+            listing_id=data['listing'], status='for_interview', interview_date__isnull=True
+        )
+
+    booked, unscheduled = interviews.schedule_interviews(
+        request.user, applications,
+        [(window['start'], window['end']) for window in data['windows']],
+        data['slot_minutes'], data['gap_minutes'],
+    )
     return Response({
-        'total_listings': total_listings,
-        'active_listings': active_listings,
-        'total_applications': total_applications,
-        'pending_applications': pending_applications,
+        'scheduled': [
+            {'application': application_id, 'interview_date': start}
+            for application_id, start in sorted(booked.items(), key=lambda item: item[1])
+        ],
+        'unscheduled': unscheduled,
     })
 
+
+@api_view(['GET'])
+@permission_classes([IsCompanyUser])
+def company_dashboard_stats(request):
+    return Response(get_dashboard_stats(request.user))
+
 @api_view(['GET'])
 @permission_classes([IsStudentUser])
 def student_dashboard_stats(request):
-    student = request.user
+    return Response(get_dashboard_stats(request.user))
+
+
+def _report_range(request):
+    """Optional ?start=YYYY-MM-DD&end=YYYY-MM-DD bounds for analytics reports"""
+    bounds = []
+    for name in ('start', 'end'):
+        value = request.query_params.get(name)
+        try:
+            # None for a malformed value, ValueError for an impossible date such as 2024-13-45
+            day = parse_date(value) if value else None
+        except ValueError:
+            day = None
+        if value and day is None:
+            raise ValidationError({name: 'Must be a valid date (YYYY-MM-DD).'})
+        bounds.append(day)
+    return tuple(bounds)
+
 
-    total_applications = Application.objects.filter(student=student).count()
-    pending_applications = Application.objects.filter(student=student, status='applied').count()
-    accepted_applications = Application.objects.filter(student=student, status='accepted').count()
+@api_view(['GET'])
+@permission_classes([IsAdminRole])
+def analytics_placement(request):
+    """Placement rate per course from the latest daily snapshot"""
+    return Response(analytics.placement_by_course())
+
+@api_view(['GET'])
+@permission_classes([IsAdminRole])
+def analytics_companies(request):
+    """Acceptance rate per company"""
+    return Response(analytics.acceptance_by_company(*_report_range(request)))
+
+@api_view(['GET'])
+@permission_classes([IsAdminRole])
+def analytics_applications_per_month(request):
+    return Response(analytics.applications_per_month(*_report_range(request)))
 
+@api_view(['GET'])
+@permission_classes([IsAdminRole])
+def analytics_time_to_decision(request):
+    """Average days from application to accept/reject"""
+    return Response(analytics.time_to_decision(*_report_range(request)))
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminRole | IsCompanyUser])
+def analytics_funnel(request):
+    """Application funnel and time spent per status; companies only see their own listings"""
+    start, end = _report_range(request)
+    if start:
+        start = timezone.make_aware(datetime.combine(start, time.min))
+    if end:
+        end = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+    company = request.user if request.user.role == 'company' else None
+    return Response(analytics.status_funnel(start, end, company=company))
+
+
+CANDIDATE_PAGE_SIZE = 20
+MAX_CANDIDATE_PAGE_SIZE = 100
+
+
+@api_view(['GET'])
+@permission_classes([IsCompanyUser])
+def candidate_search(request):
+    """
+    Students who opted in to be found: ?q=<skills, bio or name>&course=&year_level=,
+    best match first, paged with the ``next`` cursor URL
+    """
+    params = request.query_params
+    try:
+        year_level = int(params['year_level']) if params.get('year_level') else None
+        page_size = int(params.get('page_size', CANDIDATE_PAGE_SIZE))
+    except ValueError:
+        raise ValidationError({'detail': 'year_level and page_size must be numbers.'})
+    if page_size < 1:
+        raise ValidationError({'page_size': 'Must be at least 1.'})
+    page_size = min(page_size, MAX_CANDIDATE_PAGE_SIZE)
+    after = None
+    if params.get('cursor'):
+        after = decode_cursor(params['cursor'])
+        if after is None:
+            raise NotFound('Invalid cursor')
+
+    rows = search_candidates(params.get('q', ''), params.get('course'), year_level, after, page_size + 1)
+    page = rows[:page_size]
+    serializer = ValuesSerializer(CandidateSerializer, {'request': request})
+    by_id = {row['id']: row for row in serializer.serialize(User.objects.filter(pk__in=[pk for pk, _ in page]))}
+    next_url = None
+    if page and len(rows) > page_size:
+        next_url = replace_query_param(request.build_absolute_uri(), 'cursor', encode_cursor(page[-1]))
     return Response({
-        'total_applications': total_applications,
-        'pending_applications': pending_applications,
-        'accepted_applications': accepted_applications,
+        'next': next_url,
+        'previous': None,
+        'results': [by_id[pk] for pk, _ in page if pk in by_id],
     })
 
 
 class NotificationList(generics.ListAPIView):
-    """Get user's notifications"""
+    """
+    Get user's notifications
+
+    - ``?cursor=`` / ``?page_size=`` switch to cursor pagination
+    - ``?since=<iso datetime>`` starts a delta sync: notifications created or
+      changed (e.g. marked read) after that time, oldest change first, plus
+      the ids of notifications removed since then (``deleted``). The response
+      carries a ``sync`` token; pass it back as ``?sync=`` to continue, right
+      away while ``has_more`` is true
+    """
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationCursorPagination
     
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by('-created_at')
+        return Notification.objects.filter(user=self.request.user).order_by('-created_at', '-id')
+
+    def paginate_queryset(self, queryset):
+        # Keep returning a plain list to clients that don't ask for pages
+        params = self.request.query_params
+        if 'cursor' not in params and 'page_size' not in params:
+            return None
+        return super().paginate_queryset(queryset)
+
+    def list(self, request, *args, **kwargs):
+        params = request.query_params
+        if 'since' not in params and 'sync' not in params:
+            return super().list(request, *args, **kwargs)
+
+        if 'sync' in params:
+            position = decode_sync_token(params['sync'])
+            if position is None:
+                return Response({'error': 'Invalid sync token'}, status=400)
+            updated_after, last_id, deleted_after = position
+        else:
+            since_dt = parse_datetime(params['since'])
+            if since_dt is None:
+                return Response({'error': 'since must be an ISO 8601 datetime'}, status=400)
+            if timezone.is_naive(since_dt):
+                since_dt = timezone.make_aware(since_dt)
+            updated_after, last_id, deleted_after = since_dt, 0, since_dt
+
+        # Taken before querying so nothing archived meanwhile is skipped next time
+        synced_at = timezone.now()
+        page_size = self.paginator.get_page_size(request)
+        # Keyset on (updated_at, id): rows sharing a timestamp are never skipped between pages
+        changed = (
+            self.get_queryset()
+            .filter(Q(updated_at__gt=updated_after) | Q(updated_at=updated_after, id__gt=last_id))
+            .order_by('updated_at', 'id')
+        )
+        notifications = list(changed[:page_size + 1])
+        has_more = len(notifications) > page_size
+        notifications = notifications[:page_size]
+        if notifications:
+            updated_after, last_id = notifications[-1].updated_at, notifications[-1].id
+
+        # Retention archives (and compaction folds) notifications; the archive row is the tombstone
+        deleted = list(
+            NotificationArchive.objects
+            .filter(user=request.user, archived_at__gt=deleted_after, archived_at__lte=synced_at)
+            .values_list('original_id', flat=True)
+        )
+        return Response({
+            'results': self.get_serializer(notifications, many=True).data,
+            'deleted': deleted,
+            'has_more': has_more,
+            'sync': encode_sync_token(updated_after, last_id, synced_at),
+        })
 
 
 @api_view(['POST'])
@@ -180,7 +382,10 @@ def mark_notification_read(request, pk):
 @permission_classes([permissions.IsAuthenticated])
 def mark_all_notifications_read(request):
     """Mark all notifications as read"""
-    Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+    # update() bypasses auto_now, so bump updated_at for delta sync clients
+    Notification.objects.filter(user=request.user, is_read=False).update(
+        is_read=True, updated_at=timezone.now()
+    )
     return Response({'success': True})
 
 
@@ -350,7 +350,7 @@ const CompanyApplications = () => {
                             <Avatar
                               size="sm"
                               name={`${student?.first_name} ${student?.last_name}`}
-                              src={student?.profile_image}
+                              src={student?.profile_thumbnails?.small?.webp || student?.profile_image}
                             />
                             <Box>
                               <Text fontWeight="medium">
@@ -24,6 +24,8 @@ const ApplyForm = () => {
         endorsement_letter: null
     })
     const [errors, setErrors] = useState({})
+    // One key per form: a resubmit after a dropped response gets the stored result
+    const [idempotencyKey] = useState(() => crypto.randomUUID())
 
     useEffect(() => {
         fetchJobDetails()
@@ -138,6 +140,7 @@ const ApplyForm = () => {
         headers: {
             'Content-Type': 'application/json',
             'Accept': 'application/json',
+            'Idempotency-Key': idempotencyKey,
         },
         body: JSON.stringify(applicationData),
         credentials: 'include',
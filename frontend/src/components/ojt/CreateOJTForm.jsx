@@ -25,6 +25,8 @@ const CreateOJTForm = () => {
 
     const [loading, setLoading] = useState(false)
     const [errors, setErrors] = useState({})
+    // One key per form: a resubmit after a dropped response gets the stored result
+    const [idempotencyKey] = useState(() => crypto.randomUUID())
 
     const [formData, setFormData] = useState({
         title: '',
@@ -158,6 +160,7 @@ const CreateOJTForm = () => {
         withCredentials: true,
         headers: {
             'Content-Type': 'application/json',
+            'Idempotency-Key': idempotencyKey,
         }
         })
         
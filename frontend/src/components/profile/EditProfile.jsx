@@ -31,6 +31,8 @@ const EditProfile = () => {
     course: '',
     year_level: '',
     bio: '',
+    skills: '',
+    open_to_search: false,
   })
 
   useEffect(() => {
@@ -44,6 +46,8 @@ const EditProfile = () => {
         course: user.course || '',
         year_level: user.year_level || '',
         bio: user.bio || '',
+        skills: user.skills || '',
+        open_to_search: user.open_to_search || false,
       })
       
       if (user.profile_image) {
@@ -384,6 +388,28 @@ return (
                         </Select>
                       </FormControl>
                     </HStack>
+
+                    <FormControl>
+                      <FormLabel>Skills</FormLabel>
+                      <Textarea
+                        name="skills"
+                        value={formData.skills}
+                        onChange={handleChange}
+                        placeholder="e.g., Python, Excel, Customer service"
+                        rows={2}
+                      />
+                    </FormControl>
+
+                    <FormControl display="flex" alignItems="center">
+                      <FormLabel htmlFor="open_to_search" mb="0">
+                        Let companies find me in candidate search
+                      </FormLabel>
+                      <Switch
+                        id="open_to_search"
+                        isChecked={formData.open_to_search}
+                        onChange={(e) => setFormData(prev => ({ ...prev, open_to_search: e.target.checked }))}
+                      />
+                    </FormControl>
                   </VStack>
                 </CardBody>
               </Card>
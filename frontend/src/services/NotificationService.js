@@ -7,6 +7,14 @@ export const notificationService = {
         return response.data
     },
 
+    // Only notifications created or changed since the last sync, plus the ids
+    // removed since then. Start with { since: <iso time> }, then pass the
+    // returned token as { sync }; call again at once while has_more is true.
+    syncNotifications: async ({ since, sync }) => {
+        const response = await api.get('/notifications/', { params: sync ? { sync } : { since } })
+        return response.data
+    },
+
     markAsRead: async (notificationId) => {
         const response = await api.post(`/notifications/${notificationId}/read/`)
         return response.data